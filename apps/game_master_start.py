@@ -3,20 +3,59 @@ import os
 import click
 
 from config import logging_configurator
-from gameserver.pong_server import PongServer
-from injections.providers import GrpcServerProviders
+from config.property_configurator import game_server_config
+from gameserver.pong_server import PongServer, is_asyncio_available
+from gameserver.shard_router import ShardedPongServer
+from injections.providers import GrpcServerProviders, GameRendererProviders
 
 logger = logging_configurator.get_logger(__name__)
 
+def start_game_master(port: str):
+    """
+    Serves the game master on the port, from an asyncio event loop if configured so, until this process is killed
+    :param port: the listen port
+    :return: None
+    """
+    if game_server_config.is_asyncio and is_asyncio_available():
+        pong_server = GrpcServerProviders.async_pong_server(port=port)
+    else:
+        if game_server_config.is_asyncio:
+            logger.warning("grpc.aio is not available with this grpcio, starting the thread pool server")
+        pong_server: PongServer = GrpcServerProviders.pong_server(port=port)
+    pong_server.start_server_blocking()
+
+
+def serve_shard(shard: int, port: int):
+    """
+    The shard processes of a sharded server run this
+    :param shard: the shard
+    :param port:  the listen port of the shard
+    :return: None
+    """
+    # there is no window for the matches of a shard to be shown in
+    GameRendererProviders.pong_renderer.add_kwargs(headless=True)
+    logger.info(f"Starting game master shard {shard} on port {port}")
+    start_game_master(str(port))
+
+
 @click.command()
-def cli():
+@click.option('--shards', type=int, default=game_server_config.shards,
+              help='the number of game master processes hosting the matches, one per core is best.  0 hosts every '
+                   'match in this process')
+def cli(shards: int):
     """
     This will start the grpc server for the pong service.  The listen port is configurable within the config.ini.
     The server will run until this process is killed.
     """
     logger.info("Starting the Pong Game Master GRPC Server")
-    pong_server: PongServer = GrpcServerProviders.pong_server()
-    pong_server.start_server_blocking()
+    if shards > 0:
+        # by default the router serves as many players as all the shards together
+        router_max_workers = game_server_config.router_max_workers or shards * game_server_config.max_workers
+        ShardedPongServer(serve_shard, num_shards=shards, max_workers=router_max_workers,
+                          thread_prefix=game_server_config.thread_pool_prefix,
+                          port=game_server_config.port).start_server_blocking()
+    else:
+        start_game_master(game_server_config.port)
 
 if __name__ == '__main__':
     # print(os.sched_getaffinity(0))
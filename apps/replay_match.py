@@ -0,0 +1,33 @@
+import time
+
+import click
+
+from config import logging_configurator
+from gameengine.replay import MatchReplayer, read_replay_log
+from injections.providers import GameEngineProviders
+
+logger = logging_configurator.get_logger(__name__)
+
+
+@click.command()
+@click.argument('replay_log_path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--verify/--no-verify', default=True, help='check the arena state of every frame against the recording')
+def cli(replay_log_path: str, verify: bool):
+    """
+    Re-simulates a match recorded by the game master (see replay_log_path in config.ini), without rendering.
+    The engine configuration, including physics_substeps, must be the same as when the match was recorded.
+    """
+    replay_log = read_replay_log(replay_log_path)
+    logger.info(f"Replaying {len(replay_log.directives)} frames with seed {replay_log.seed}")
+    replayer = MatchReplayer(GameEngineProviders.fixed_timestep_game_engine())
+    start_time = time.perf_counter()
+    result = replayer.replay(replay_log, verify=verify)
+    elapsed_time = time.perf_counter() - start_time
+    logger.info(f"Replayed {result.frames} frames in {elapsed_time:.2f} seconds "
+                f"({result.frames / max(elapsed_time, 1e-9):.0f} frames per second)")
+    logger.info(f"Left points: {result.left_points}  Right points: {result.right_points}  "
+                f"Drawn points: {result.drawn_points}")
+
+
+if __name__ == '__main__':
+    cli()
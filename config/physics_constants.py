@@ -0,0 +1,26 @@
+import math
+
+from config.property_configurator import game_arena_config, ball_paddle_collision_config
+from utils import measures
+from utils.measures import ureg
+
+"""
+ The configuration expresses angles and rates as pint quantities, which is great for keeping units straight but
+ every conversion costs tens of microseconds.  The game loop resets the arena after every point and rebounds the ball
+ off a paddle every rally, so the quantities are resolved here once, at import, into plain floats in the units the
+ math module expects (radians, seconds).  The engine should only ever use these constants.
+"""
+
+# the maximum reflection angle of a ball off a paddle, in radians
+MAX_PADDLE_REBOUND_ANGLE = float(ball_paddle_collision_config.max_angle_quantity.to(ureg.radian).magnitude)
+
+# the maximum starting angle of a ball, in whole degrees off horizontal
+MAX_BALL_STARTING_ANGLE_DEGREES = int(math.fabs(
+    game_arena_config.max_ball_starting_angle.to(ureg.angular_degree).magnitude))
+
+# (cos, sin) of every whole degree starting angle a ball can have, indexed by the angle in degrees
+BALL_STARTING_DIRECTIONS = tuple((math.cos(math.radians(degrees)), math.sin(math.radians(degrees)))
+                                 for degrees in range(MAX_BALL_STARTING_ANGLE_DEGREES + 1))
+
+# how long the server main thread sleeps between checks for a shutdown
+SERVER_IDLE_SLEEP_SECONDS = float(measures.seconds_per_min.to(ureg.sec / ureg.day).magnitude)
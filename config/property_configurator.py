@@ -1,273 +1,361 @@
+import ast
 from configparser import ConfigParser
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Tuple
+from typing import Tuple, Optional
 
 from config.aggregates import FontConfig, ColorConfig
+from proto_gen.gamemaster_pb2 import PixelFormat, FrameEncoding, FrameTransport, DeliveryPolicy
 from utils.measures import ureg
 
-true_path = Path(__file__).parent / 'config.ini'
-_parser = ConfigParser()
-_parser.read(str(true_path.resolve()), encoding='utf-8')
-
+"""
+ The configuration is parsed once into frozen snapshots, one per section of config.ini.  Reading a property is a plain
+ slot lookup, rather than a ConfigParser lookup and an eval of color strings on every access, which matters because
+ actors, arenas and renderers read the configuration in their constructors.  Call reload() to pick up edits to
+ config.ini; modules that copied a value (or a snapshot) into their own namespace at import keep the old one.
+"""
 
-class Config(object):
-    @staticmethod
-    def get_property_string(section_name: str, property_name: str) -> Any:
-        return _parser.get(section_name, property_name)
+true_path = Path(__file__).parent / 'config.ini'
 
-    @staticmethod
-    def get_property_int(section_name: str, property_name: str) -> Any:
-        return _parser.getint(section_name, property_name)
 
-    @staticmethod
-    def get_property_float(section_name: str, property_name: str) -> Any:
-        return _parser.getfloat(section_name, property_name)
-
-    @staticmethod
-    def get_property_bool(section_name: str, property_name: str) -> Any:
-        return _parser.getboolean(section_name, property_name)
-
-
-class GameServerConfig(Config):
-    @property
-    def host(self) -> str:
-        return Config.get_property_string('game_master_service', 'host')
-
-    @property
-    def port(self) -> str:
-        return Config.get_property_string('game_master_service', 'port')
-
-    @property
-    def max_workers(self) -> int:
-        return Config.get_property_int('game_master_service', 'max_workers')
-
-    @property
-    def thread_pool_prefix(self) -> int:
-        return Config.get_property_string('game_master_service', 'thread_prefix')
-
-
-class PlayerConfig(Config):
-    @property
-    def left_player_name(self) -> str:
-        return Config.get_property_string('player', 'left_player_name')
-
-    @property
-    def right_player_name(self) -> str:
-        return Config.get_property_string('player', 'right_player_name')
-
-
-class GameArenaConfig(Config):
-    @property
-    def paddle_offset(self) -> int:
-        return Config.get_property_int('game_arena', 'paddle_offset')
-
-    @property
-    def paddle_width(self) -> int:
-        return Config.get_property_int('game_arena', 'paddle_thickness')
-
-    @property
-    def paddle_height(self) -> int:
-        return Config.get_property_int('game_arena', 'paddle_height')
-
-    @property
-    def white_ball_radius(self) -> int:
-        return Config.get_property_int('game_arena', 'white_ball_radius')
-
-    @property
-    def max_ball_starting_angle(self) -> ureg.Quantity:
-        """
-        :return: The angle quantity representing the maximum starting angle a ball can have
-        """
-        return Config.get_property_int('game_arena', 'max_ball_starting_angle_degrees') * ureg.angular_degree
-
-    @property
-    def starting_ball_speed(self) -> int:
-        return Config.get_property_int('game_arena', 'starting_ball_speed')
-
-    @property
-    def arena_width(self) -> int:
-        return Config.get_property_int('game_arena', 'arena_width')
-
-    @property
-    def arena_height(self) -> int:
-        return Config.get_property_int('game_arena', 'arena_height')
-
-    @property
-    def wall_thickness(self) -> int:
-        return Config.get_property_int('game_arena', 'wall_thickness')
-
-
-class GameEngineConfig(Config):
-    @property
-    def max_speed(self) -> int:
-        """
-        :return:  The maximum pixels per frame any object in the game can move
-        """
-        return Config.get_property_int('game_engine', 'max_speed')
-
-    @property
-    def min_speed(self) -> int:
-        """
-        :return:  The minimum pixels per frame any object in the game can move
-        """
-        return Config.get_property_int('game_engine', 'min_speed')
-
-    @property
-    def max_ball_speed(self) -> int:
-        """
-        :return:  The maximum pixels per frame any ball in the game can move
-        """
-        return min(Config.get_property_int('game_engine', 'max_ball_speed'), self.max_speed)
-
-    @property
-    def max_paddle_speed(self) -> int:
-        """
-        :return:  The maximum speed any paddle can move in the game
-        """
-        return min(Config.get_property_int('game_engine', 'max_paddle_speed'), self.max_speed)
-
-    @property
-    def min_ball_speed(self) -> int:
-        """
-        :return:  The minimum pixels per frame any ball in the game can move
-        """
-        return max(Config.get_property_int('game_engine', 'min_ball_speed'), self.min_speed)
-
-    @property
-    def min_paddle_speed(self) -> int:
-        """
-        :return:  The minimum speed any paddle can move in the game
-        """
-        return max(Config.get_property_int('game_engine', 'min_paddle_speed'), self.min_speed)
-
-    @property
-    def default_paddle_speed(self) -> int:
-        """
-        :return:  The standard speed of the paddle
-        """
-        return Config.get_property_int('game_engine', 'default_paddle_speed')
-
-
-class ClassicPongCollisionConfig(Config):
-    @property
-    def max_angle_quantity(self) -> ureg.Quantity:
-        """
-        :return: The angle quantity representing the maximum reflection angle a ball can have off a paddle
-        """
-        return Config.get_property_float('ball_paddle_collision', 'max_angle_degress') * ureg.angular_degree
-
-
-class GameRendererConfig(Config):
-    @property
-    def paddle_color(self) -> Tuple[int, int, int]:
-        rgb_string = Config.get_property_string('game_renderer', 'paddle_color')
-        return eval(rgb_string)
-
-    @property
-    def score_board_font(self) -> FontConfig:
-        """
-        :return:  A FontConfig object for any text in the scoreboard area
-        """
-        font_name = Config.get_property_string('game_renderer', 'score_board_font_name')
-        font_size = Config.get_property_int('game_renderer', 'score_board_font_size')
-        font_color = eval(Config.get_property_string('game_renderer', 'score_board_font_color'))
-        font_style_bold = Config.get_property_bool('game_renderer', 'score_board_font_bold')
-        font_style_italic = Config.get_property_bool('game_renderer', 'score_board_font_italic')
-        return FontConfig(font_name, font_size, font_color, font_style_bold, font_style_italic)
-
-    @property
-    def registration_font(self) -> FontConfig:
-        """
-        :return:  A FontConfig object for the textual player registration notices
-        """
-        font_name = Config.get_property_string('game_renderer', 'registration_font_name')
-        font_size = Config.get_property_int('game_renderer', 'registration_font_size')
-        font_color = eval(Config.get_property_string('game_renderer', 'registration_font_color'))
-        font_style_bold = Config.get_property_bool('game_renderer', 'registration_font_bold')
-        font_style_italic = Config.get_property_bool('game_renderer', 'registration_font_italic')
-        return FontConfig(font_name, font_size, font_color, font_style_bold, font_style_italic)
-
-    @property
-    def commencement_font(self) -> FontConfig:
-        """
-        :return:  A FontConfig object for the textual game commencement notice
-        """
-        font_name = Config.get_property_string('game_renderer', 'commencement_font_name')
-        font_size = Config.get_property_int('game_renderer', 'commencement_font_size')
-        font_color = eval(Config.get_property_string('game_renderer', 'commencement_font_color'))
-        font_style_bold = Config.get_property_bool('game_renderer', 'commencement_font_bold')
-        font_style_italic = Config.get_property_bool('game_renderer', 'commencement_font_italic')
-        return FontConfig(font_name, font_size, font_color, font_style_bold, font_style_italic)
-
-    @property
-    def fps_font(self) -> FontConfig:
-        """
-        :return:  A FontConfig object for the in-game fps counter
-        """
-        font_name = Config.get_property_string('game_renderer', 'fps_font_name')
-        font_size = Config.get_property_int('game_renderer', 'fps_font_size')
-        font_color = eval(Config.get_property_string('game_renderer', 'fps_font_color'))
-        font_style_bold = Config.get_property_bool('game_renderer', 'fps_font_bold')
-        font_style_italic = Config.get_property_bool('game_renderer', 'fps_font_italic')
-        return FontConfig(font_name, font_size, font_color, font_style_bold, font_style_italic)
-
-    @property
-    def color_config(self) -> ColorConfig:
-        score_color = eval(Config.get_property_string('game_renderer', 'score_pane_color'))
-        meta_color = eval(Config.get_property_string('game_renderer', 'meta_pane_color'))
-        arena_color = eval(Config.get_property_string('game_renderer', 'arena_pane_color'))
-        paddle_color = eval(Config.get_property_string('game_renderer', 'paddle_color'))
-        obstacle_color = eval(Config.get_property_string('game_renderer', 'obstacle_color'))
-        net_color = eval(Config.get_property_string('game_renderer', 'net_color'))
-        backline_color = eval(Config.get_property_string('game_renderer', 'backline_color'))
-        primary_ball_color = eval(Config.get_property_string('game_renderer', 'primary_ball_color'))
-        grow_paddle_ball_color = eval(Config.get_property_string('game_renderer', 'grow_paddle_ball_color'))
-        shrink_paddle_ball_color = eval(Config.get_property_string('game_renderer', 'shrink_paddle_ball_color'))
-        return ColorConfig(score_color, meta_color, arena_color, paddle_color, primary_ball_color,
-                           grow_paddle_ball_color, shrink_paddle_ball_color, net_color, backline_color, obstacle_color)
-
-    @property
-    def fps_cap(self) -> int:
-        return Config.get_property_int('game_renderer', 'fps_cap')
-
-    @property
-    def score_board_height(self) -> int:
-        return Config.get_property_int('game_renderer', 'score_board_pane_height')
-
-    @property
-    def meta_board_height(self) -> int:
-        return Config.get_property_int('game_renderer', 'meta_data_pane_height')
-
-    @property
-    def generic_spacer(self) -> int:
-        return Config.get_property_int('game_renderer', 'generic_spacer')
-
-
-class MatchPlayConfig(Config):
-    @property
-    def points_per_match(self) -> int:
-        return Config.get_property_int('match_play', 'points_in_match')
-
-    @property
-    def hits_for_draw(self) -> int:
-        return Config.get_property_int('match_play', 'hits_for_draw')
-
-
-class ServerClientCommunicationConfig(Config):
-    @property
-    def is_client_response_lock(self) -> bool:
-        return Config.get_property_bool('server_client_communication', 'block_client_paddle_response')
-
-    @property
-    def max_game_state_buffer_size(self) -> bool:
-        return Config.get_property_int('server_client_communication', 'max_game_state_buffer_size')
-
-
-game_server_config = GameServerConfig()
-player_config = PlayerConfig()
-game_engine_config = GameEngineConfig()
-ball_paddle_collision_config = ClassicPongCollisionConfig()
-game_arena_config = GameArenaConfig()
-game_render_config = GameRendererConfig()
-match_play_config = MatchPlayConfig()
-server_client_communication_config = ServerClientCommunicationConfig()
+def read_parser(config_path: Path = true_path) -> ConfigParser:
+    """
+    :param config_path: path to an ini file
+    :return: a parser loaded with the ini file
+    """
+    parser = ConfigParser()
+    parser.read(str(config_path.resolve()), encoding='utf-8')
+    return parser
+
+
+def parse_color(parser: ConfigParser, section_name: str, property_name: str) -> Tuple[int, int, int]:
+    """
+    :return: the (red, green, blue) tuple of a color property written as (r,g,b)
+    """
+    return tuple(ast.literal_eval(parser.get(section_name, property_name)))
+
+
+def parse_font(parser: ConfigParser, section_name: str, font_prefix: str) -> FontConfig:
+    """
+    :param parser:       a loaded parser
+    :param section_name: the section holding the font properties
+    :param font_prefix:  the font properties are named <font_prefix>_name, <font_prefix>_size, etc
+    :return: the font configuration
+    """
+    return FontConfig(parser.get(section_name, f'{font_prefix}_name'),
+                      parser.getint(section_name, f'{font_prefix}_size'),
+                      parse_color(parser, section_name, f'{font_prefix}_color'),
+                      parser.getboolean(section_name, f'{font_prefix}_bold'),
+                      parser.getboolean(section_name, f'{font_prefix}_italic'))
+
+
+@dataclass(frozen=True)
+class GameServerConfig:
+    """
+    is_asyncio:  if True, the server runs its rpcs on an asyncio event loop instead of a thread pool
+    max_matches: the most matches the server hosts at once, 0 for no limit
+    shards:      the number of processes hosting the matches, 0 to host them in the process of the server
+    router_max_workers: the thread pool size of the router of a sharded server, 0 for shards * max_workers
+    """
+    __slots__ = ('host', 'port', 'max_workers', 'thread_pool_prefix', 'is_asyncio', 'max_matches', 'shards',
+                 'router_max_workers')
+    host: str
+    port: str
+    max_workers: int
+    thread_pool_prefix: str
+    is_asyncio: bool
+    max_matches: int
+    shards: int
+    router_max_workers: int
+
+    @classmethod
+    def from_parser(cls, parser: ConfigParser) -> 'GameServerConfig':
+        return cls(host=parser.get('game_master_service', 'host'),
+                   port=parser.get('game_master_service', 'port'),
+                   max_workers=parser.getint('game_master_service', 'max_workers'),
+                   thread_pool_prefix=parser.get('game_master_service', 'thread_prefix'),
+                   is_asyncio=parser.getboolean('game_master_service', 'asyncio'),
+                   max_matches=parser.getint('game_master_service', 'max_matches'),
+                   shards=parser.getint('game_master_service', 'shards'),
+                   router_max_workers=parser.getint('game_master_service', 'router_max_workers'))
+
+
+@dataclass(frozen=True)
+class PlayerConfig:
+    """
+    frame_transport: the FrameTransport players ask for their arena frames to be sent over
+    match_id:        the match the players play in, empty for the default match
+    delivery_policy: the DeliveryPolicy players ask for their game states to be queued with
+    """
+    __slots__ = ('left_player_name', 'right_player_name', 'frame_transport', 'match_id', 'delivery_policy')
+    left_player_name: str
+    right_player_name: str
+    frame_transport: int
+    match_id: str
+    delivery_policy: int
+
+    @classmethod
+    def from_parser(cls, parser: ConfigParser) -> 'PlayerConfig':
+        return cls(left_player_name=parser.get('player', 'left_player_name'),
+                   right_player_name=parser.get('player', 'right_player_name'),
+                   frame_transport=FrameTransport.Value(parser.get('player', 'frame_transport').upper()),
+                   match_id=parser.get('player', 'match_id'),
+                   delivery_policy=DeliveryPolicy.Value(parser.get('player', 'delivery_policy').upper()))
+
+
+@dataclass(frozen=True)
+class GameArenaConfig:
+    """
+    max_ball_starting_angle: the angle quantity representing the maximum starting angle a ball can have
+    """
+    __slots__ = ('paddle_offset', 'paddle_width', 'paddle_height', 'white_ball_radius', 'max_ball_starting_angle',
+                 'starting_ball_speed', 'arena_width', 'arena_height', 'wall_thickness')
+    paddle_offset: int
+    paddle_width: int
+    paddle_height: int
+    white_ball_radius: int
+    max_ball_starting_angle: ureg.Quantity
+    starting_ball_speed: int
+    arena_width: int
+    arena_height: int
+    wall_thickness: int
+
+    @classmethod
+    def from_parser(cls, parser: ConfigParser) -> 'GameArenaConfig':
+        return cls(paddle_offset=parser.getint('game_arena', 'paddle_offset'),
+                   paddle_width=parser.getint('game_arena', 'paddle_thickness'),
+                   paddle_height=parser.getint('game_arena', 'paddle_height'),
+                   white_ball_radius=parser.getint('game_arena', 'white_ball_radius'),
+                   max_ball_starting_angle=parser.getint('game_arena', 'max_ball_starting_angle_degrees') *
+                                           ureg.angular_degree,
+                   starting_ball_speed=parser.getint('game_arena', 'starting_ball_speed'),
+                   arena_width=parser.getint('game_arena', 'arena_width'),
+                   arena_height=parser.getint('game_arena', 'arena_height'),
+                   wall_thickness=parser.getint('game_arena', 'wall_thickness'))
+
+
+@dataclass(frozen=True)
+class GameEngineConfig:
+    """
+    max_speed:            the maximum pixels per frame any object in the game can move
+    min_speed:            the minimum pixels per frame any object in the game can move
+    max_ball_speed:       the maximum pixels per frame any ball in the game can move
+    max_paddle_speed:     the maximum speed any paddle can move in the game
+    min_ball_speed:       the minimum pixels per frame any ball in the game can move
+    min_paddle_speed:     the minimum speed any paddle can move in the game
+    default_paddle_speed: the standard speed of the paddle
+    batch_num_games:      the number of independent games stepped together by the batch arena engine
+    physics_substeps:     the number of fixed physics steps simulated for every rendered frame
+    """
+    __slots__ = ('max_speed', 'min_speed', 'max_ball_speed', 'max_paddle_speed', 'min_ball_speed', 'min_paddle_speed',
+                 'default_paddle_speed', 'batch_num_games', 'physics_substeps')
+    max_speed: int
+    min_speed: int
+    max_ball_speed: int
+    max_paddle_speed: int
+    min_ball_speed: int
+    min_paddle_speed: int
+    default_paddle_speed: int
+    batch_num_games: int
+    physics_substeps: int
+
+    @classmethod
+    def from_parser(cls, parser: ConfigParser) -> 'GameEngineConfig':
+        max_speed = parser.getint('game_engine', 'max_speed')
+        min_speed = parser.getint('game_engine', 'min_speed')
+        return cls(max_speed=max_speed,
+                   min_speed=min_speed,
+                   max_ball_speed=min(parser.getint('game_engine', 'max_ball_speed'), max_speed),
+                   max_paddle_speed=min(parser.getint('game_engine', 'max_paddle_speed'), max_speed),
+                   min_ball_speed=max(parser.getint('game_engine', 'min_ball_speed'), min_speed),
+                   min_paddle_speed=max(parser.getint('game_engine', 'min_paddle_speed'), min_speed),
+                   default_paddle_speed=parser.getint('game_engine', 'default_paddle_speed'),
+                   batch_num_games=parser.getint('game_engine', 'batch_num_games'),
+                   physics_substeps=parser.getint('game_engine', 'physics_substeps'))
+
+
+@dataclass(frozen=True)
+class ClassicPongCollisionConfig:
+    """
+    max_angle_quantity: the angle quantity representing the maximum reflection angle a ball can have off a paddle
+    """
+    __slots__ = ('max_angle_quantity',)
+    max_angle_quantity: ureg.Quantity
+
+    @classmethod
+    def from_parser(cls, parser: ConfigParser) -> 'ClassicPongCollisionConfig':
+        return cls(max_angle_quantity=parser.getfloat('ball_paddle_collision', 'max_angle_degress') *
+                                      ureg.angular_degree)
+
+
+@dataclass(frozen=True)
+class GameRendererConfig:
+    """
+    score_board_font:  the font for any text in the scoreboard area
+    registration_font: the font for the textual player registration notices
+    commencement_font: the font for the textual game commencement notice
+    fps_font:          the font for the in-game fps counter
+    observation_downsample: the number of arena pixels per pixel of the frames sent to players, along each axis
+    pipeline_depth:    the frames the game thread may run ahead of the game states built for players, zero to build
+                       them on the game thread
+    """
+    __slots__ = ('paddle_color', 'score_board_font', 'registration_font', 'commencement_font', 'fps_font',
+                 'color_config', 'fps_cap', 'is_headless', 'score_board_height', 'meta_board_height',
+                 'generic_spacer', 'observation_downsample', 'pipeline_depth')
+    paddle_color: Tuple[int, int, int]
+    score_board_font: FontConfig
+    registration_font: FontConfig
+    commencement_font: FontConfig
+    fps_font: FontConfig
+    color_config: ColorConfig
+    fps_cap: int
+    is_headless: bool
+    score_board_height: int
+    meta_board_height: int
+    generic_spacer: int
+    observation_downsample: int
+    pipeline_depth: int
+
+    @classmethod
+    def from_parser(cls, parser: ConfigParser) -> 'GameRendererConfig':
+        def color(property_name: str) -> Tuple[int, int, int]:
+            return parse_color(parser, 'game_renderer', property_name)
+
+        color_config = ColorConfig(color('score_pane_color'), color('meta_pane_color'), color('arena_pane_color'),
+                                   color('paddle_color'), color('primary_ball_color'), color('grow_paddle_ball_color'),
+                                   color('shrink_paddle_ball_color'), color('net_color'), color('backline_color'),
+                                   color('obstacle_color'))
+        return cls(paddle_color=color('paddle_color'),
+                   score_board_font=parse_font(parser, 'game_renderer', 'score_board_font'),
+                   registration_font=parse_font(parser, 'game_renderer', 'registration_font'),
+                   commencement_font=parse_font(parser, 'game_renderer', 'commencement_font'),
+                   fps_font=parse_font(parser, 'game_renderer', 'fps_font'),
+                   color_config=color_config,
+                   fps_cap=parser.getint('game_renderer', 'fps_cap'),
+                   is_headless=parser.getboolean('game_renderer', 'headless'),
+                   score_board_height=parser.getint('game_renderer', 'score_board_pane_height'),
+                   meta_board_height=parser.getint('game_renderer', 'meta_data_pane_height'),
+                   generic_spacer=parser.getint('game_renderer', 'generic_spacer'),
+                   observation_downsample=parser.getint('game_renderer', 'observation_downsample'),
+                   pipeline_depth=parser.getint('game_renderer', 'pipeline_depth'))
+
+
+@dataclass(frozen=True)
+class MatchPlayConfig:
+    """
+    random_seed:     the seed of the arena, or None to draw a new seed every match
+    replay_log_path: the file matches are recorded to, or None to not record
+    """
+    __slots__ = ('points_per_match', 'hits_for_draw', 'random_seed', 'replay_log_path')
+    points_per_match: int
+    hits_for_draw: int
+    random_seed: Optional[int]
+    replay_log_path: Optional[str]
+
+    @classmethod
+    def from_parser(cls, parser: ConfigParser) -> 'MatchPlayConfig':
+        random_seed = parser.get('match_play', 'random_seed', fallback='').strip()
+        replay_log_path = parser.get('match_play', 'replay_log_path', fallback='').strip()
+        return cls(points_per_match=parser.getint('match_play', 'points_in_match'),
+                   hits_for_draw=parser.getint('match_play', 'hits_for_draw'),
+                   random_seed=int(random_seed) if random_seed else None,
+                   replay_log_path=replay_log_path or None)
+
+
+@dataclass(frozen=True)
+class ServerClientCommunicationConfig:
+    """
+    pixel_format:               the PixelFormat of the arena frames sent to players
+    frame_encoding:             the FrameEncoding of the arena frames sent to players
+    keyframe_interval:          with DELTA_RUNS, every this many frames is a keyframe
+    keyframe_compression_level: the zlib level keyframes are compressed with
+    delta_from_keyframe:        with DELTA_RUNS, if True deltas are taken against the last keyframe
+    shared_memory_ring_slots:   the number of frame slots of each shared memory frame ring
+    """
+    __slots__ = ('is_client_response_lock', 'max_game_state_buffer_size', 'pixel_format', 'frame_encoding',
+                 'keyframe_interval', 'keyframe_compression_level', 'delta_from_keyframe', 'shared_memory_ring_slots')
+    is_client_response_lock: bool
+    max_game_state_buffer_size: int
+    pixel_format: int
+    frame_encoding: int
+    keyframe_interval: int
+    keyframe_compression_level: int
+    delta_from_keyframe: bool
+    shared_memory_ring_slots: int
+
+    @classmethod
+    def from_parser(cls, parser: ConfigParser) -> 'ServerClientCommunicationConfig':
+        return cls(is_client_response_lock=parser.getboolean('server_client_communication',
+                                                             'block_client_paddle_response'),
+                   max_game_state_buffer_size=parser.getint('server_client_communication',
+                                                            'max_game_state_buffer_size'),
+                   pixel_format=PixelFormat.Value(parser.get('server_client_communication', 'pixel_format').upper()),
+                   frame_encoding=FrameEncoding.Value(
+                       parser.get('server_client_communication', 'frame_encoding').upper()),
+                   keyframe_interval=parser.getint('server_client_communication', 'keyframe_interval'),
+                   keyframe_compression_level=parser.getint('server_client_communication',
+                                                            'keyframe_compression_level'),
+                   delta_from_keyframe=parser.getboolean('server_client_communication', 'delta_from_keyframe'),
+                   shared_memory_ring_slots=parser.getint('server_client_communication', 'shared_memory_ring_slots'))
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """
+    Every section of the configuration, as parsed at one point in time
+    """
+    __slots__ = ('game_server_config', 'player_config', 'game_engine_config', 'ball_paddle_collision_config',
+                 'game_arena_config', 'game_render_config', 'match_play_config', 'server_client_communication_config')
+    game_server_config: GameServerConfig
+    player_config: PlayerConfig
+    game_engine_config: GameEngineConfig
+    ball_paddle_collision_config: ClassicPongCollisionConfig
+    game_arena_config: GameArenaConfig
+    game_render_config: GameRendererConfig
+    match_play_config: MatchPlayConfig
+    server_client_communication_config: ServerClientCommunicationConfig
+
+    @classmethod
+    def from_file(cls, config_path: Path = true_path) -> 'ConfigSnapshot':
+        parser = read_parser(config_path)
+        return cls(game_server_config=GameServerConfig.from_parser(parser),
+                   player_config=PlayerConfig.from_parser(parser),
+                   game_engine_config=GameEngineConfig.from_parser(parser),
+                   ball_paddle_collision_config=ClassicPongCollisionConfig.from_parser(parser),
+                   game_arena_config=GameArenaConfig.from_parser(parser),
+                   game_render_config=GameRendererConfig.from_parser(parser),
+                   match_play_config=MatchPlayConfig.from_parser(parser),
+                   server_client_communication_config=ServerClientCommunicationConfig.from_parser(parser))
+
+
+def reload(config_path: Path = true_path) -> ConfigSnapshot:
+    """
+    Parses the configuration again and rebinds the snapshot and section names of this module.  Modules that imported a
+    section by name (from config.property_configurator import game_engine_config) or resolved constants from it,
+    like config.physics_constants, are not updated
+    :param config_path: path to the ini file
+    :return: the new snapshot
+    """
+    global snapshot, game_server_config, player_config, game_engine_config, ball_paddle_collision_config, \
+        game_arena_config, game_render_config, match_play_config, server_client_communication_config
+    snapshot = ConfigSnapshot.from_file(config_path)
+    game_server_config = snapshot.game_server_config
+    player_config = snapshot.player_config
+    game_engine_config = snapshot.game_engine_config
+    ball_paddle_collision_config = snapshot.ball_paddle_collision_config
+    game_arena_config = snapshot.game_arena_config
+    game_render_config = snapshot.game_render_config
+    match_play_config = snapshot.match_play_config
+    server_client_communication_config = snapshot.server_client_communication_config
+    return snapshot
+
+
+snapshot = ConfigSnapshot.from_file()
+game_server_config = snapshot.game_server_config
+player_config = snapshot.player_config
+game_engine_config = snapshot.game_engine_config
+ball_paddle_collision_config = snapshot.ball_paddle_collision_config
+game_arena_config = snapshot.game_arena_config
+game_render_config = snapshot.game_render_config
+match_play_config = snapshot.match_play_config
+server_client_communication_config = snapshot.server_client_communication_config
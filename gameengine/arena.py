@@ -1,58 +1,66 @@
-import math
 import random
-from typing import List
+from collections import namedtuple
+from typing import List, Tuple, Optional
 
 import numpy
-import shapely
-from shapely import affinity
-from shapely.geometry import Polygon
 
 from config import property_configurator, logging_configurator
+from config.physics_constants import MAX_BALL_STARTING_ANGLE_DEGREES, BALL_STARTING_DIRECTIONS
 from config.property_configurator import game_arena_config
-from gameengine.gameactors import Actor, Wall, Net, Paddle, Velocity, Ball, BallFlavor, BackLine
+from gameengine.gameactors import Actor, Wall, Net, Paddle, Velocity, Ball, BallFlavor, BackLine, StationaryActor
+from gameengine.primitives import Box, Circle
+from gameengine.static_geometry import StaticGeometryCache
 from proto_gen.gamemaster_pb2 import PaddleType
-from utils.measures import ureg
 
 PADDLE_OFFSET = property_configurator.game_arena_config.paddle_offset
 PADDLE_HEIGHT = property_configurator.game_arena_config.paddle_height
 PADDLE_WIDTH = property_configurator.game_arena_config.paddle_width
 
 WHITE_BALL_RADIUS = property_configurator.game_arena_config.white_ball_radius
-MAX_BALL_START_ANGLE = property_configurator.game_arena_config.max_ball_starting_angle
 STARTING_BALL_SPEED = property_configurator.game_arena_config.starting_ball_speed
 
 logger = logging_configurator.get_logger(__name__)
 
+# the state of an arena, see Arena.snapshot.  actor_states holds the kinematic state of every moving actor, in the
+# order of the arena actors, and rng_state is the state of the arena random number generator
+ArenaSnapshot = namedtuple('ArenaSnapshot', ['actor_states', 'rng_state'])
+
 
 class Arena:
-    def __init__(self, other_actors: List[Actor] = None):
+    def __init__(self, other_actors: List[Actor] = None, seed: Optional[int] = None):
         """
         :param actors:         any other shapes besides the white ball, paddles, and arena bounds
+        :param seed:           seed for the starting direction of the ball on every point.  If None, a seed is drawn,
+                               either way the seed is kept so the match can be replayed
         """
         self.arena_width = game_arena_config.arena_width
         self.arena_height = game_arena_config.arena_height
         self.arena_center = numpy.array([int(self.arena_width // 2), int(self.arena_height // 2)])
 
+        # the arena owns its randomness, so a snapshot of the arena also decides how every future point starts
+        self.seed = seed if seed is not None else random.randrange(2 ** 63)
+        self.rng = random.Random(self.seed)
+        logger.info(f"Arena seeded with {self.seed}")
+
         self.top_wall = Wall(name="top_wall",
-                             polygon=shapely.geometry.box(0, 0, self.arena_width, game_arena_config.wall_thickness),
+                             shape=Box(0, 0, self.arena_width, game_arena_config.wall_thickness),
                              collision_enabled=True)
 
         self.bottom_wall = Wall(name="bottom_wall",
-                                polygon=shapely.geometry.box(0, self.arena_height - game_arena_config.wall_thickness,
-                                                             self.arena_width, self.arena_height),
+                                shape=Box(0, self.arena_height - game_arena_config.wall_thickness,
+                                          self.arena_width, self.arena_height),
                                 collision_enabled=True)
 
-        self.center_net = Net(name="net",
-                              polygon=affinity.translate(shapely.geometry.box(0, 0, 1, self.arena_height),
-                                                         xoff=self.arena_width // 2))
+        net_x = self.arena_width // 2
+        self.center_net = Net(name="net", shape=Box(net_x, 0, net_x + 1, self.arena_height))
 
+        left_back_line_x = PADDLE_OFFSET + PADDLE_WIDTH // 2
         self.left_back_line = BackLine(name="left back line",
-                                       polygon=affinity.translate(shapely.geometry.box(0, 0, 1, self.arena_height),
-                                                                  xoff=PADDLE_OFFSET + PADDLE_WIDTH // 2))
+                                       shape=Box(left_back_line_x, 0, left_back_line_x + 1, self.arena_height))
 
+        right_back_line_x = self.arena_width - PADDLE_OFFSET - PADDLE_WIDTH // 2
         self.right_back_line = BackLine(name="right back line",
-                                        polygon=affinity.translate(shapely.geometry.box(0, 0, 1, self.arena_height),
-                                                                   xoff=self.arena_width - PADDLE_OFFSET - PADDLE_WIDTH // 2))
+                                        shape=Box(right_back_line_x, 0, right_back_line_x + 1, self.arena_height))
 
         self.make_primary_ball()
         self.make_paddles()
@@ -62,6 +70,13 @@ class Arena:
                        self.primary_ball, self.paddles[0], self.paddles[1], self.top_wall, self.bottom_wall]
         if other_actors:
             self.actors.extend(other_actors)
+
+        # stationary actors never move, so their collision geometry is calculated once
+        self.static_geometry_cache = StaticGeometryCache(self.actors)
+
+        # only these actors change as the game plays, and so are the only actors in a snapshot
+        self.moving_actors: Tuple[Actor, ...] = tuple(actor for actor in self.actors
+                                                       if not isinstance(actor, StationaryActor))
         self.reset_starting_positions()
 
     def reset_starting_positions(self):
@@ -78,26 +93,58 @@ class Arena:
         for ball in filter(lambda actor: isinstance(actor, Ball), self.actors):
             offset_to_center = ball.centroid - self.arena_center
             ball.translate(-offset_to_center[0], -offset_to_center[1])
-            max_angle_degrees = MAX_BALL_START_ANGLE.to(ureg.angular_degrees).magnitude
-            random_angle = random.randint(0, math.fabs(max_angle_degrees)) * ureg.angular_degree
-            vel_x = STARTING_BALL_SPEED * math.cos(random_angle.to_base_units()) * random.choice([-1, 1])
-            vel_y = STARTING_BALL_SPEED * math.sin(random_angle.to_base_units()) * random.choice([-1, 1])
+            cos_angle, sin_angle = BALL_STARTING_DIRECTIONS[self.rng.randint(0, MAX_BALL_STARTING_ANGLE_DEGREES)]
+            vel_x = STARTING_BALL_SPEED * cos_angle * self.rng.choice([-1, 1])
+            vel_y = STARTING_BALL_SPEED * sin_angle * self.rng.choice([-1, 1])
             ball.velocity = (vel_x, vel_y)
 
+    def snapshot(self) -> ArenaSnapshot:
+        """
+        Captures everything about the arena that changes as the game plays.  Walls, nets and other stationary actors
+        never change, so the snapshot only holds a few floats per moving actor plus the random number generator state.
+        Snapshots are immutable and can be restored any number of times, which makes them cheap branch points for
+        rollouts and tree search
+        :return: the snapshot
+        """
+        return ArenaSnapshot(self.actor_states(), self.rng.getstate())
+
+    def restore(self, snapshot: ArenaSnapshot):
+        """
+        Puts every moving actor back to where it was when the snapshot was taken
+        :param snapshot: a snapshot of this arena
+        :return: None
+        """
+        self.restore_actor_states(snapshot.actor_states)
+        self.rng.setstate(snapshot.rng_state)
+
+    def actor_states(self) -> Tuple[Tuple[float, float, float, float, float], ...]:
+        """
+        :return: the kinematic state of every moving actor, the part of a snapshot that is drawn and sent to players
+        """
+        return tuple(actor.kinematic_state() for actor in self.moving_actors)
+
+    def restore_actor_states(self, actor_states: Tuple[Tuple[float, float, float, float, float], ...]):
+        """
+        :param actor_states: the actor states of this arena, or of a copy of it
+        :return: None
+        """
+        for actor, actor_state in zip(self.moving_actors, actor_states):
+            actor.restore_kinematic_state(*actor_state)
+
     def make_primary_ball(self):
-        ball_shape = shapely.geometry.Point(self.arena_width / 2, self.arena_height / 2).buffer(WHITE_BALL_RADIUS)
+        ball_shape = Circle(self.arena_width / 2, self.arena_height / 2, WHITE_BALL_RADIUS)
         self.primary_ball = Ball('primary_ball', ball_shape, Velocity(0, 0), BallFlavor.PRIMARY)
 
     def make_paddles(self):
-        left_paddle_poly = shapely.geometry.box(PADDLE_OFFSET,
-                                                int((self.arena_height / 2.) - PADDLE_HEIGHT / 2),
-                                                PADDLE_OFFSET + PADDLE_WIDTH,
-                                                int((self.arena_height / 2.0) + PADDLE_HEIGHT / 2))
-        left_paddle = Paddle("left_paddle", left_paddle_poly, Velocity(0, 0), PaddleType.LEFT)
-
-        right_paddle_poly = shapely.geometry.box(self.arena_width - PADDLE_OFFSET - PADDLE_WIDTH,
-                                                 int((self.arena_height / 2.) - PADDLE_HEIGHT / 2),
-                                                 self.arena_width - PADDLE_OFFSET,
-                                                 int((self.arena_height / 2.0) + PADDLE_HEIGHT / 2))
-        right_paddle = Paddle("right_paddle", right_paddle_poly, Velocity(0, 0), PaddleType.RIGHT)
+        left_paddle_box = Box(PADDLE_OFFSET,
+                              int((self.arena_height / 2.) - PADDLE_HEIGHT / 2),
+                              PADDLE_OFFSET + PADDLE_WIDTH,
+                              int((self.arena_height / 2.0) + PADDLE_HEIGHT / 2))
+        left_paddle = Paddle("left_paddle", left_paddle_box, Velocity(0, 0), PaddleType.LEFT)
+
+        right_paddle_box = Box(self.arena_width - PADDLE_OFFSET - PADDLE_WIDTH,
+                               int((self.arena_height / 2.) - PADDLE_HEIGHT / 2),
+                               self.arena_width - PADDLE_OFFSET,
+                               int((self.arena_height / 2.0) + PADDLE_HEIGHT / 2))
+        right_paddle = Paddle("right_paddle", right_paddle_box, Velocity(0, 0), PaddleType.RIGHT)
         self.paddles = (left_paddle, right_paddle)
@@ -16,14 +16,14 @@ def billiard_ball_rebound(ball1: Ball, ball2: Ball) -> Tuple[Any, Any]:
     :param ball2:  second ball
     :return: tuple of velocities for their rebounds
     """
-    mass_1 = ball1.shape.area
-    mass_2 = ball2.shape.area
+    mass_1 = ball1.area
+    mass_2 = ball2.area
     total_mass = mass_1 + mass_2
 
     delta_v12 = ball1.velocity - ball2.velocity
     delta_v21 = delta_v12 * -1
 
-    delta_x12 = ball1.shape.centroid - ball2.shape.centroid
+    delta_x12 = ball1.centroid - ball2.centroid
     delta_x21 = delta_x12 * -1
     delta_x12_norm = numpy.linalg.norm(delta_x12)
     delta_x21_norm = numpy.linalg.norm(delta_x21)
@@ -46,7 +46,7 @@ class BilliardBallCollider(ActorPairCollidor):
                 "BilliardBallModel called with one or more actors that are not reboundable.  Not updating state")
             return
 
-        actors_intersect = actor1.shape.intersects(actor2.shape)
+        actors_intersect = actor1.intersects(actor2)
         if not actors_intersect:
             return
 
@@ -58,7 +58,7 @@ class BilliardBallCollider(ActorPairCollidor):
             logger.debug("Moving balls backwards one pixel at a time")
             actor1.move_backward(actor1_backup_distance)
             actor2.move_backward(actor2_backup_distance)
-            actors_intersect = actor1.shape.intersects(actor2.shape)
+            actors_intersect = actor1.intersects(actor2)
         logger.debug("Balls no longer intsersect")
 
         logger.debug(f"Original velocities: {actor1.velocity} {actor2.velocity}")
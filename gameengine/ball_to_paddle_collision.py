@@ -1,20 +1,18 @@
 import math
-from typing import Callable
+from typing import Callable, Tuple
 
-import shapely
 from dependency_injector.providers import DelegatedCallable
-from shapely import ops
 
-from config import logging_configurator, property_configurator
+from config import logging_configurator
+from config.physics_constants import MAX_PADDLE_REBOUND_ANGLE
 from gameengine.collision_engine import ActorPairCollidor
 from gameengine.gameactors import Ball, Paddle, BallFlavor
 
 logger = logging_configurator.get_logger(__name__)
-MAX_ANGLE = property_configurator.ball_paddle_collision_config.max_angle_quantity
 
 
 def update_primary_ball(ball: Ball, paddle: Paddle):
-    actors_intersect = ball.shape.intersects(paddle.shape)
+    actors_intersect = ball.intersects(paddle)
     if not actors_intersect:
         return
 
@@ -24,30 +22,42 @@ def update_primary_ball(ball: Ball, paddle: Paddle):
     while actors_intersect:
         logger.debug("Moving ball backwards one pixel at a time")
         ball.move_backward(ball_backup_distance)
-        actors_intersect = ball.shape.intersects(paddle.shape)
+        actors_intersect = ball.intersects(paddle)
     logger.debug("Ball no longer intsersects paddle")
 
-    nearest_ball_point, nearest_poly_point = shapely.ops.nearest_points(ball.shape, paddle.shape)
-    paddle_hit_x, paddle_hit_y = list(nearest_poly_point.coords)[0]
+    paddle_hit_x, paddle_hit_y = paddle.nearest_point(ball.centroid)
     logger.debug(f"Ball hit paddle at {paddle_hit_y}")
 
-    paddle_min_x, paddle_min_y, paddle_max_x, paddle_max_y = paddle.shape.bounds
+    paddle_min_x, paddle_min_y, paddle_max_x, paddle_max_y = paddle.bounds
     paddle_half_lenth = (paddle_max_y - paddle_min_y) / 2.0
-    _, paddle_mid_y = list(paddle.shape.centroid.coords)[0]
+    paddle_mid_y = paddle.centroid[1]
+    ball.velocity = paddle_rebound_velocity(ball, paddle_hit_y, paddle_mid_y, paddle_half_lenth)
+
+
+def paddle_rebound_velocity(ball: Ball, paddle_hit_y: float, paddle_mid_y: float,
+                            paddle_half_length: float) -> Tuple[float, float]:
+    """
+    The further from the paddle center the ball hits, the steeper the rebound angle.  The ball keeps its speed.
+    :param ball:                the ball, which is expected to be touching the paddle
+    :param paddle_hit_y:        the y coordinate on the paddle where the ball made contact
+    :param paddle_mid_y:        the y coordinate of the paddle center
+    :param paddle_half_length:  half the height of the paddle
+    :return: the velocity of the ball after rebounding
+    """
     hit_distance_from_center = math.fabs(paddle_hit_y - paddle_mid_y)
-    normalized_hit_distance_from_center = sorted([0, hit_distance_from_center / paddle_half_lenth, 1])[1]
-    rebound_angle = MAX_ANGLE * normalized_hit_distance_from_center
+    normalized_hit_distance_from_center = sorted([0, hit_distance_from_center / paddle_half_length, 1])[1]
+    rebound_angle = MAX_PADDLE_REBOUND_ANGLE * normalized_hit_distance_from_center
 
     # try to avoid horizontal back and forth
     # if rebound_angle.magnitude < 0.5:
     #     rebound_angle = 0.5 * ureg.angular_degree
 
-    rebound_vel_x = ball.vnorm * math.cos(rebound_angle.to_base_units().magnitude)
+    rebound_vel_x = ball.vnorm * math.cos(rebound_angle)
     rebound_vel_x = rebound_vel_x if ball.velocity[0] < 0 else -rebound_vel_x
 
-    rebound_vel_y = ball.vnorm * math.sin(rebound_angle.to_base_units().magnitude)
+    rebound_vel_y = ball.vnorm * math.sin(rebound_angle)
     rebound_vel_y = -rebound_vel_y if paddle_hit_y < paddle_mid_y else rebound_vel_y
-    ball.velocity = (rebound_vel_x, rebound_vel_y)
+    return rebound_vel_x, rebound_vel_y
 
 
 class CollisionStrategyByFlavor:
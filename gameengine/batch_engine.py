@@ -0,0 +1,238 @@
+from collections import namedtuple
+from typing import Optional
+
+import numpy
+
+from config import logging_configurator
+from config.physics_constants import MAX_BALL_STARTING_ANGLE_DEGREES, MAX_PADDLE_REBOUND_ANGLE
+from config.property_configurator import game_arena_config, game_engine_config, match_play_config
+from proto_gen.gamemaster_pb2 import PaddleDirective
+
+"""
+ A structure-of-arrays version of the classic arena.  Rather than a list of shapely actors per game, the positions and
+ velocities of the primary ball and both paddles of N independent games are held in numpy arrays and every game is
+ stepped with a single vectorized call.  The rules mirror the single game engine:
+    - paddles move by their directive and are clamped at the walls (see paddle_to_wall_collision.update_paddle)
+    - the ball reflects off the top and bottom walls (see ball_to_barrier_collision.IncidentAngleRebounder)
+    - the ball rebounds off a paddle at an angle proportional to the hit distance from the paddle center
+      (see ball_to_paddle_collision.update_primary_ball)
+    - a point is scored when the ball crosses a back line and a point is drawn after too many direction changes
+      (see rendersupport.ScoringManager)
+ There is no rendering here, this is meant for generating training transitions as fast as the cpu allows.
+"""
+
+logger = logging_configurator.get_logger(__name__)
+
+# column indices into the paddle arrays
+LEFT = 0
+RIGHT = 1
+
+# the outcome of a step for every game.  Each field is a boolean array of length num_games
+BatchStepResult = namedtuple('BatchStepResult', ['left_scored', 'right_scored', 'drawn'])
+
+# the arrays that change as the games play, in the order of BatchArenaEngine.STATE_ARRAYS, and the rng state
+BatchSnapshot = namedtuple('BatchSnapshot', ['arrays', 'rng_state'])
+
+
+class BatchArenaEngine:
+    # every array that changes as the games play
+    STATE_ARRAYS = ('ball_position', 'ball_velocity', 'paddle_y', 'paddle_velocity_y', 'points', 'points_drawn',
+                    'change_of_direction_count', 'last_ball_direction')
+
+    def __init__(self, num_games: int, seed: Optional[int] = None):
+        """
+        :param num_games: the number of independent games stepped together
+        :param seed:      seed for the random starting ball angles.  If None, the games are not reproducible
+        """
+        self.num_games = num_games
+        self.rng = numpy.random.default_rng(seed)
+
+        self.arena_width = game_arena_config.arena_width
+        self.arena_height = game_arena_config.arena_height
+        self.arena_center = numpy.array([self.arena_width // 2, self.arena_height // 2], dtype=float)
+        wall_thickness = game_arena_config.wall_thickness
+
+        self.ball_radius = float(game_arena_config.white_ball_radius)
+        self.ball_min_y = wall_thickness + self.ball_radius
+        self.ball_max_y = self.arena_height - wall_thickness - self.ball_radius
+        self.min_ball_speed = game_engine_config.min_ball_speed
+        self.max_ball_speed = game_engine_config.max_ball_speed
+        self.starting_ball_speed = game_arena_config.starting_ball_speed
+        self.max_starting_angle_degrees = MAX_BALL_STARTING_ANGLE_DEGREES
+        self.max_rebound_angle = MAX_PADDLE_REBOUND_ANGLE
+
+        # paddle x extents, column 0 is the left paddle and column 1 is the right paddle
+        paddle_offset = game_arena_config.paddle_offset
+        paddle_width = game_arena_config.paddle_width
+        self.paddle_half_height = game_arena_config.paddle_height / 2.0
+        self.paddle_min_x = numpy.array([paddle_offset, self.arena_width - paddle_offset - paddle_width], dtype=float)
+        self.paddle_max_x = self.paddle_min_x + paddle_width
+        self.paddle_min_y = wall_thickness + self.paddle_half_height
+        self.paddle_max_y = self.arena_height - wall_thickness - self.paddle_half_height
+
+        # the back lines are one pixel wide, a point is scored once the ball center passes the back line center
+        self.left_back_line_x = paddle_offset + paddle_width // 2 + 0.5
+        self.right_back_line_x = self.arena_width - paddle_offset - paddle_width // 2 + 0.5
+
+        # paddle directive (UP, DOWN, STATIONARY) to vertical paddle speed
+        paddle_speed = min(max(game_engine_config.default_paddle_speed, game_engine_config.min_paddle_speed),
+                           game_engine_config.max_paddle_speed)
+        self.directive_to_paddle_speed = numpy.zeros(max(PaddleDirective.values()) + 1)
+        self.directive_to_paddle_speed[PaddleDirective.UP] = -paddle_speed
+        self.directive_to_paddle_speed[PaddleDirective.DOWN] = paddle_speed
+
+        self.hits_for_draw = match_play_config.hits_for_draw
+
+        self.ball_position = numpy.zeros((num_games, 2))
+        self.ball_velocity = numpy.zeros((num_games, 2))
+        self.paddle_y = numpy.zeros((num_games, 2))
+        self.paddle_velocity_y = numpy.zeros((num_games, 2))
+
+        # scoring and rally counters, mirroring ScoreKeeper and ScoringManager
+        self.points = numpy.zeros((num_games, 2), dtype=numpy.int64)
+        self.points_drawn = numpy.zeros(num_games, dtype=numpy.int64)
+        self.change_of_direction_count = numpy.zeros(num_games, dtype=numpy.int64)
+        self.last_ball_direction = numpy.zeros(num_games, dtype=numpy.int8)  # 0 is unset, -1 left and 1 right
+        self.reset()
+
+    def reset(self, game_mask: Optional[numpy.ndarray] = None):
+        """
+        Moves the paddles and balls back to their starting positions, the same as Arena.reset_starting_positions
+        :param game_mask: boolean array selecting which games to reset.  If None, all games are reset
+        :return: None
+        """
+        if game_mask is None:
+            game_mask = numpy.ones(self.num_games, dtype=bool)
+        num_reset = int(numpy.count_nonzero(game_mask))
+        if num_reset == 0:
+            return
+
+        self.paddle_y[game_mask] = self.arena_center[1]
+        self.paddle_velocity_y[game_mask] = 0
+        self.ball_position[game_mask] = self.arena_center
+
+        angles = numpy.radians(self.rng.integers(0, self.max_starting_angle_degrees, size=num_reset, endpoint=True))
+        signs = self.rng.choice([-1.0, 1.0], size=(num_reset, 2))
+        velocities = self.starting_ball_speed * numpy.stack([numpy.cos(angles), numpy.sin(angles)], axis=1) * signs
+        self.ball_velocity[game_mask] = self._throttle_ball_velocity(velocities)
+
+        self.change_of_direction_count[game_mask] = 0
+        self.last_ball_direction[game_mask] = 0
+
+    def snapshot(self) -> BatchSnapshot:
+        """
+        :return: a copy of the state of every game, including the random number generator
+        """
+        return BatchSnapshot(tuple(getattr(self, name).copy() for name in self.STATE_ARRAYS),
+                             self.rng.bit_generator.state)
+
+    def restore(self, snapshot: BatchSnapshot):
+        """
+        Copies a snapshot back into the state arrays, in place, so views of the arrays stay valid
+        :param snapshot: a snapshot of this engine
+        :return: None
+        """
+        for name, array in zip(self.STATE_ARRAYS, snapshot.arrays):
+            getattr(self, name)[...] = array
+        self.rng.bit_generator.state = snapshot.rng_state
+
+    def _throttle_ball_velocity(self, velocities: numpy.ndarray) -> numpy.ndarray:
+        """
+        :param velocities: (n, 2) array of ball velocities
+        :return: the velocities scaled so their norms are within the ball speed bounds
+        """
+        vnorm = numpy.linalg.norm(velocities, axis=1)
+        bounded_vnorm = numpy.clip(vnorm, self.min_ball_speed, self.max_ball_speed)
+        scale = numpy.divide(bounded_vnorm, vnorm, out=numpy.ones_like(vnorm), where=vnorm > 0)
+        return velocities * scale[:, numpy.newaxis]
+
+    def step(self, left_directives: numpy.ndarray, right_directives: numpy.ndarray) -> BatchStepResult:
+        """
+        Advances every game by one frame
+        :param left_directives:  integer array of PaddleDirective values for the left paddle of every game
+        :param right_directives: integer array of PaddleDirective values for the right paddle of every game
+        :return: which games had a point scored or drawn this frame.  Those games have already been reset
+        """
+        self._move_paddles(left_directives, right_directives)
+        self.ball_position += self.ball_velocity
+        self._rebound_off_walls()
+        self._rebound_off_paddle(LEFT)
+        self._rebound_off_paddle(RIGHT)
+        return self._update_score()
+
+    def _move_paddles(self, left_directives: numpy.ndarray, right_directives: numpy.ndarray):
+        self.paddle_velocity_y[:, LEFT] = self.directive_to_paddle_speed[left_directives]
+        self.paddle_velocity_y[:, RIGHT] = self.directive_to_paddle_speed[right_directives]
+        self.paddle_y += self.paddle_velocity_y
+
+        # paddles running into a wall are stopped at the wall
+        clamped = (self.paddle_y < self.paddle_min_y) | (self.paddle_y > self.paddle_max_y)
+        numpy.clip(self.paddle_y, self.paddle_min_y, self.paddle_max_y, out=self.paddle_y)
+        self.paddle_velocity_y[clamped] = 0
+
+    def _rebound_off_walls(self):
+        # angle of incidence equals angle of reflection off a horizontal wall, so mirror the overshoot
+        ball_y = self.ball_position[:, 1]
+        hit_top = ball_y < self.ball_min_y
+        hit_bottom = ball_y > self.ball_max_y
+        ball_y[hit_top] = 2 * self.ball_min_y - ball_y[hit_top]
+        ball_y[hit_bottom] = 2 * self.ball_max_y - ball_y[hit_bottom]
+        self.ball_velocity[hit_top | hit_bottom, 1] *= -1
+
+    def _rebound_off_paddle(self, side: int):
+        ball_x = self.ball_position[:, 0]
+        ball_y = self.ball_position[:, 1]
+        paddle_mid_y = self.paddle_y[:, side]
+        paddle_top = paddle_mid_y - self.paddle_half_height
+        paddle_bottom = paddle_mid_y + self.paddle_half_height
+
+        # circle to box intersection, using the nearest point on the paddle to the ball center
+        nearest_x = numpy.clip(ball_x, self.paddle_min_x[side], self.paddle_max_x[side])
+        nearest_y = numpy.clip(ball_y, paddle_top, paddle_bottom)
+        hit = (ball_x - nearest_x) ** 2 + (ball_y - nearest_y) ** 2 <= self.ball_radius ** 2
+        if not hit.any():
+            return
+
+        # back the ball up along its velocity until it is touching the face of the paddle
+        velocity = self.ball_velocity[hit]
+        if side == LEFT:
+            contact_x = self.paddle_max_x[side] + self.ball_radius
+            overshoot = contact_x - ball_x[hit]
+        else:
+            contact_x = self.paddle_min_x[side] - self.ball_radius
+            overshoot = ball_x[hit] - contact_x
+        speed_x = numpy.abs(velocity[:, 0])
+        backup = numpy.divide(overshoot, speed_x, out=numpy.zeros_like(overshoot), where=speed_x > 0)
+        backup = numpy.clip(backup, 0, 1)
+        self.ball_position[hit] -= velocity * backup[:, numpy.newaxis]
+
+        # the rebound angle grows the further from center the paddle is hit
+        hit_y = numpy.clip(self.ball_position[hit, 1], paddle_top[hit], paddle_bottom[hit])
+        normalized_hit_distance = numpy.clip(numpy.abs(hit_y - paddle_mid_y[hit]) / self.paddle_half_height, 0, 1)
+        rebound_angle = self.max_rebound_angle * normalized_hit_distance
+        vnorm = numpy.linalg.norm(velocity, axis=1)
+
+        rebound_vel_x = vnorm * numpy.cos(rebound_angle)
+        rebound_vel_x = numpy.where(velocity[:, 0] < 0, rebound_vel_x, -rebound_vel_x)
+        rebound_vel_y = vnorm * numpy.sin(rebound_angle)
+        rebound_vel_y = numpy.where(hit_y < paddle_mid_y[hit], -rebound_vel_y, rebound_vel_y)
+        self.ball_velocity[hit] = self._throttle_ball_velocity(numpy.stack([rebound_vel_x, rebound_vel_y], axis=1))
+
+    def _update_score(self) -> BatchStepResult:
+        current_direction = numpy.where(self.ball_velocity[:, 0] > 0, 1, -1).astype(numpy.int8)
+        unset = self.last_ball_direction == 0
+        self.last_ball_direction[unset] = current_direction[unset]
+        direction_changed = self.last_ball_direction != current_direction
+        self.change_of_direction_count += direction_changed
+        self.last_ball_direction[direction_changed] = current_direction[direction_changed]
+
+        ball_x = self.ball_position[:, 0]
+        right_scored = ball_x < self.left_back_line_x
+        left_scored = ball_x > self.right_back_line_x
+        drawn = ~(left_scored | right_scored) & (self.change_of_direction_count >= self.hits_for_draw)
+
+        self.points[:, LEFT] += left_scored
+        self.points[:, RIGHT] += right_scored
+        self.points_drawn += drawn
+        self.reset(left_scored | right_scored | drawn)
+        return BatchStepResult(left_scored, right_scored, drawn)
@@ -0,0 +1,145 @@
+import math
+from collections import defaultdict
+from typing import List, Tuple, Dict, Iterator
+
+from gameengine.gameactors import Actor, StationaryActor
+from gameengine.primitives import Bounds
+
+"""
+ Rather than testing every pair of actors in the arena for a possible collision every frame, the broadphase narrows
+ the search down to the pairs whose swept bounding boxes overlap.  Each bounding box is grown by the distance the
+ actor can travel in a frame, which is the same test as collision_engine.calculate_potential_collision.
+    - moving actors (balls, paddles) are sorted along the x axis and swept, so only actors whose x extents overlap are
+      compared with each other
+    - stationary actors (walls, obstacles) never move, so they are indexed once into a uniform grid over the arena.
+      A moving actor only looks at the grid cells its swept box covers
+ The candidate pairs are returned in the same order itertools.combinations would produce them, so the collision
+ handlers are applied in the same order no matter which broadphase is used.
+"""
+
+# the side of a grid cell, in pixels, for the stationary actor index
+STATIC_GRID_CELL_SIZE = 64
+
+# (min_x, min_y, max_x, max_y, actor index, actor)
+SweptEntry = Tuple[float, float, float, float, int, Actor]
+
+
+def swept_bounds(actor: Actor) -> Bounds:
+    """
+    :param actor: an actor
+    :return: the bounds of the actor grown by the distance it can travel this frame (at least one pixel)
+    """
+    reach = max(1, actor.vnorm)
+    min_x, min_y, max_x, max_y = actor.bounds
+    return min_x - reach, min_y - reach, max_x + reach, max_y + reach
+
+
+class StaticGrid:
+    """
+    A uniform grid of stationary actors.  Every cell holds the actors whose (one pixel grown) bounds touch it
+    """
+
+    def __init__(self, static_actors: List[Tuple[int, StationaryActor]], cell_size: float = STATIC_GRID_CELL_SIZE):
+        """
+        :param static_actors: (index, actor) pairs of the stationary actors
+        :param cell_size:     the side of a grid cell, in pixels
+        """
+        self.cell_size = cell_size
+        self.entries: List[SweptEntry] = []
+        self.cells: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        for index, actor in static_actors:
+            # stationary actors reach one pixel, see swept_bounds
+            min_x, min_y, max_x, max_y = actor.static_geometry.bounds if actor.static_geometry is not None \
+                else actor.bounds
+            min_x, min_y, max_x, max_y = min_x - 1, min_y - 1, max_x + 1, max_y + 1
+            entry_number = len(self.entries)
+            self.entries.append((min_x, min_y, max_x, max_y, index, actor))
+            for cell in self.covered_cells((min_x, min_y, max_x, max_y)):
+                self.cells[cell].append(entry_number)
+
+    def covered_cells(self, bounds: Bounds) -> Iterator[Tuple[int, int]]:
+        """
+        :param bounds: a bounding box
+        :return: the (column, row) of every cell the bounding box touches
+        """
+        min_x, min_y, max_x, max_y = bounds
+        for column in range(math.floor(min_x / self.cell_size), math.floor(max_x / self.cell_size) + 1):
+            for row in range(math.floor(min_y / self.cell_size), math.floor(max_y / self.cell_size) + 1):
+                yield column, row
+
+    def query(self, bounds: Bounds) -> List[SweptEntry]:
+        """
+        :param bounds: a bounding box
+        :return: the entries of the stationary actors whose bounds overlap the bounding box
+        """
+        min_x, min_y, max_x, max_y = bounds
+        cells = self.cells
+        seen = set()
+        overlapping = []
+        for cell in self.covered_cells(bounds):
+            for entry_number in cells.get(cell, ()):
+                if entry_number in seen:
+                    continue
+                seen.add(entry_number)
+                entry = self.entries[entry_number]
+                if entry[0] <= max_x and min_x <= entry[2] and entry[1] <= max_y and min_y <= entry[3]:
+                    overlapping.append(entry)
+        return overlapping
+
+
+class SweepAndPruneBroadphase:
+    def __init__(self, cell_size: float = STATIC_GRID_CELL_SIZE):
+        """
+        :param cell_size: the side of a grid cell, in pixels, for the stationary actor index
+        """
+        self.cell_size = cell_size
+        self._static_key: Tuple = ()
+        self._static_grid = StaticGrid([], cell_size)
+
+    def _static_index(self, static_actors: List[Tuple[int, Actor]]) -> StaticGrid:
+        # stationary actors never move, so the grid is only rebuilt when the set of stationary actors changes
+        static_key = tuple((index, id(actor)) for index, actor in static_actors)
+        if static_key != self._static_key:
+            self._static_key = static_key
+            self._static_grid = StaticGrid(static_actors, self.cell_size)
+        return self._static_grid
+
+    def candidate_pairs(self, actors: List[Actor]) -> List[Tuple[Actor, Actor]]:
+        """
+        :param actors: a list of actors
+        :return: the pairs of actors that may collide this frame, see calculate_potential_collision
+        """
+        static_actors = []
+        moving_entries: List[SweptEntry] = []
+        for index, actor in enumerate(actors):
+            if isinstance(actor, StationaryActor):
+                static_actors.append((index, actor))
+            elif actor.is_collision_enabled():
+                moving_entries.append((*swept_bounds(actor), index, actor))
+        static_grid = self._static_index(static_actors)
+
+        indexed_pairs = []
+
+        # moving actors against each other: sweep along the x axis
+        moving_entries.sort(key=lambda entry: entry[0])
+        active: List[SweptEntry] = []
+        for entry in moving_entries:
+            min_x, min_y, _, max_y, index, actor = entry
+            active = [other for other in active if other[2] >= min_x]
+            for other in active:
+                if other[1] <= max_y and min_y <= other[3] and (actor.vnorm > 0 or other[5].vnorm > 0):
+                    indexed_pairs.append((index, other[4]) if index < other[4] else (other[4], index))
+            active.append(entry)
+
+        # moving actors against stationary actors: look up the grid cells each moving actor can reach
+        for entry in moving_entries:
+            index, actor = entry[4], entry[5]
+            if actor.vnorm == 0:
+                continue
+            for static_entry in static_grid.query(entry[:4]):
+                if static_entry[5].is_collision_enabled():
+                    static_index = static_entry[4]
+                    indexed_pairs.append((index, static_index) if index < static_index else (static_index, index))
+
+        indexed_pairs.sort()
+        return [(actors[index1], actors[index2]) for index1, index2 in indexed_pairs]
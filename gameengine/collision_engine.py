@@ -1,10 +1,8 @@
-import itertools
 from abc import ABC, abstractmethod
-from typing import List, Callable
+from typing import List, Callable, Optional
 
-from shapely.geometry import box
-
-from config import property_configurator
+from config import logging_configurator
+from gameengine.broadphase import SweepAndPruneBroadphase
 from gameengine.gameactors import Actor, Ball, Paddle, Wall
 
 """
@@ -14,8 +12,7 @@ from gameengine.gameactors import Actor, Ball, Paddle, Wall
  accurate screen representation of the result of all the interactions will be shown
 """
 
-# this is the maximum number of pixels any game object can move between consecutive frames
-PHYSICS_FRAME_RATE = property_configurator.game_engine_config.max_speed
+logger = logging_configurator.get_logger(__name__)
 
 
 def calculate_potential_collision(actor1: Actor, actor2: Actor) -> int:
@@ -31,9 +28,14 @@ def calculate_potential_collision(actor1: Actor, actor2: Actor) -> int:
             (actor1.vnorm == 0 and actor2.vnorm == 0):
         return False
 
-    actor1_box = box(*actor1.shape.bounds).buffer(max(1, actor1.vnorm))
-    actor2_box = box(*actor2.shape.bounds).buffer(max(1, actor2.vnorm))
-    return actor1_box.intersects(actor2_box)
+    # grow each bounding box by the distance the actor can travel this frame
+    actor1_reach = max(1, actor1.vnorm)
+    actor2_reach = max(1, actor2.vnorm)
+    actor1_min_x, actor1_min_y, actor1_max_x, actor1_max_y = actor1.bounds
+    actor2_min_x, actor2_min_y, actor2_max_x, actor2_max_y = actor2.bounds
+    reach = actor1_reach + actor2_reach
+    return actor1_min_x - reach <= actor2_max_x and actor2_min_x - reach <= actor1_max_x and \
+        actor1_min_y - reach <= actor2_max_y and actor2_min_y - reach <= actor1_max_y
 
 
 class ActorPairCollidor(ABC):
@@ -63,12 +65,13 @@ class CollisionPairHandlerFactory:
 
 class GameCollisionEngine(ABC):
     @abstractmethod
-    def update_state(self, actors: List[Actor]):
+    def update_state(self, actors: List[Actor], time_step: float = 1.):
         """
         The game collision engine will be called upon between every frame render.  It's responsibility is
         to move the actors according to their velocities and detect collisions.  When collisions are detected,
         the game collision engine must update the state of the actors involved in the collision
-        :param actors:  a list of actors
+        :param actors:     a list of actors
+        :param time_step:  the fraction of a frame to simulate.  Actors move this fraction of their velocity vector
         :return: None
         """
         pass
@@ -79,28 +82,33 @@ class AccurateGameCollisionEngine(GameCollisionEngine):
     Provides an engine that covers for edge cases at the expense of frame rate.
     """
 
-    def __init__(self, collision_pair_handler_factory: CollisionPairHandlerFactory):
+    def __init__(self, collision_pair_handler_factory: CollisionPairHandlerFactory,
+                 broadphase: Optional[SweepAndPruneBroadphase] = None):
+        """
+        :param collision_pair_handler_factory: provides the collision handler for a pair of actors
+        :param broadphase:                     narrows down the pairs of actors that may collide
+        """
         self.collision_pair_handler_factory = collision_pair_handler_factory
+        self.broadphase = broadphase if broadphase is not None else SweepAndPruneBroadphase()
 
-    def update_state(self, actors: List[Actor]):
+    def update_state(self, actors: List[Actor], time_step: float = 1.):
         # first lets see if there are any potential collisions
-        possible_collision_pairs = itertools.combinations(actors, 2)
-        likely_collision_pairs = list(filter(lambda pair: calculate_potential_collision(pair[0], pair[1]),
-                                             possible_collision_pairs))
+        likely_collision_pairs = self.broadphase.candidate_pairs(actors)
         if not likely_collision_pairs:
-            for actor in actors: actor.move_forward()
+            for actor in actors: actor.move_forward(time_step)
         else:
             collision_actor_set = set([actor for pair in likely_collision_pairs for actor in pair])
             actor_set = set(actors)
             non_collision_actors = actor_set.difference(collision_actor_set)
-            for non_collision_actor in non_collision_actors: non_collision_actor.move_forward()
+            for non_collision_actor in non_collision_actors: non_collision_actor.move_forward(time_step)
 
             for collision_pair in likely_collision_pairs:
-                physics_rate = int(max(collision_pair[0].vnorm, collision_pair[1].vnorm))
+                # one physics pass per pixel travelled
+                physics_rate = max(1, int(max(collision_pair[0].vnorm, collision_pair[1].vnorm) * time_step))
                 for physics_frame in range(physics_rate):
                     collision_handler = self.collision_pair_handler_factory.get_collision_handler(*collision_pair)
                     collision_handler(*collision_pair)
-                    for collision_actor in collision_pair: collision_actor.move_forward(1.0 / physics_rate)
+                    for collision_actor in collision_pair: collision_actor.move_forward(time_step / physics_rate)
 
 
 class FastGameCollisionEngine(GameCollisionEngine):
@@ -110,23 +118,53 @@ class FastGameCollisionEngine(GameCollisionEngine):
     This is about 20-30 frames per second faster than AccurateGameCollisionEngine
     """
 
-    def __init__(self, collision_pair_handler_factory: CollisionPairHandlerFactory):
+    def __init__(self, collision_pair_handler_factory: CollisionPairHandlerFactory,
+                 broadphase: Optional[SweepAndPruneBroadphase] = None):
+        """
+        :param collision_pair_handler_factory: provides the collision handler for a pair of actors
+        :param broadphase:                     narrows down the pairs of actors that may collide
+        """
         self.collision_pair_handler_factory = collision_pair_handler_factory
+        self.broadphase = broadphase if broadphase is not None else SweepAndPruneBroadphase()
 
-    def update_state(self, actors: List[Actor]):
+    def update_state(self, actors: List[Actor], time_step: float = 1.):
         # first lets see if there are any potential collisions
-        possible_collision_pairs = itertools.combinations(actors, 2)
-        likely_collision_pairs = list(filter(lambda pair: calculate_potential_collision(pair[0], pair[1]),
-                                             possible_collision_pairs))
+        likely_collision_pairs = self.broadphase.candidate_pairs(actors)
         if not likely_collision_pairs:
-            for actor in actors: actor.move_forward()
+            for actor in actors: actor.move_forward(time_step)
         else:
             collision_actor_set = set([actor for pair in likely_collision_pairs for actor in pair])
             actor_set = set(actors)
             non_collision_actors = actor_set.difference(collision_actor_set)
-            for non_collision_actor in non_collision_actors: non_collision_actor.move_forward()
+            for non_collision_actor in non_collision_actors: non_collision_actor.move_forward(time_step)
 
             for collision_pair in likely_collision_pairs:
                 collision_handler = self.collision_pair_handler_factory.get_collision_handler(*collision_pair)
                 collision_handler(*collision_pair)
-            for collision_actor in collision_actor_set: collision_actor.move_forward(1.0)
+            for collision_actor in collision_actor_set: collision_actor.move_forward(time_step)
+
+
+class FixedTimestepGameEngine(GameCollisionEngine):
+    """
+    Decouples the physics rate from the render rate.  Every rendered frame is simulated as a number of equal
+    substeps of another engine, so an actor never moves more than a fraction of its velocity between collision
+    checks.  With enough substeps the FastGameCollisionEngine stops tunnelling at high speeds, at a fraction of the
+    cost of the AccurateGameCollisionEngine.  Rendering, scoring and game states sent to players still happen once
+    per frame.
+    """
+
+    def __init__(self, game_engine: GameCollisionEngine, substeps: int = 1):
+        """
+        :param game_engine: the engine that simulates each substep
+        :param substeps:    the number of physics substeps per rendered frame
+        """
+        if substeps < 1:
+            raise ValueError(f"Physics substeps must be at least 1, not {substeps}")
+        self.game_engine = game_engine
+        self.substeps = substeps
+        logger.info(f"Simulating {substeps} physics substeps per frame with {game_engine.__class__.__name__}")
+
+    def update_state(self, actors: List[Actor], time_step: float = 1.):
+        substep_time = time_step / self.substeps
+        for _ in range(self.substeps):
+            self.game_engine.update_state(actors, substep_time)
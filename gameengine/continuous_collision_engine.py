@@ -0,0 +1,159 @@
+from typing import List, Optional, Tuple, Callable, Dict
+
+from config import logging_configurator
+from gameengine.ball_to_ball_collision import billiard_ball_rebound
+from gameengine.ball_to_paddle_collision import paddle_rebound_velocity
+from gameengine.broadphase import SweepAndPruneBroadphase
+from gameengine.collision_engine import GameCollisionEngine
+from gameengine.gameactors import Actor, Ball, Paddle, Wall, BallFlavor
+from gameengine.time_of_impact import Impact, circle_circle_impact, circle_box_impact, box_box_impact
+
+"""
+ Rather than moving actors a full velocity step and then backing them out of each other a pixel at a time, this
+ engine calculates the exact time of impact of every colliding pair within the frame.  All actors are advanced to the
+ earliest impact, that collision is resolved, and the search is repeated for the remainder of the frame.  Balls are
+ modeled as circles and every other actor as its axis aligned bounding box, which is exact for the Box primitives of
+ the paddles and walls.
+"""
+
+logger = logging_configurator.get_logger(__name__)
+
+# a safeguard against actors that keep impacting within the same frame (for instance a ball pinched between
+# a moving paddle and a wall)
+MAX_IMPACTS_PER_FRAME = 10
+
+
+def ball_radius(ball: Ball) -> float:
+    min_x, _, max_x, _ = ball.bounds
+    return (max_x - min_x) / 2.
+
+
+def relative_velocity(actor1: Actor, actor2: Actor) -> Tuple[float, float]:
+    return actor1.velocity[0] - actor2.velocity[0], actor1.velocity[1] - actor2.velocity[1]
+
+
+def ball_ball_impact(ball1: Ball, ball2: Ball, max_time: float) -> Optional[Impact]:
+    if not (ball1.is_reboundable() and ball2.is_reboundable()):
+        return None
+    return circle_circle_impact(tuple(ball1.centroid), tuple(ball2.centroid), relative_velocity(ball1, ball2),
+                                ball_radius(ball1) + ball_radius(ball2), max_time)
+
+
+def ball_barrier_impact(ball: Ball, barrier: Wall, max_time: float) -> Optional[Impact]:
+    if barrier.is_reboundable():
+        return None
+    return circle_box_impact(tuple(ball.centroid), relative_velocity(ball, barrier), ball_radius(ball),
+                             barrier.bounds, max_time)
+
+
+def ball_paddle_impact(ball: Ball, paddle: Paddle, max_time: float) -> Optional[Impact]:
+    # only the primary ball has a paddle collision model, see CollisionStrategyByFlavor
+    if ball.flavor is not BallFlavor.PRIMARY:
+        return None
+    return circle_box_impact(tuple(ball.centroid), relative_velocity(ball, paddle), ball_radius(ball),
+                             paddle.bounds, max_time)
+
+
+def paddle_wall_impact(paddle: Paddle, wall: Wall, max_time: float) -> Optional[Impact]:
+    return box_box_impact(paddle.bounds, wall.bounds, relative_velocity(paddle, wall), max_time)
+
+
+def resolve_ball_ball(ball1: Ball, ball2: Ball, impact: Impact):
+    rebound_v1, rebound_v2 = billiard_ball_rebound(ball1, ball2)
+    ball1.velocity = rebound_v1
+    ball2.velocity = rebound_v2
+
+
+def resolve_ball_barrier(ball: Ball, barrier: Wall, impact: Impact):
+    # angle of incidence equals angle of reflection: Vnew = Vold - 2 <v|n> n_hat
+    vel_x, vel_y = ball.velocity
+    normal_dot = vel_x * impact.normal_x + vel_y * impact.normal_y
+    ball.velocity = (vel_x - 2 * normal_dot * impact.normal_x, vel_y - 2 * normal_dot * impact.normal_y)
+
+
+def resolve_ball_paddle(ball: Ball, paddle: Paddle, impact: Impact):
+    _, paddle_min_y, _, paddle_max_y = paddle.bounds
+    paddle_mid_y = (paddle_min_y + paddle_max_y) / 2.
+    paddle_hit_y = min(max(ball.centroid[1], paddle_min_y), paddle_max_y)
+    ball.velocity = paddle_rebound_velocity(ball, paddle_hit_y, paddle_mid_y, (paddle_max_y - paddle_min_y) / 2.)
+
+
+def resolve_paddle_wall(paddle: Paddle, wall: Wall, impact: Impact):
+    paddle.velocity = (0, 0)
+
+
+def _swapped(pair_callable: Callable) -> Callable:
+    return lambda actor1, actor2, *args: pair_callable(actor2, actor1, *args)
+
+
+class ContinuousGameCollisionEngine(GameCollisionEngine):
+    """
+    Provides the accuracy of AccurateGameCollisionEngine, without tunnelling, at less cost than
+    FastGameCollisionEngine.  Collisions are resolved at their analytic time of impact.
+    """
+
+    def __init__(self, max_impacts_per_frame: int = MAX_IMPACTS_PER_FRAME,
+                 broadphase: Optional[SweepAndPruneBroadphase] = None):
+        """
+        :param max_impacts_per_frame: the maximum number of impacts resolved within a single frame
+        :param broadphase:            narrows down the pairs of actors that may collide
+        """
+        self.max_impacts_per_frame = max_impacts_per_frame
+        self.broadphase = broadphase if broadphase is not None else SweepAndPruneBroadphase()
+
+        # for each pair type: (time of impact calculation, collision resolution)
+        self.actor_pair_type_to_model: Dict[Tuple[type, type], Tuple[Callable, Callable]] = {
+            (Ball, Ball): (ball_ball_impact, resolve_ball_ball),
+            (Ball, Wall): (ball_barrier_impact, resolve_ball_barrier),
+            (Wall, Ball): (_swapped(ball_barrier_impact), _swapped(resolve_ball_barrier)),
+            (Ball, Paddle): (ball_paddle_impact, resolve_ball_paddle),
+            (Paddle, Ball): (_swapped(ball_paddle_impact), _swapped(resolve_ball_paddle)),
+            (Paddle, Wall): (paddle_wall_impact, resolve_paddle_wall),
+            (Wall, Paddle): (_swapped(paddle_wall_impact), _swapped(resolve_paddle_wall))
+            }
+
+    def candidate_pairs(self, actors: List[Actor]) -> List[Tuple[Actor, Actor, Tuple[Callable, Callable]]]:
+        """
+        :param actors: a list of actors
+        :return: the pairs of actors that have a collision model and can collide, along with that model
+        """
+        # the swept bounds of the broadphase cover a whole frame, so they also cover the remainder of a frame
+        candidates = []
+        for actor1, actor2 in self.broadphase.candidate_pairs(actors):
+            model = self.actor_pair_type_to_model.get((actor1.__class__, actor2.__class__))
+            if model:
+                candidates.append((actor1, actor2, model))
+        return candidates
+
+    def update_state(self, actors: List[Actor], time_step: float = 1.):
+        remaining_time = time_step
+        for _ in range(self.max_impacts_per_frame):
+            earliest_impact = None
+            for actor1, actor2, (impact_callable, resolve_callable) in self.candidate_pairs(actors):
+                impact = impact_callable(actor1, actor2, remaining_time)
+                if impact is not None and (earliest_impact is None or impact.time < earliest_impact[0].time):
+                    earliest_impact = (impact, actor1, actor2, resolve_callable)
+
+            if earliest_impact is None:
+                break
+
+            impact, actor1, actor2, resolve_callable = earliest_impact
+            logger.debug(f"Impact between {actor1.name} and {actor2.name} at frame time {impact.time}")
+            self.advance(actors, impact.time)
+            resolve_callable(actor1, actor2, impact)
+            remaining_time -= impact.time
+        self.advance(actors, remaining_time)
+
+    @staticmethod
+    def advance(actors: List[Actor], time: float):
+        """
+        Moves every actor along its velocity vector
+        :param actors: a list of actors
+        :param time:   the fraction of the velocity vector to move
+        :return: None
+        """
+        if time <= 0:
+            return
+        for actor in actors:
+            if actor.vnorm > 0:
+                actor.translate(actor.velocity[0] * time, actor.velocity[1] * time)
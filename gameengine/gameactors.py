@@ -2,27 +2,33 @@ import uuid
 from abc import ABC, abstractmethod
 from collections import namedtuple
 from enum import Enum
-from typing import Tuple
+from typing import Tuple, Union
 
 import numpy
-from shapely import affinity
-from shapely.geometry import Polygon, LineString
 from shapely.geometry.base import BaseGeometry
 
 from config import logging_configurator
 from config.property_configurator import game_engine_config
+from gameengine.primitives import Primitive, primitive_from_geometry, Bounds
 from proto_gen.gamemaster_pb2 import PaddleType
 
 logger = logging_configurator.get_logger(__name__)
 
 Velocity = namedtuple('Velocity', ['vel_x', 'vel_y'])
 
+# actors are given a primitive shape.  Shapely geometries are accepted too, and are converted to a primitive
+Shape = Union[Primitive, BaseGeometry]
+
 
 class Actor(ABC):
-    def __init__(self, name: str, shape: BaseGeometry, velocity: Velocity, collision_enabled: bool,
+    __slots__ = ('name', '_primitive', '_geometry', '_velocity', '_vnorm', '_collision_enabled', '_rebound_enabled',
+                 '_uuid')
+
+    def __init__(self, name: str, shape: Shape, velocity: Velocity, collision_enabled: bool,
                  rebound_enabled: bool):
         self.name = name
-        self._shape = shape
+        self._primitive = shape if isinstance(shape, Primitive) else primitive_from_geometry(shape)
+        self._geometry = None
         self._velocity = numpy.array([velocity.vel_x, velocity.vel_y], dtype=float)
         self._vnorm = numpy.linalg.norm(self._velocity)
         self._collision_enabled = collision_enabled
@@ -62,9 +68,49 @@ class Actor(ABC):
                 self._velocity = (min_vel / self._vnorm) * self.velocity
                 self._vnorm = min_vel
 
+    @property
+    def primitive(self) -> Primitive:
+        """
+        :return:  The native shape of the actor, which is updated in place as the actor moves
+        """
+        return self._primitive
+
     @property
     def shape(self) -> BaseGeometry:
-        return self._shape
+        """
+        :return:  A shapely geometry of the actor.  This is built lazily and cached until the actor moves, so prefer
+        the primitive, bounds and intersects for anything done every frame
+        """
+        if self._geometry is None:
+            self._geometry = self._primitive.to_geometry()
+        return self._geometry
+
+    @property
+    def bounds(self) -> Bounds:
+        """
+        :return:  (min_x, min_y, max_x, max_y) of the actor
+        """
+        return self._primitive.bounds
+
+    @property
+    def area(self) -> float:
+        return self._primitive.area
+
+    def intersects(self, other: 'Actor') -> bool:
+        """
+        :param other: another actor
+        :return: True if the shapes of the actors overlap or touch
+        """
+        if isinstance(other, StationaryActor) and other.static_geometry is not None:
+            return other.static_geometry.intersects(self._primitive)
+        return self._primitive.intersects(other._primitive)
+
+    def nearest_point(self, point) -> Tuple[float, float]:
+        """
+        :param point: any structure having a first and second indexable element
+        :return: the point on the actor closest to the given point
+        """
+        return self._primitive.nearest_point(point[0], point[1])
 
     @property
     def velocity(self):
@@ -91,9 +137,10 @@ class Actor(ABC):
     @property
     def centroid(self):
         """
-        :return:  The centroid of the shape as a numpy array
+        :return:  The centroid of the shape as a numpy array.  This is the live position of the actor, so copy it
+        if you need to keep it across moves
         """
-        return numpy.array([self._shape.centroid.x, self._shape.centroid.y])
+        return self._primitive.center
 
     def move_forward(self, relative_distance=1):
         """
@@ -103,14 +150,9 @@ class Actor(ABC):
         :return: None, mutates in place
         """
         if relative_distance is None or relative_distance >= 1:
-            x_offset = self._velocity[0]
-            y_offset = self._velocity[1]
+            self.translate(self._velocity[0], self._velocity[1])
         else:
-            line_segment = LineString([self._shape.centroid, self.centroid + self._velocity])
-            interp_point = line_segment.interpolate(relative_distance, normalized=True)
-            x_offset = interp_point.x - self._shape.centroid.x
-            y_offset = interp_point.y - self._shape.centroid.y
-        self.translate(x_offset, y_offset)
+            self.translate(self._velocity[0] * relative_distance, self._velocity[1] * relative_distance)
 
     def move_backward(self, relative_distance=1):
         """
@@ -120,23 +162,41 @@ class Actor(ABC):
         :return: None, mutates in place
         """
         if relative_distance is None or relative_distance >= 1:
-            x_offset = self._velocity[0]
-            y_offset = self._velocity[1]
+            self.translate(-self._velocity[0], -self._velocity[1])
         else:
-            line_segment = LineString([self._shape.centroid, self.centroid + self._velocity])
-            interp_point = line_segment.interpolate(relative_distance, normalized=True)
-            x_offset = interp_point.x - self._shape.centroid.x
-            y_offset = interp_point.y - self._shape.centroid.y
-        self.translate(-x_offset, -y_offset)
+            self.translate(-self._velocity[0] * relative_distance, -self._velocity[1] * relative_distance)
 
     def translate(self, x_offset: float, y_offset: float) -> None:
         """
-        Shape will be translated by the offset amount
+        Shape will be translated in place by the offset amount
         :param x_offset: offset in x direction
         :param y_offset: offset in y direction
         :return: None
         """
-        self._shape = affinity.translate(self._shape, x_offset, y_offset)
+        self._primitive.translate(x_offset, y_offset)
+        self._geometry = None
+
+    def kinematic_state(self) -> Tuple[float, float, float, float, float]:
+        """
+        :return:  (center x, center y, velocity x, velocity y, velocity norm) of the actor, which is everything that
+                  changes as the game plays
+        """
+        center = self._primitive.center
+        return center[0], center[1], self._velocity[0], self._velocity[1], self._vnorm
+
+    def restore_kinematic_state(self, center_x: float, center_y: float, vel_x: float, vel_y: float,
+                                vnorm: float) -> None:
+        """
+        Puts the actor back exactly as it was when kinematic_state was called.  The velocity is not throttled again
+        :return: None
+        """
+        center = self._primitive.center
+        center[0] = center_x
+        center[1] = center_y
+        self._velocity[0] = vel_x
+        self._velocity[1] = vel_y
+        self._vnorm = vnorm
+        self._geometry = None
 
     def is_collision_enabled(self) -> bool:
         """
@@ -155,9 +215,12 @@ class StationaryActor(Actor, ABC):
     """
     Represents an actor with a fixed zero velocity
     """
+    __slots__ = ('static_geometry',)
 
-    def __init__(self, name: str, polygon: Polygon, collision_enabled: bool = True, rebound_enabled: bool = False):
-        super().__init__(name, polygon, Velocity(0, 0), collision_enabled, rebound_enabled)
+    def __init__(self, name: str, shape: Shape, collision_enabled: bool = True, rebound_enabled: bool = False):
+        super().__init__(name, shape, Velocity(0, 0), collision_enabled, rebound_enabled)
+        # the precomputed StaticGeometry of the actor, see static_geometry.StaticGeometryCache
+        self.static_geometry = None
 
     @property
     def velocity(self):
@@ -179,23 +242,31 @@ class StationaryActor(Actor, ABC):
 
 
 class Wall(StationaryActor):
-    def __init__(self, name: str, polygon: Polygon, collision_enabled: bool = True):
-        super().__init__(name, polygon, collision_enabled, rebound_enabled=False)
+    __slots__ = ()
+
+    def __init__(self, name: str, shape: Shape, collision_enabled: bool = True):
+        super().__init__(name, shape, collision_enabled, rebound_enabled=False)
 
 
 class Net(StationaryActor):
-    def __init__(self, name: str, polygon: Polygon):
-        super().__init__(name, polygon, collision_enabled=False, rebound_enabled=False)
+    __slots__ = ()
+
+    def __init__(self, name: str, shape: Shape):
+        super().__init__(name, shape, collision_enabled=False, rebound_enabled=False)
 
 
 class BackLine(StationaryActor):
-    def __init__(self, name: str, polygon: Polygon):
-        super().__init__(name, polygon, collision_enabled=False, rebound_enabled=False)
+    __slots__ = ()
+
+    def __init__(self, name: str, shape: Shape):
+        super().__init__(name, shape, collision_enabled=False, rebound_enabled=False)
 
 
 class Paddle(Actor):
-    def __init__(self, name: str, polygon: Polygon, velocity: Velocity, paddle_type: PaddleType):
-        super().__init__(name, polygon, velocity, collision_enabled=True, rebound_enabled=False)
+    __slots__ = ('paddle_type', '_max_paddle_speed', '_min_paddle_speed')
+
+    def __init__(self, name: str, shape: Shape, velocity: Velocity, paddle_type: PaddleType):
+        super().__init__(name, shape, velocity, collision_enabled=True, rebound_enabled=False)
         self.paddle_type = paddle_type
         self._max_paddle_speed = game_engine_config.max_paddle_speed
         self._min_paddle_speed = game_engine_config.min_paddle_speed
@@ -214,15 +285,17 @@ class BallFlavor(Enum):
 
 
 class Ball(Actor):
-    def __init__(self, name: str, polygon: Polygon, velocity: Velocity, flavor: BallFlavor):
+    __slots__ = ('_max_ball_speed', '_min_ball_speed', 'flavor')
+
+    def __init__(self, name: str, shape: Shape, velocity: Velocity, flavor: BallFlavor):
         """
         :param name:      an identifier for the ball
-        :param polygon:   shape of the ball
+        :param shape:     shape of the ball, normally a Circle
         :param velocity:  initial speed of the ball
         :param flavor:    the ball flavor.  Different flavored balls might have different collision models and effects
         on other actors
         """
-        super().__init__(name, polygon, velocity, collision_enabled=True, rebound_enabled=True)
+        super().__init__(name, shape, velocity, collision_enabled=True, rebound_enabled=True)
         self._max_ball_speed = game_engine_config.max_ball_speed
         self._min_ball_speed = game_engine_config.min_ball_speed
         self.flavor = flavor
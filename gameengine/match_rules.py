@@ -0,0 +1,105 @@
+from collections import namedtuple
+from enum import Enum
+from typing import Tuple
+
+from config.property_configurator import match_play_config, game_engine_config
+from gameengine.arena import Arena
+from proto_gen.gamemaster_pb2 import PaddleDirective
+
+"""
+ The rules of a match, independent of any rendering: how paddle directives move the paddles and when a rally is over.
+ A rally ends when the primary ball crosses a back line, which is a point for the opposite player, or when the ball
+ has changed direction too many times, which is a drawn point.  The renderer applies these rules every frame (see
+ rendersupport.ScoringManager), and planners and the replayer can apply the very same rules without a renderer.
+"""
+
+DEFAULT_PADDLE_SPEED = game_engine_config.default_paddle_speed
+
+paddle_directive_to_velocity = {
+    PaddleDirective.UP: (0, -DEFAULT_PADDLE_SPEED),
+    PaddleDirective.DOWN: (0, DEFAULT_PADDLE_SPEED),
+    PaddleDirective.STATIONARY: (0, 0)
+    }
+
+
+def get_paddle_velocity(paddle_directive: PaddleDirective) -> Tuple[int, int]:
+    """
+    :param paddle_directive:  a directive for paddle direction
+    :return:  the velocity as 2-tuple
+    """
+    return paddle_directive_to_velocity.get(paddle_directive, (0, 0))
+
+
+class Direction(Enum):
+    UNSET = 1
+    LEFT = 2
+    RIGHT = 3
+
+
+class PointOutcome(Enum):
+    # the rally continues
+    NONE = 1
+    # the ball crossed the right back line
+    LEFT_WINS = 2
+    # the ball crossed the left back line
+    RIGHT_WINS = 3
+    # the ball changed direction hits_for_draw times
+    DRAWN = 4
+
+
+# the counters of a rally, see RallyTracker.snapshot
+RallySnapshot = namedtuple('RallySnapshot', ['change_of_direction_count', 'last_ball_direction'])
+
+
+class RallyTracker:
+    __slots__ = ('change_of_direction_count', 'last_ball_direction', 'hits_for_draw')
+
+    def __init__(self, hits_for_draw: int = match_play_config.hits_for_draw):
+        """
+        :param hits_for_draw: the number of ball direction changes after which a point is drawn
+        """
+        self.change_of_direction_count: int = 0
+        self.last_ball_direction: Direction = Direction.UNSET
+        self.hits_for_draw = hits_for_draw
+
+    def update(self, arena: Arena) -> PointOutcome:
+        """
+        Called once per frame, after the actors have moved.  The rally counters are reset when a point is over,
+        resetting the arena is up to the caller
+        :param arena: the arena
+        :return: the outcome of the point
+        """
+        current_ball_direction = Direction.RIGHT if arena.primary_ball.velocity[0] > 0 else Direction.LEFT
+        if self.last_ball_direction is Direction.UNSET:
+            self.last_ball_direction = current_ball_direction
+
+        if self.last_ball_direction is not current_ball_direction:
+            self.change_of_direction_count += 1
+            self.last_ball_direction = current_ball_direction
+
+        primary_ball_x = arena.primary_ball.centroid[0]
+        if primary_ball_x < arena.left_back_line.centroid[0]:
+            outcome = PointOutcome.RIGHT_WINS
+        elif primary_ball_x > arena.right_back_line.centroid[0]:
+            outcome = PointOutcome.LEFT_WINS
+        elif self.change_of_direction_count >= self.hits_for_draw:
+            outcome = PointOutcome.DRAWN
+        else:
+            return PointOutcome.NONE
+
+        self.change_of_direction_count = 0
+        self.last_ball_direction = Direction.UNSET
+        return outcome
+
+    def snapshot(self) -> RallySnapshot:
+        """
+        :return: an immutable copy of the rally counters
+        """
+        return RallySnapshot(self.change_of_direction_count, self.last_ball_direction)
+
+    def restore(self, snapshot: RallySnapshot):
+        """
+        :param snapshot: rally counters from snapshot()
+        :return: None
+        """
+        self.change_of_direction_count, self.last_ball_direction = snapshot
@@ -10,7 +10,7 @@ logger = logging_configurator.get_logger(__name__)
 
 
 def update_paddle(paddle: Paddle, wall: Wall):
-    actors_intersect = paddle.shape.intersects(wall.shape)
+    actors_intersect = paddle.intersects(wall)
     if not actors_intersect:
         return
 
@@ -25,11 +25,11 @@ def update_paddle(paddle: Paddle, wall: Wall):
     if delta_vel_angle < math.pi / 2:
         while actors_intersect:
             paddle.move_backward(paddle_backup_distance)
-            actors_intersect = paddle.shape.intersects(wall.shape)
+            actors_intersect = paddle.intersects(wall)
     else:
         while actors_intersect:
             paddle.move_forward(paddle_backup_distance)
-            actors_intersect = paddle.shape.intersects(wall.shape)
+            actors_intersect = paddle.intersects(wall)
 
     # now set the paddle velocity to zero
     paddle.velocity = (0, 0)
@@ -0,0 +1,188 @@
+import math
+from abc import ABC, abstractmethod
+from typing import Tuple
+
+import numpy
+from shapely import affinity, ops
+from shapely.geometry import Point, Polygon, box
+from shapely.geometry.base import BaseGeometry
+
+"""
+ Lightweight shapes for the game actors.  Every shape keeps its center in a small numpy array that is updated in place
+ when the shape is translated, so moving an actor allocates nothing.  Shapely geometries are only built on demand for
+ the consumers that need them (proto translation, arbitrary polygon obstacles).
+"""
+
+# (min_x, min_y, max_x, max_y), the same ordering as shapely bounds
+Bounds = Tuple[float, float, float, float]
+
+
+class Primitive(ABC):
+    __slots__ = ('center',)
+
+    def __init__(self, center_x: float, center_y: float):
+        self.center = numpy.array([center_x, center_y], dtype=float)
+
+    def translate(self, x_offset: float, y_offset: float) -> None:
+        """
+        Moves the shape in place
+        :param x_offset: offset in x direction
+        :param y_offset: offset in y direction
+        :return: None
+        """
+        self.center[0] += x_offset
+        self.center[1] += y_offset
+
+    @property
+    @abstractmethod
+    def bounds(self) -> Bounds:
+        pass
+
+    @property
+    @abstractmethod
+    def area(self) -> float:
+        pass
+
+    @abstractmethod
+    def nearest_point(self, x: float, y: float) -> Tuple[float, float]:
+        """
+        :return: the point of the shape closest to (x, y)
+        """
+        pass
+
+    @abstractmethod
+    def to_geometry(self) -> BaseGeometry:
+        """
+        :return: a newly built shapely geometry of the shape at its current position
+        """
+        pass
+
+    def intersects(self, other: 'Primitive') -> bool:
+        """
+        :param other: another shape
+        :return: True if the shapes overlap or touch
+        """
+        return _intersects(self, other)
+
+
+class Circle(Primitive):
+    __slots__ = ('radius',)
+
+    def __init__(self, center_x: float, center_y: float, radius: float):
+        super().__init__(center_x, center_y)
+        self.radius = float(radius)
+
+    @property
+    def bounds(self) -> Bounds:
+        center_x, center_y = self.center
+        return center_x - self.radius, center_y - self.radius, center_x + self.radius, center_y + self.radius
+
+    @property
+    def area(self) -> float:
+        return math.pi * self.radius * self.radius
+
+    def nearest_point(self, x: float, y: float) -> Tuple[float, float]:
+        delta_x = x - self.center[0]
+        delta_y = y - self.center[1]
+        distance = math.hypot(delta_x, delta_y)
+        if distance <= self.radius:
+            return x, y
+        scale = self.radius / distance
+        return self.center[0] + delta_x * scale, self.center[1] + delta_y * scale
+
+    def to_geometry(self) -> BaseGeometry:
+        return Point(self.center[0], self.center[1]).buffer(self.radius)
+
+
+class Box(Primitive):
+    """
+    An axis aligned rectangle
+    """
+    __slots__ = ('half_width', 'half_height')
+
+    def __init__(self, min_x: float, min_y: float, max_x: float, max_y: float):
+        super().__init__((min_x + max_x) / 2., (min_y + max_y) / 2.)
+        self.half_width = (max_x - min_x) / 2.
+        self.half_height = (max_y - min_y) / 2.
+
+    @property
+    def bounds(self) -> Bounds:
+        center_x, center_y = self.center
+        return center_x - self.half_width, center_y - self.half_height, \
+            center_x + self.half_width, center_y + self.half_height
+
+    @property
+    def area(self) -> float:
+        return 4. * self.half_width * self.half_height
+
+    def nearest_point(self, x: float, y: float) -> Tuple[float, float]:
+        min_x, min_y, max_x, max_y = self.bounds
+        return min(max(x, min_x), max_x), min(max(y, min_y), max_y)
+
+    def to_geometry(self) -> BaseGeometry:
+        return box(*self.bounds)
+
+
+class PolygonPrimitive(Primitive):
+    """
+    Fallback for arbitrary polygons.  The polygon is kept relative to its centroid and is only translated into place
+    when a geometry is requested
+    """
+    __slots__ = ('_local_polygon', '_local_bounds')
+
+    def __init__(self, polygon: Polygon):
+        centroid = polygon.centroid
+        super().__init__(centroid.x, centroid.y)
+        self._local_polygon = affinity.translate(polygon, -centroid.x, -centroid.y)
+        self._local_bounds = self._local_polygon.bounds
+
+    @property
+    def bounds(self) -> Bounds:
+        center_x, center_y = self.center
+        min_x, min_y, max_x, max_y = self._local_bounds
+        return center_x + min_x, center_y + min_y, center_x + max_x, center_y + max_y
+
+    @property
+    def area(self) -> float:
+        return self._local_polygon.area
+
+    def nearest_point(self, x: float, y: float) -> Tuple[float, float]:
+        nearest, _ = ops.nearest_points(self.to_geometry(), Point(x, y))
+        return nearest.x, nearest.y
+
+    def to_geometry(self) -> BaseGeometry:
+        return affinity.translate(self._local_polygon, self.center[0], self.center[1])
+
+
+def primitive_from_geometry(geometry: BaseGeometry) -> Primitive:
+    """
+    :param geometry: a shapely polygon
+    :return: a Box if the polygon is an axis aligned rectangle, otherwise a PolygonPrimitive
+    """
+    if isinstance(geometry, Polygon) and not geometry.interiors and geometry.area > 0 and \
+            math.isclose(geometry.area, box(*geometry.bounds).area):
+        return Box(*geometry.bounds)
+    return PolygonPrimitive(geometry)
+
+
+def _bounds_overlap(bounds1: Bounds, bounds2: Bounds) -> bool:
+    return bounds1[0] <= bounds2[2] and bounds2[0] <= bounds1[2] and \
+        bounds1[1] <= bounds2[3] and bounds2[1] <= bounds1[3]
+
+
+def _circle_intersects(circle: Circle, other: Primitive) -> bool:
+    center_x, center_y = circle.center
+    nearest_x, nearest_y = other.nearest_point(center_x, center_y)
+    return (center_x - nearest_x) ** 2 + (center_y - nearest_y) ** 2 <= circle.radius * circle.radius
+
+
+def _intersects(shape1: Primitive, shape2: Primitive) -> bool:
+    if not _bounds_overlap(shape1.bounds, shape2.bounds):
+        return False
+    if isinstance(shape1, Box) and isinstance(shape2, Box):
+        return True
+    if isinstance(shape1, Circle) and not isinstance(shape2, PolygonPrimitive):
+        return _circle_intersects(shape1, shape2)
+    if isinstance(shape2, Circle) and not isinstance(shape1, PolygonPrimitive):
+        return _circle_intersects(shape2, shape1)
+    return shape1.to_geometry().intersects(shape2.to_geometry())
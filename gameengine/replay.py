@@ -0,0 +1,175 @@
+import struct
+import zlib
+from array import array
+from collections import namedtuple
+from typing import Callable, Optional
+
+from config import logging_configurator
+from gameengine.arena import Arena
+from gameengine.collision_engine import GameCollisionEngine
+from gameengine.match_rules import RallyTracker, PointOutcome, get_paddle_velocity
+from proto_gen.gamemaster_pb2 import PaddleDirective
+
+"""
+ Everything random about a match comes from the seed of the arena, and everything else comes from the paddle
+ directives of the players.  So a match is fully described by its seed and the left and right directive of every
+ frame, which is all a replay log holds, plus a hash of the arena state after every frame for verification.
+ The log is a header followed by one fixed size record per frame, so it can be appended to while a match is played:
+    header:  8 byte magic, 8 byte signed seed
+    frame:   1 byte with the left directive in the low nibble and the right directive in the high nibble,
+             4 byte crc32 of the arena state
+ An hour of play at 80 frames per second is under 1.5MB.  Replaying re-simulates the match headlessly, as fast as the
+ engine can go, and checks the state hash of every frame.
+"""
+
+logger = logging_configurator.get_logger(__name__)
+
+REPLAY_MAGIC = b'PONGRPL1'
+# signed, as a configured seed may be negative.  Drawn seeds are below 2 ** 63, so they are written the same either way
+HEADER_STRUCT = struct.Struct('<8sq')
+FRAME_STRUCT = struct.Struct('<BI')
+
+# everything in a replay log.  directives holds one packed byte per frame and state_hashes one crc32 per frame
+ReplayLog = namedtuple('ReplayLog', ['seed', 'directives', 'state_hashes'])
+
+# the tally of a replayed match
+ReplayResult = namedtuple('ReplayResult', ['frames', 'left_points', 'right_points', 'drawn_points'])
+
+
+class ReplayDivergenceError(Exception):
+    pass
+
+
+def pack_directives(left_directive: PaddleDirective, right_directive: PaddleDirective) -> int:
+    return left_directive | (right_directive << 4)
+
+
+def unpack_directives(packed_directives: int):
+    """
+    :return: (left directive, right directive)
+    """
+    return packed_directives & 0x0F, packed_directives >> 4
+
+
+def arena_state_hash(arena: Arena) -> int:
+    """
+    :param arena: the arena
+    :return: crc32 of the exact position and velocity of every moving actor
+    """
+    state = [value for actor in arena.moving_actors for value in actor.kinematic_state()]
+    return zlib.crc32(struct.pack(f'<{len(state)}d', *state))
+
+
+class MatchRecorder:
+    """
+    Appends every frame of a match to a replay log
+    """
+
+    def __init__(self, log_path: str, seed: int, flush_interval: int = 1000):
+        """
+        :param log_path:       the file to write the replay log to.  An existing file is overwritten
+        :param seed:           the seed of the arena
+        :param flush_interval: frames are written to the file in batches of this many frames
+        """
+        self.log_path = log_path
+        self.flush_interval = flush_interval
+        self.frame_count = 0
+        self._pending_frames = bytearray()
+        self._log_file = open(log_path, 'wb')
+        self._log_file.write(HEADER_STRUCT.pack(REPLAY_MAGIC, seed))
+        logger.info(f"Recording match with seed {seed} to {log_path}")
+
+    def record_frame(self, left_directive: PaddleDirective, right_directive: PaddleDirective, arena: Arena):
+        """
+        Call once per frame, after the physics and scoring of the frame are done
+        :param left_directive:  the directive applied to the left paddle for the frame
+        :param right_directive: the directive applied to the right paddle for the frame
+        :param arena:           the arena
+        :return: None
+        """
+        self._pending_frames += FRAME_STRUCT.pack(pack_directives(left_directive, right_directive),
+                                                  arena_state_hash(arena))
+        self.frame_count += 1
+        if self.frame_count % self.flush_interval == 0:
+            self.flush()
+
+    def flush(self):
+        self._log_file.write(self._pending_frames)
+        self._log_file.flush()
+        self._pending_frames = bytearray()
+
+    def close(self):
+        if not self._log_file.closed:
+            self.flush()
+            self._log_file.close()
+            logger.info(f"Recorded {self.frame_count} frames to {self.log_path}")
+
+
+def read_replay_log(log_path: str) -> ReplayLog:
+    """
+    :param log_path: a file written by a MatchRecorder
+    :return: the replay log.  A partially written last frame is ignored
+    """
+    with open(log_path, 'rb') as log_file:
+        contents = log_file.read()
+    magic, seed = HEADER_STRUCT.unpack_from(contents)
+    if magic != REPLAY_MAGIC:
+        raise ValueError(f"{log_path} is not a replay log")
+
+    frames = memoryview(contents)[HEADER_STRUCT.size:]
+    num_frames = len(frames) // FRAME_STRUCT.size
+    directives = bytearray(num_frames)
+    state_hashes = array('I', bytes(4 * num_frames))
+    for frame_index, (packed_directives, state_hash) in enumerate(
+            FRAME_STRUCT.iter_unpack(frames[:num_frames * FRAME_STRUCT.size])):
+        directives[frame_index] = packed_directives
+        state_hashes[frame_index] = state_hash
+    return ReplayLog(seed, bytes(directives), state_hashes)
+
+
+class MatchReplayer:
+    """
+    Re-simulates a recorded match without rendering
+    """
+
+    def __init__(self, game_engine: GameCollisionEngine, arena_factory: Callable[[int], Arena] = None):
+        """
+        :param game_engine:   the engine the match was played with.  It must be configured the same way, including
+                              its physics substeps, or the replay will diverge
+        :param arena_factory: builds the arena for a seed.  Defaults to the standard arena
+        """
+        self.game_engine = game_engine
+        self.arena_factory = arena_factory or (lambda seed: Arena(seed=seed))
+
+    def replay(self, replay_log: ReplayLog, verify: bool = True,
+               frame_callback: Optional[Callable[[int, Arena], None]] = None) -> ReplayResult:
+        """
+        :param replay_log:     the recorded match
+        :param verify:         if True, the arena state is checked against the recorded hash after every frame
+        :param frame_callback: called with the frame index and arena after every frame
+        :return: the tally of the match
+        :raises ReplayDivergenceError: if the state of a frame does not match the recording
+        """
+        arena = self.arena_factory(replay_log.seed)
+        rally_tracker = RallyTracker()
+        left_paddle, right_paddle = arena.paddles
+        points_by_outcome = {PointOutcome.LEFT_WINS: 0, PointOutcome.RIGHT_WINS: 0, PointOutcome.DRAWN: 0}
+
+        for frame_index, packed_directives in enumerate(replay_log.directives):
+            left_directive, right_directive = unpack_directives(packed_directives)
+            left_paddle.velocity = get_paddle_velocity(left_directive)
+            right_paddle.velocity = get_paddle_velocity(right_directive)
+            self.game_engine.update_state(arena.actors)
+
+            outcome = rally_tracker.update(arena)
+            if outcome is not PointOutcome.NONE:
+                points_by_outcome[outcome] += 1
+                arena.reset_starting_positions()
+
+            if verify and arena_state_hash(arena) != replay_log.state_hashes[frame_index]:
+                raise ReplayDivergenceError(f"Replay diverged from the recording at frame {frame_index}")
+            if frame_callback:
+                frame_callback(frame_index, arena)
+
+        return ReplayResult(len(replay_log.directives), points_by_outcome[PointOutcome.LEFT_WINS],
+                            points_by_outcome[PointOutcome.RIGHT_WINS], points_by_outcome[PointOutcome.DRAWN])
@@ -0,0 +1,153 @@
+import math
+from typing import List, Optional, Dict, Tuple
+
+from shapely.geometry import Polygon
+from shapely.prepared import prep
+
+from config import logging_configurator
+from gameengine.gameactors import Actor, StationaryActor
+from gameengine.primitives import Primitive, PolygonPrimitive, Bounds
+
+"""
+ Walls, nets, back lines and obstacles never move, so everything the collision code needs to know about their shape
+ is calculated once when the arena is built: the line segments of the outline, the outward unit normal of each
+ segment, the bounding box and a shapely prepared geometry for fast intersection tests against arbitrary polygons.
+ Rebounding a ball off a wall is then a nearest segment lookup followed by a dot product.
+"""
+
+logger = logging_configurator.get_logger(__name__)
+
+
+def reflect(velocity, normal: Tuple[float, float]) -> Tuple[float, float]:
+    """
+    Elastic collision where angle of incidence equals angle of reflection: Vnew = Vold - 2 <v|n> n_hat
+    :param velocity: any structure having a first and second indexable element
+    :param normal:   a unit normal of the surface being hit.  Its sign does not matter
+    :return: the reflected velocity
+    """
+    normal_x, normal_y = normal
+    normal_dot = velocity[0] * normal_x + velocity[1] * normal_y
+    return velocity[0] - 2 * normal_dot * normal_x, velocity[1] - 2 * normal_dot * normal_y
+
+
+def segment_normal(start_x: float, start_y: float, end_x: float, end_y: float) -> Tuple[float, float]:
+    """
+    :return: a unit normal of the segment.  This is the outward normal of a counter-clockwise ring
+    """
+    normal_x, normal_y = end_y - start_y, start_x - end_x
+    normal_norm = math.hypot(normal_x, normal_y)
+    return (normal_x / normal_norm, normal_y / normal_norm) if normal_norm > 0 else (0., 0.)
+
+
+class StaticGeometry:
+    """
+    The precomputed geometry of an actor that never moves
+    """
+    __slots__ = ('bounds', 'segments', 'normals', 'prepared', '_geometry', '_primitive')
+
+    def __init__(self, actor: Actor):
+        """
+        :param actor: a stationary actor
+        """
+        self._primitive = actor.primitive
+        self.bounds: Bounds = actor.bounds
+        geometry = actor.shape
+        self._geometry = geometry
+        self.prepared = prep(geometry)
+
+        # (start_x, start_y, delta_x, delta_y, length squared) of each segment of the outline, with its outward normal
+        self.segments: List[Tuple[float, float, float, float, float]] = []
+        self.normals: List[Tuple[float, float]] = []
+        if isinstance(geometry, Polygon):
+            ring = geometry.exterior
+            normal_sign = 1 if ring.is_ccw else -1
+            coords = list(ring.coords)
+            for (start_x, start_y), (end_x, end_y) in zip(coords[:-1], coords[1:]):
+                delta_x, delta_y = end_x - start_x, end_y - start_y
+                self.segments.append((start_x, start_y, delta_x, delta_y, delta_x * delta_x + delta_y * delta_y))
+                normal_x, normal_y = segment_normal(start_x, start_y, end_x, end_y)
+                self.normals.append((normal_sign * normal_x, normal_sign * normal_y))
+
+    def __getstate__(self):
+        # prepared geometries cannot be pickled or deep copied, so they are prepared again instead
+        return {name: getattr(self, name) for name in self.__slots__ if name != 'prepared'}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+        self.prepared = prep(self._geometry)
+
+    @property
+    def has_segments(self) -> bool:
+        return len(self.normals) > 0
+
+    def intersects(self, primitive: Primitive) -> bool:
+        """
+        :param primitive: the shape of another actor
+        :return: True if the shape overlaps or touches this geometry
+        """
+        min_x, min_y, max_x, max_y = primitive.bounds
+        if min_x > self.bounds[2] or self.bounds[0] > max_x or min_y > self.bounds[3] or self.bounds[1] > max_y:
+            return False
+        if isinstance(self._primitive, PolygonPrimitive):
+            return self.prepared.intersects(primitive.to_geometry())
+        return primitive.intersects(self._primitive)
+
+    def closest_segment(self, point) -> int:
+        """
+        :param point: any structure having a first and second indexable element
+        :return: the index of the first segment closest to the point
+        """
+        point_x, point_y = point[0], point[1]
+        closest_index, closest_distance_squared = 0, math.inf
+        for index, (start_x, start_y, delta_x, delta_y, length_squared) in enumerate(self.segments):
+            offset_x, offset_y = point_x - start_x, point_y - start_y
+            fraction = (offset_x * delta_x + offset_y * delta_y) / length_squared if length_squared > 0 else 0.
+            fraction = min(max(fraction, 0.), 1.)
+            distance_x, distance_y = offset_x - fraction * delta_x, offset_y - fraction * delta_y
+            distance_squared = distance_x * distance_x + distance_y * distance_y
+            if distance_squared < closest_distance_squared:
+                closest_index, closest_distance_squared = index, distance_squared
+        return closest_index
+
+    def rebound(self, velocity, segment_index: int) -> Tuple[float, float]:
+        """
+        :param velocity:      the velocity of an actor hitting this geometry
+        :param segment_index: the index of the segment being hit
+        :return: the velocity after rebounding off the segment
+        """
+        return reflect(velocity, self.normals[segment_index])
+
+
+class StaticGeometryCache:
+    """
+    The static geometry of every stationary actor of an arena.  Each stationary actor is also handed its own
+    geometry, so collision handlers can reach it without a lookup
+    """
+
+    def __init__(self, actors: List[Actor]):
+        """
+        :param actors: the actors of an arena.  Only the stationary actors are cached
+        """
+        self.actor_to_geometry: Dict[Actor, StaticGeometry] = {}
+        for actor in actors:
+            if isinstance(actor, StationaryActor):
+                actor.static_geometry = StaticGeometry(actor)
+                self.actor_to_geometry[actor] = actor.static_geometry
+        logger.debug(f"Cached static geometry for {len(self.actor_to_geometry)} stationary actors")
+
+    def get(self, actor: Actor) -> Optional[StaticGeometry]:
+        return self.actor_to_geometry.get(actor)
+
+
+def static_geometry_of(actor: Actor) -> StaticGeometry:
+    """
+    :param actor: an actor
+    :return: the cached geometry of a stationary actor.  Actors outside of an arena cache, or actors that move, have
+             their geometry calculated on the spot
+    """
+    if isinstance(actor, StationaryActor):
+        if actor.static_geometry is None:
+            actor.static_geometry = StaticGeometry(actor)
+        return actor.static_geometry
+    return StaticGeometry(actor)
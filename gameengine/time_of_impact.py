@@ -0,0 +1,181 @@
+import math
+from collections import namedtuple
+from typing import Optional, Tuple
+
+from gameengine.primitives import Bounds
+
+"""
+ Analytic time of impact calculations for the primitive shapes of the game: circles (balls) and axis aligned
+ boxes (paddles, walls).  Times are expressed as a fraction of a frame, the same unit as the velocity of an actor,
+ so a time of 0.5 means the impact happens halfway along the velocity vector.  All velocities are relative, so
+ callers should subtract the velocity of the second shape from the first.
+"""
+
+# time is the fraction of the velocity step at first contact and the normal points from the second shape
+# toward the first shape at the point of contact
+Impact = namedtuple('Impact', ['time', 'normal_x', 'normal_y'])
+
+Point = Tuple[float, float]
+
+
+def _earliest(first: Optional[Impact], second: Optional[Impact]) -> Optional[Impact]:
+    if first is None:
+        return second
+    if second is None:
+        return first
+    return first if first.time <= second.time else second
+
+
+def circle_circle_impact(center1: Point, center2: Point, relative_velocity: Point, combined_radius: float,
+                         max_time: float) -> Optional[Impact]:
+    """
+    :param center1:            center of the first circle
+    :param center2:            center of the second circle
+    :param relative_velocity:  velocity of the first circle minus the velocity of the second circle
+    :param combined_radius:    sum of the radii of both circles
+    :param max_time:           impacts after this time are ignored
+    :return: the impact, or None if the circles do not touch within max_time while approaching each other
+    """
+    delta_x = center1[0] - center2[0]
+    delta_y = center1[1] - center2[1]
+    vel_x, vel_y = relative_velocity
+    approach_rate = delta_x * vel_x + delta_y * vel_y
+    if approach_rate >= 0:
+        return None
+
+    # solve |delta + vel * t| = combined_radius for the smallest t
+    distance_squared = delta_x * delta_x + delta_y * delta_y
+    overlap = distance_squared - combined_radius * combined_radius
+    if overlap <= 0:
+        time = 0.
+    else:
+        speed_squared = vel_x * vel_x + vel_y * vel_y
+        discriminant = approach_rate * approach_rate - speed_squared * overlap
+        if discriminant < 0:
+            return None
+        time = (-approach_rate - math.sqrt(discriminant)) / speed_squared
+        if time > max_time:
+            return None
+
+    normal_x = delta_x + vel_x * time
+    normal_y = delta_y + vel_y * time
+    normal_norm = math.hypot(normal_x, normal_y)
+    if normal_norm == 0:
+        return None
+    return Impact(time, normal_x / normal_norm, normal_y / normal_norm)
+
+
+def _overlapping_box_normal(center: Point, bounds: Bounds) -> Point:
+    """
+    :return: the outward normal of the box face nearest to a point that lies within the box
+    """
+    min_x, min_y, max_x, max_y = bounds
+    face_distances = ((center[0] - min_x, (-1., 0.)),
+                      (max_x - center[0], (1., 0.)),
+                      (center[1] - min_y, (0., -1.)),
+                      (max_y - center[1], (0., 1.)))
+    return min(face_distances, key=lambda distance_normal: distance_normal[0])[1]
+
+
+def circle_box_impact(center: Point, relative_velocity: Point, radius: float, bounds: Bounds,
+                      max_time: float) -> Optional[Impact]:
+    """
+    The moving circle is swept against the box grown by the radius (a rounded box), which is four face segments
+    plus four corner circles
+    :param center:             center of the circle
+    :param relative_velocity:  velocity of the circle minus the velocity of the box
+    :param radius:             radius of the circle
+    :param bounds:             the box as (min_x, min_y, max_x, max_y)
+    :param max_time:           impacts after this time are ignored
+    :return: the impact, or None if the circle does not touch the box within max_time while approaching it
+    """
+    center_x, center_y = center
+    vel_x, vel_y = relative_velocity
+    min_x, min_y, max_x, max_y = bounds
+
+    # are we already overlapping?
+    nearest_x = min(max(center_x, min_x), max_x)
+    nearest_y = min(max(center_y, min_y), max_y)
+    delta_x = center_x - nearest_x
+    delta_y = center_y - nearest_y
+    distance_squared = delta_x * delta_x + delta_y * delta_y
+    if distance_squared <= radius * radius:
+        if distance_squared > 0:
+            distance = math.sqrt(distance_squared)
+            normal_x, normal_y = delta_x / distance, delta_y / distance
+        else:
+            normal_x, normal_y = _overlapping_box_normal(center, bounds)
+        if vel_x * normal_x + vel_y * normal_y < 0:
+            return Impact(0., normal_x, normal_y)
+        return None
+
+    impact = None
+    if vel_x > 0 and center_x <= min_x - radius:
+        time = (min_x - radius - center_x) / vel_x
+        if time <= max_time and min_y <= center_y + vel_y * time <= max_y:
+            impact = _earliest(impact, Impact(time, -1., 0.))
+    elif vel_x < 0 and center_x >= max_x + radius:
+        time = (max_x + radius - center_x) / vel_x
+        if time <= max_time and min_y <= center_y + vel_y * time <= max_y:
+            impact = _earliest(impact, Impact(time, 1., 0.))
+
+    if vel_y > 0 and center_y <= min_y - radius:
+        time = (min_y - radius - center_y) / vel_y
+        if time <= max_time and min_x <= center_x + vel_x * time <= max_x:
+            impact = _earliest(impact, Impact(time, 0., -1.))
+    elif vel_y < 0 and center_y >= max_y + radius:
+        time = (max_y + radius - center_y) / vel_y
+        if time <= max_time and min_x <= center_x + vel_x * time <= max_x:
+            impact = _earliest(impact, Impact(time, 0., 1.))
+
+    if impact is not None:
+        return impact
+
+    # no face was hit, so the only possibility left is one of the corners
+    for corner in ((min_x, min_y), (max_x, min_y), (min_x, max_y), (max_x, max_y)):
+        impact = _earliest(impact, circle_circle_impact(center, corner, relative_velocity, radius, max_time))
+    return impact
+
+
+def box_box_impact(bounds1: Bounds, bounds2: Bounds, relative_velocity: Point,
+                   max_time: float) -> Optional[Impact]:
+    """
+    :param bounds1:            the first (moving) box as (min_x, min_y, max_x, max_y)
+    :param bounds2:            the second box as (min_x, min_y, max_x, max_y)
+    :param relative_velocity:  velocity of the first box minus the velocity of the second box
+    :param max_time:           impacts after this time are ignored
+    :return: the impact, or None if the boxes do not touch within max_time while approaching each other
+    """
+    entry_time = -math.inf
+    exit_time = math.inf
+    normal = (0., 0.)
+    for axis in (0, 1):
+        velocity = relative_velocity[axis]
+        min1, max1 = bounds1[axis], bounds1[axis + 2]
+        min2, max2 = bounds2[axis], bounds2[axis + 2]
+        if velocity == 0:
+            if max1 < min2 or min1 > max2:
+                return None
+            continue
+        if velocity > 0:
+            axis_entry, axis_exit = (min2 - max1) / velocity, (max2 - min1) / velocity
+            axis_normal = -1.
+        else:
+            axis_entry, axis_exit = (max2 - min1) / velocity, (min2 - max1) / velocity
+            axis_normal = 1.
+        if axis_entry > entry_time:
+            entry_time = axis_entry
+            normal = (axis_normal, 0.) if axis == 0 else (0., axis_normal)
+        exit_time = min(exit_time, axis_exit)
+
+    if entry_time > exit_time or exit_time < 0 or entry_time > max_time or normal == (0., 0.):
+        return None
+    if entry_time <= 0:
+        # already touching, so only an impact if we are pushing into the second box
+        center_x = (bounds1[0] + bounds1[2]) / 2.
+        center_y = (bounds1[1] + bounds1[3]) / 2.
+        normal = _overlapping_box_normal((center_x, center_y), bounds2)
+        if relative_velocity[0] * normal[0] + relative_velocity[1] * normal[1] >= 0:
+            return None
+        return Impact(0., *normal)
+    return Impact(entry_time, *normal)
@@ -0,0 +1,290 @@
+import math
+from typing import List, Optional, Sequence, Tuple
+
+import numpy
+
+from config import logging_configurator
+from gameengine.arena import Arena
+from gameengine.batch_engine import BatchArenaEngine, LEFT, RIGHT
+from gameengine.gameactors import Actor, StationaryActor
+from gameengine.primitives import Circle, Box
+from gamerender.palette import ArenaPalette, DEFAULT_PALETTE, palette_index_of, ARENA, PRIMARY_BALL, PADDLE
+
+"""
+ Paints observation frames straight into preallocated numpy buffers, one palette index byte per pixel, with no pygame
+ and no SDL involved, so frames can be produced headless, off the game thread and for a whole batch of games at once.
+ The stationary actors are painted once into a background frame.  Every frame only the windows the moving actors
+ covered on the previous frame are restored from the background before the moving actors are painted again.
+ A frame can be downsampled by an integer factor: an output pixel then covers a downsample x downsample square of the
+ arena.  Boxes cover every output pixel they touch, so one pixel wide lines never vanish, while circles cover the
+ output pixels whose center falls inside them, plus the pixel holding their center.
+"""
+
+logger = logging_configurator.get_logger(__name__)
+
+# marks a pixel of the overlay frame that no stationary actor is painted on
+NO_OVERLAY = 255
+
+# the rows and columns of a frame covered by an actor
+Window = Tuple[slice, slice]
+
+
+def frame_shape(arena_width: int, arena_height: int, downsample: int) -> Tuple[int, int]:
+    """
+    :return: (rows, columns) of a frame of the arena
+    """
+    return math.ceil(arena_height / downsample), math.ceil(arena_width / downsample)
+
+
+def _span(low: float, high: float, downsample: int, limit: int) -> slice:
+    """
+    :return: the output pixels touched by [low, high] of the arena along one axis, clipped to [0, limit)
+    """
+    start = math.floor(low / downsample)
+    stop = max(math.ceil(high / downsample), start + 1)
+    return slice(min(max(start, 0), limit), min(max(stop, 0), limit))
+
+
+def _pixel_centers(window_slice: slice, downsample: int) -> numpy.ndarray:
+    """
+    :return: the arena coordinate of the center of every output pixel of the slice
+    """
+    return (numpy.arange(window_slice.start, window_slice.stop) + 0.5) * downsample
+
+
+def _polygon_mask(xs: numpy.ndarray, ys: numpy.ndarray, coords: Sequence[Tuple[float, float]]) -> numpy.ndarray:
+    """
+    Even-odd rule point in polygon test of every pixel center
+    :param xs:     pixel center x coordinates, shape (1, columns)
+    :param ys:     pixel center y coordinates, shape (rows, 1)
+    :param coords: the closed exterior ring of the polygon
+    :return: boolean mask of shape (rows, columns)
+    """
+    inside = numpy.zeros((ys.shape[0], xs.shape[1]), dtype=bool)
+    for (start_x, start_y), (end_x, end_y) in zip(coords[:-1], coords[1:]):
+        if start_y == end_y:
+            continue
+        straddles = (start_y > ys) != (end_y > ys)
+        crossing_x = start_x + (ys - start_y) * (end_x - start_x) / (end_y - start_y)
+        inside ^= straddles & (xs < crossing_x)
+    return inside
+
+
+def paint_actor(frame: numpy.ndarray, actor: Actor, palette_index: int, downsample: int) -> Optional[Window]:
+    """
+    :param frame:         the frame of palette indices to paint upon
+    :param actor:         the actor
+    :param palette_index: the palette index to paint the actor with
+    :param downsample:    the number of arena pixels per frame pixel along each axis
+    :return: the window of the frame that was painted, None if the actor is outside of the frame
+    """
+    rows, columns = frame.shape
+    min_x, min_y, max_x, max_y = actor.bounds
+    window = (_span(min_y, max_y, downsample, rows), _span(min_x, max_x, downsample, columns))
+    row_slice, column_slice = window
+    if row_slice.start >= row_slice.stop or column_slice.start >= column_slice.stop:
+        return None
+
+    primitive = actor.primitive
+    if isinstance(primitive, Box):
+        frame[window] = palette_index
+        return window
+
+    xs = _pixel_centers(column_slice, downsample)[numpy.newaxis, :]
+    ys = _pixel_centers(row_slice, downsample)[:, numpy.newaxis]
+    if isinstance(primitive, Circle):
+        center_x, center_y = primitive.center
+        mask = (xs - center_x) ** 2 + (ys - center_y) ** 2 <= primitive.radius ** 2
+        center_row, center_column = int(center_y // downsample), int(center_x // downsample)
+        if row_slice.start <= center_row < row_slice.stop and column_slice.start <= center_column < column_slice.stop:
+            mask[center_row - row_slice.start, center_column - column_slice.start] = True
+    else:
+        mask = _polygon_mask(xs, ys, list(actor.shape.exterior.coords))
+    frame[window][mask] = palette_index
+    return window
+
+
+class ArenaRasterizer:
+    """
+    Rasterizes the actors of an arena into a frame of palette indices
+    """
+
+    def __init__(self, arena: Arena, downsample: int = 1, palette: ArenaPalette = DEFAULT_PALETTE):
+        """
+        :param arena:      the arena
+        :param downsample: the number of arena pixels per frame pixel along each axis
+        :param palette:    the palette used to convert frames to grey scale or color
+        """
+        self.arena = arena
+        self.downsample = downsample
+        self.palette = palette
+        self.shape = frame_shape(arena.arena_width, arena.arena_height, downsample)
+
+        # the frame is painted in place, so every rasterize returns the very same buffer
+        self.frame = numpy.empty(self.shape, dtype=numpy.uint8)
+        self.background = numpy.full(self.shape, ARENA, dtype=numpy.uint8)
+        self.overlay = numpy.full(self.shape, NO_OVERLAY, dtype=numpy.uint8)
+        self._grey_frame = numpy.empty(self.shape, dtype=numpy.uint8)
+        self._color32_frame = numpy.empty(self.shape, dtype=numpy.uint32)
+
+        # a stationary actor later in the rendering order than a moving actor is also painted on the overlay, which
+        # is laid over the moving actors
+        self.has_overlay = False
+        moving_actor_seen = False
+        for actor in arena.actors:
+            if isinstance(actor, StationaryActor):
+                paint_actor(self.background, actor, palette_index_of(actor), downsample)
+                if moving_actor_seen:
+                    paint_actor(self.overlay, actor, palette_index_of(actor), downsample)
+                    self.has_overlay = True
+            else:
+                moving_actor_seen = True
+        self.frame[:] = self.background
+        self._painted_windows: List[Window] = []
+        # the windows changed since each converted frame was last brought up to date, None if all of it is stale
+        self._stale_grey_windows: Optional[List[Window]] = None
+        self._stale_color32_windows: Optional[List[Window]] = None
+        logger.debug(f"Rasterizing {self.shape[1]}x{self.shape[0]} frames, downsampled by {downsample}")
+
+    def rasterize(self) -> numpy.ndarray:
+        """
+        :return: the frame of palette indices, with shape (rows, columns).  This buffer is painted over by the next
+                 rasterize, copy it to keep it
+        """
+        frame = self.frame
+        for window in self._painted_windows:
+            frame[window] = self.background[window]
+
+        painted_windows = []
+        for actor in self.arena.moving_actors:
+            window = paint_actor(frame, actor, palette_index_of(actor), self.downsample)
+            if window is not None:
+                painted_windows.append(window)
+
+        if self.has_overlay:
+            for window in painted_windows:
+                overlay = self.overlay[window]
+                numpy.copyto(frame[window], overlay, where=overlay != NO_OVERLAY)
+
+        for stale_windows in (self._stale_grey_windows, self._stale_color32_windows):
+            if stale_windows is not None:
+                stale_windows.extend(self._painted_windows)
+                stale_windows.extend(painted_windows)
+        self._painted_windows = painted_windows
+        return frame
+
+    def _convert(self, lut: numpy.ndarray, converted_frame: numpy.ndarray, stale_windows: Optional[List[Window]]):
+        if stale_windows is None:
+            numpy.take(lut, self.frame, out=converted_frame, mode='clip')
+        else:
+            for window in stale_windows:
+                converted_frame[window] = lut[self.frame[window]]
+
+    def to_grey(self) -> numpy.ndarray:
+        """
+        :return: the last rasterized frame in grey scale.  The buffer is reused by the next call
+        """
+        self._convert(self.palette.grey, self._grey_frame, self._stale_grey_windows)
+        self._stale_grey_windows = []
+        return self._grey_frame
+
+    def to_color32(self) -> numpy.ndarray:
+        """
+        :return: the last rasterized frame in 32 bit color.  The buffer is reused by the next call
+        """
+        self._convert(self.palette.color32, self._color32_frame, self._stale_color32_windows)
+        self._stale_color32_windows = []
+        return self._color32_frame
+
+
+class BatchArenaRasterizer:
+    """
+    Rasterizes every game of a batch arena engine into one array of frames of palette indices
+    """
+
+    def __init__(self, batch_engine: BatchArenaEngine, downsample: int = 1, palette: ArenaPalette = DEFAULT_PALETTE):
+        """
+        :param batch_engine: the batch engine
+        :param downsample:   the number of arena pixels per frame pixel along each axis
+        :param palette:      the palette used to convert frames to grey scale or color
+        """
+        self.batch_engine = batch_engine
+        self.downsample = downsample
+        self.palette = palette
+        self.shape = frame_shape(batch_engine.arena_width, batch_engine.arena_height, downsample)
+        rows, columns = self.shape
+
+        # the batch engine has the walls, net and back lines of the standard arena
+        self.background = ArenaRasterizer(Arena(seed=0), downsample, palette).background
+        self.frames = numpy.empty((batch_engine.num_games,) + self.shape, dtype=numpy.uint8)
+        self.frames[:] = self.background
+        self._grey_frames = numpy.empty(self.frames.shape, dtype=numpy.uint8)
+        self._game_indices = numpy.arange(batch_engine.num_games)[:, numpy.newaxis, numpy.newaxis]
+
+        # every ball is painted within a square window of the same size, clipped to the frame
+        ball_radius = batch_engine.ball_radius
+        self.ball_window_size = min(math.ceil(2 * ball_radius / downsample) + 2, rows, columns)
+        self._window_offsets = numpy.arange(self.ball_window_size)
+        self._ball_window: Optional[Tuple[numpy.ndarray, numpy.ndarray]] = None
+
+        # the paddles only ever move up and down, so each paddle stays within a fixed band of columns
+        self.paddle_bands = tuple(_span(batch_engine.paddle_min_x[side], batch_engine.paddle_max_x[side], downsample,
+                                        columns) for side in (LEFT, RIGHT))
+        self._row_indices = numpy.arange(rows)
+
+    def _paint_balls(self):
+        engine = self.batch_engine
+        rows, columns = self.shape
+        downsample = self.downsample
+        radius = engine.ball_radius
+        center_x, center_y = engine.ball_position[:, 0], engine.ball_position[:, 1]
+
+        first_row = numpy.clip(numpy.floor((center_y - radius) / downsample).astype(int), 0,
+                               rows - self.ball_window_size)
+        first_column = numpy.clip(numpy.floor((center_x - radius) / downsample).astype(int), 0,
+                                  columns - self.ball_window_size)
+        window_rows = (first_row[:, numpy.newaxis] + self._window_offsets)[:, :, numpy.newaxis]
+        window_columns = (first_column[:, numpy.newaxis] + self._window_offsets)[:, numpy.newaxis, :]
+
+        offset_y = (window_rows + 0.5) * downsample - center_y[:, numpy.newaxis, numpy.newaxis]
+        offset_x = (window_columns + 0.5) * downsample - center_x[:, numpy.newaxis, numpy.newaxis]
+        mask = offset_x ** 2 + offset_y ** 2 <= radius ** 2
+        mask |= (window_rows == (center_y // downsample)[:, numpy.newaxis, numpy.newaxis]) & \
+                (window_columns == (center_x // downsample)[:, numpy.newaxis, numpy.newaxis])
+
+        window = (self._game_indices, window_rows, window_columns)
+        self.frames[window] = numpy.where(mask, PRIMARY_BALL, self.frames[window])
+        self._ball_window = (window_rows, window_columns)
+
+    def _paint_paddles(self):
+        engine = self.batch_engine
+        half_height = engine.paddle_half_height
+        for side, column_slice in zip((LEFT, RIGHT), self.paddle_bands):
+            paddle_y = engine.paddle_y[:, side, numpy.newaxis]
+            # the same coverage rule as paint_actor for a box: every row the paddle touches
+            first_row = numpy.floor((paddle_y - half_height) / self.downsample)
+            last_row = numpy.maximum(numpy.ceil((paddle_y + half_height) / self.downsample), first_row + 1)
+            covered_rows = (self._row_indices >= first_row) & (self._row_indices < last_row)
+            self.frames[:, :, column_slice][covered_rows] = PADDLE
+
+    def rasterize(self) -> numpy.ndarray:
+        """
+        :return: the frames of palette indices, with shape (games, rows, columns).  This buffer is painted over by the
+                 next rasterize, copy it to keep it
+        """
+        if self._ball_window is not None:
+            window_rows, window_columns = self._ball_window
+            self.frames[self._game_indices, window_rows, window_columns] = self.background[window_rows, window_columns]
+        for column_slice in self.paddle_bands:
+            self.frames[:, :, column_slice] = self.background[:, column_slice]
+
+        # the same rendering order as the arena: the ball, then the paddles
+        self._paint_balls()
+        self._paint_paddles()
+        return self.frames
+
+    def to_grey(self) -> numpy.ndarray:
+        """
+        :return: the last rasterized frames in grey scale.  The buffer is reused by the next call
+        """
+        return self.palette.to_grey(self.frames, out=self._grey_frames)
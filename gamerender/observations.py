@@ -0,0 +1,247 @@
+import math
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy
+
+from config import logging_configurator
+from gameengine.arena import Arena
+from gamerender.numpy_rasterizer import ArenaRasterizer, Window
+from gamerender.scorecards import ScoreKeeper
+from proto_gen.gamemaster_pb2 import GameState, ObservationSpec, ObservationMode, PixelFormat, PaddleType, \
+    FrameTransport, FrameEncoding, DeliveryPolicy
+from translators.proto_translations import PooledGameStateBuilder, ArenaFrameEncoder
+from translators.shared_frames import SharedFrameRing, is_shared_memory_available
+
+"""
+ Players choose what they observe when they register, see ObservationSpec in gamemaster.proto.  Every frame the game
+ state of each distinct observation is built once and shared by all players that asked for it, and only what some
+ player asked for is built at all.  The arena is rasterized once per downsampling that some player observes, and not
+ at all when no player observes pixels, so players that only look at the actors cost next to nothing per frame.
+ Frames go to the player inside the game state, or, for players on the same host, through a shared memory ring.
+ Game states are pooled, and handed back by the publisher once serialized, see PooledGameStateBuilder.
+"""
+
+logger = logging_configurator.get_logger(__name__)
+
+# (mode, greyscale, downsample, crop as (left, top, width, height) or None, frame transport, whether the delivery policy
+# drops game states).  Specs with the same key observe the same game state
+ObservationKey = Tuple[int, bool, int, Optional[Tuple[int, int, int, int]], int, bool]
+
+# players with these delivery policies miss game states, so their frames are never deltas, which would be against a
+# frame they may not have
+DROPPING_DELIVERY_POLICIES = (DeliveryPolicy.DROP_OLDEST, DeliveryPolicy.LATEST_ONLY)
+
+PIXEL_MODES = (ObservationMode.FULL, ObservationMode.PIXELS_ONLY)
+
+
+def observation_key(observation_spec: ObservationSpec, default_downsample: int,
+                    allow_shared_memory: bool = False) -> ObservationKey:
+    """
+    :param observation_spec:    the observation a player asked for
+    :param default_downsample:  the downsampling of frames when the spec leaves it unset
+    :param allow_shared_memory: if False, frames are sent over grpc whatever the transport asked for
+    :return: the key of the observation.  Pixel settings are ignored for modes without pixels
+    """
+    if observation_spec.mode not in PIXEL_MODES:
+        # stationary actors are sent at registration, so both modes without pixels send the very same actors
+        return ObservationMode.VECTOR_ONLY, False, 0, None, FrameTransport.GRPC, False
+    crop = None
+    if observation_spec.HasField('crop'):
+        crop_region = observation_spec.crop
+        crop = (crop_region.left, crop_region.top, crop_region.width, crop_region.height)
+    frame_transport = observation_spec.frame_transport if allow_shared_memory else FrameTransport.GRPC
+    # frames in shared memory are never deltas
+    is_dropping = frame_transport == FrameTransport.GRPC and \
+        observation_spec.delivery_policy in DROPPING_DELIVERY_POLICIES
+    return observation_spec.mode, observation_spec.greyscale, observation_spec.downsample or default_downsample, crop, \
+        frame_transport, is_dropping
+
+
+def crop_window(crop: Tuple[int, int, int, int], downsample: int, shape: Tuple[int, int]) -> Window:
+    """
+    :param crop:       (left, top, width, height) of a region of the arena, in arena pixels
+    :param downsample: the number of arena pixels per frame pixel along each axis
+    :param shape:      (rows, columns) of the frame
+    :return: the frame pixels covering the region, clipped to the frame
+    """
+    left, top, width, height = crop
+    rows, columns = shape
+    return (slice(min(top // downsample, rows), min(math.ceil((top + height) / downsample), rows)),
+            slice(min(left // downsample, columns), min(math.ceil((left + width) / downsample), columns)))
+
+
+class ObservationBuilder:
+    """
+    Builds the game state of one observation every frame
+    """
+
+    def __init__(self, arena: Arena, key: ObservationKey, rasterizer: Optional[ArenaRasterizer], pixel_format: int,
+                 frame_encoder: Optional[ArenaFrameEncoder], shared_memory_ring_slots: int = 0):
+        """
+        :param arena:                    the arena
+        :param key:                      the observation key
+        :param rasterizer:               the rasterizer of the downsampling of the observation.  None if it has no
+                                         pixels
+        :param pixel_format:             the PixelFormat of the server, used unless the observation is grey scale
+        :param frame_encoder:            packs the arena frames of this observation, and only of this observation
+        :param shared_memory_ring_slots: the slots of the shared frame ring of a SHARED_MEMORY observation
+        """
+        self.key = key
+        mode, greyscale, downsample, crop, frame_transport, _ = key
+        # the stationary actors are sent once, when the player registers
+        self.actors = () if mode == ObservationMode.PIXELS_ONLY else arena.moving_actors
+        self.game_state_builder = PooledGameStateBuilder(self.actors)
+        self.rasterizer = rasterizer
+        self.pixel_format = PixelFormat.GREY8 if greyscale else pixel_format
+        self.window: Optional[Window] = crop_window(crop, downsample, rasterizer.shape) if crop else None
+        self.frame_encoder = frame_encoder
+        self.frame_ring: Optional[SharedFrameRing] = None
+        if frame_transport == FrameTransport.SHARED_MEMORY:
+            frame_shape = rasterizer.frame[self.window].shape if self.window else rasterizer.shape
+            self.frame_ring = SharedFrameRing.create(shared_memory_ring_slots, frame_shape, self.pixel_format)
+
+    def pixels(self) -> numpy.ndarray:
+        """
+        :return: the pixels of the last rasterized frame, in the pixel format of the observation
+        """
+        if self.pixel_format == PixelFormat.PALETTE8:
+            pixels = self.rasterizer.frame
+        elif self.pixel_format == PixelFormat.GREY8:
+            pixels = self.rasterizer.to_grey()
+        else:
+            pixels = self.rasterizer.to_color32()
+        return pixels if self.window is None else pixels[self.window]
+
+    def build(self, state_iteration: int, scorekeeper: ScoreKeeper) -> GameState:
+        """
+        The rasterizer must have rasterized the frame already
+        :param state_iteration: the frame index
+        :param scorekeeper:     the scorekeeper
+        :return: the game state of the observation
+        """
+        builder = self.game_state_builder.start().update_game_actors()
+        builder.add_state_iteration(state_iteration)
+        if self.frame_ring is not None:
+            pixels = self.pixels()
+            arena_frame = builder.arena_frame
+            arena_frame.num_rows, arena_frame.num_cols = pixels.shape
+            arena_frame.pixel_format = self.pixel_format
+            arena_frame.encoding = FrameEncoding.SHARED_SLOT
+            arena_frame.shared_slot = self.frame_ring.write(pixels, state_iteration)
+        elif self.rasterizer is not None:
+            self.frame_encoder.encode_into(builder.arena_frame, self.pixels(), self.pixel_format, state_iteration)
+        builder.add_scorekeeper(scorekeeper)
+        return builder.build()
+
+    def release(self, game_state: GameState):
+        """
+        :param game_state: a game state built by this builder, once it has been serialized
+        :return: None
+        """
+        self.game_state_builder.release(game_state)
+
+
+class PlayerObservations:
+    """
+    Builds the game state observed by every player, once per distinct observation
+    """
+
+    def __init__(self, arena: Arena, arena_rasterizer: ArenaRasterizer, pixel_format: int,
+                 frame_encoder_factory: Callable[[], ArenaFrameEncoder] = ArenaFrameEncoder,
+                 shared_memory_ring_slots: int = 0):
+        """
+        :param arena:                    the arena
+        :param arena_rasterizer:         the rasterizer at the default downsampling of the server
+        :param pixel_format:             the PixelFormat of the arena frames, unless a player asks for grey scale
+        :param frame_encoder_factory:    creates the frame encoder of each observation with pixels sent over grpc.
+                                         Called with keyframe_interval=0 for players that drop game states
+        :param shared_memory_ring_slots: the slots of each shared frame ring.  Zero to send every frame over grpc
+        """
+        self.arena = arena
+        self.shared_memory_ring_slots = shared_memory_ring_slots
+        self.allow_shared_memory = shared_memory_ring_slots > 0 and is_shared_memory_available()
+        self.default_downsample = arena_rasterizer.downsample
+        self.pixel_format = pixel_format
+        self.frame_encoder_factory = frame_encoder_factory
+        self.rasterizer_by_downsample: Dict[int, ArenaRasterizer] = {arena_rasterizer.downsample: arena_rasterizer}
+
+        # only the rasterizers some observation uses are rasterized every frame
+        self.active_rasterizers: List[ArenaRasterizer] = []
+        self.builder_by_key: Dict[ObservationKey, ObservationBuilder] = {}
+        self.builder_by_paddle_type: Dict[PaddleType, ObservationBuilder] = {}
+
+    def add_player(self, paddle_type: PaddleType, observation_spec: ObservationSpec):
+        """
+        :param paddle_type:      the paddle of the player
+        :param observation_spec: what the player asked to observe
+        :return: None
+        """
+        key = observation_key(observation_spec, self.default_downsample, self.allow_shared_memory)
+        mode, _, downsample, _, frame_transport, is_dropping = key
+        if observation_spec.frame_transport != frame_transport and observation_spec.mode in PIXEL_MODES:
+            logger.warning(f"Shared memory frames are not available, sending the frames of the "
+                           f"{PaddleType.Name(paddle_type)} player over grpc")
+        builder = self.builder_by_key.get(key)
+        if builder is None:
+            rasterizer = None
+            frame_encoder = None
+            if mode in PIXEL_MODES:
+                rasterizer = self.rasterizer_by_downsample.get(downsample)
+                if rasterizer is None:
+                    rasterizer = ArenaRasterizer(self.arena, downsample)
+                    self.rasterizer_by_downsample[downsample] = rasterizer
+                if rasterizer not in self.active_rasterizers:
+                    self.active_rasterizers.append(rasterizer)
+                if frame_transport == FrameTransport.GRPC:
+                    # with no frames between keyframes, every frame decodes on its own
+                    frame_encoder = self.frame_encoder_factory(keyframe_interval=0) if is_dropping \
+                        else self.frame_encoder_factory()
+            builder = ObservationBuilder(self.arena, key, rasterizer, self.pixel_format, frame_encoder,
+                                         self.shared_memory_ring_slots)
+            self.builder_by_key[key] = builder
+        self.builder_by_paddle_type[paddle_type] = builder
+        logger.info(f"{PaddleType.Name(paddle_type)} player observes {ObservationMode.Name(observation_spec.mode)}, "
+                    f"{len(self.builder_by_key)} distinct observations")
+
+    def build_game_states(self, state_iteration: int, scorekeeper: ScoreKeeper) -> Dict[PaddleType, GameState]:
+        """
+        :param state_iteration: the frame index
+        :param scorekeeper:     the scorekeeper
+        :return: the game state of each player.  Players with the same observation get the very same game state.  The
+                 game states are reused once released, see release_game_states
+        """
+        for rasterizer in self.active_rasterizers:
+            rasterizer.rasterize()
+        game_state_by_key = {key: builder.build(state_iteration, scorekeeper)
+                             for key, builder in self.builder_by_key.items()}
+        return {paddle_type: game_state_by_key[builder.key]
+                for paddle_type, builder in self.builder_by_paddle_type.items()}
+
+    def release_game_states(self, game_state_by_paddle_type: Dict[PaddleType, GameState]):
+        """
+        Hands the game states of a frame back to their pools.  Called by the publisher once they are serialized
+        :param game_state_by_paddle_type: game states from build_game_states
+        :return: None
+        """
+        released_game_state_ids = set()
+        for paddle_type, game_state in game_state_by_paddle_type.items():
+            if id(game_state) not in released_game_state_ids:
+                released_game_state_ids.add(id(game_state))
+                self.builder_by_paddle_type[paddle_type].release(game_state)
+
+    def shared_frame_ring_of(self, paddle_type: PaddleType) -> Optional[SharedFrameRing]:
+        """
+        :param paddle_type: the paddle of a registered player
+        :return: the ring the frames of the player are written to, None if they are sent over grpc
+        """
+        return self.builder_by_paddle_type[paddle_type].frame_ring
+
+    def close(self):
+        """
+        Removes the shared frame rings
+        :return: None
+        """
+        for builder in self.builder_by_key.values():
+            if builder.frame_ring is not None:
+                builder.frame_ring.close()
+                builder.frame_ring = None
@@ -0,0 +1,74 @@
+import numpy
+
+from gameengine.arena import Arena
+from gamerender.numpy_rasterizer import ArenaRasterizer
+from gamerender.observations import PlayerObservations, observation_key
+from gamerender.scorecards import ScoreKeeper
+from paddles.paddle_utils import ArenaFrameDecoder
+from proto_gen.gamemaster_pb2 import GameState, ObservationSpec, PaddleType, PixelFormat, FrameEncoding, \
+    DeliveryPolicy, PlayerIdentifier
+from translators.proto_translations import ArenaFrameEncoder
+
+
+def delta_runs_encoder(**overrides) -> ArenaFrameEncoder:
+    return ArenaFrameEncoder(**{'frame_encoding': FrameEncoding.DELTA_RUNS, 'keyframe_interval': 100,
+                                'delta_from_keyframe': False, **overrides})
+
+
+def play_frames(right_spec: ObservationSpec, num_frames: int, delivered_every: int):
+    """
+    The left player observes everything and gets every frame, the right player only every delivered_every frame
+    :return: for the left and the right player, the encoding of every frame it got and whether it decoded to the frame
+             of the arena
+    """
+    arena = Arena(seed=1)
+    rasterizer = ArenaRasterizer(arena, 2)
+    player_observations = PlayerObservations(arena, rasterizer, PixelFormat.PALETTE8,
+                                             frame_encoder_factory=delta_runs_encoder)
+    player_observations.add_player(PaddleType.LEFT, ObservationSpec())
+    player_observations.add_player(PaddleType.RIGHT, right_spec)
+    scorekeeper = ScoreKeeper(PlayerIdentifier(player_name='left', paddle_type=PaddleType.LEFT),
+                              PlayerIdentifier(player_name='right', paddle_type=PaddleType.RIGHT))
+
+    decoder_by_paddle_type = {PaddleType.LEFT: ArenaFrameDecoder(), PaddleType.RIGHT: ArenaFrameDecoder()}
+    frames_by_paddle_type = {PaddleType.LEFT: [], PaddleType.RIGHT: []}
+    for frame_index in range(1, num_frames + 1):
+        arena.primary_ball.translate(3, 1)
+        game_state_by_paddle_type = player_observations.build_game_states(frame_index, scorekeeper)
+        expected_pixels = rasterizer.frame.copy()
+        for paddle_type, game_state in game_state_by_paddle_type.items():
+            if paddle_type == PaddleType.RIGHT and frame_index % delivered_every:
+                continue
+            received_game_state = GameState.FromString(game_state.SerializeToString())
+            pixels = decoder_by_paddle_type[paddle_type].decode(received_game_state)
+            frames_by_paddle_type[paddle_type].append(
+                (received_game_state.arena_frame.encoding,
+                 pixels is not None and numpy.array_equal(pixels, expected_pixels)))
+        player_observations.release_game_states(game_state_by_paddle_type)
+    return frames_by_paddle_type[PaddleType.LEFT], frames_by_paddle_type[PaddleType.RIGHT]
+
+
+def test_dropping_player_decodes_every_frame_it_gets():
+    left_frames, right_frames = play_frames(ObservationSpec(delivery_policy=DeliveryPolicy.LATEST_ONLY),
+                                            num_frames=60, delivered_every=3)
+
+    assert len(right_frames) == 20
+    assert all(is_decoded for _, is_decoded in right_frames)
+    assert FrameEncoding.DELTA_RUNS not in [encoding for encoding, _ in right_frames]
+    # the player that gets every frame still gets deltas
+    assert all(is_decoded for _, is_decoded in left_frames)
+    assert FrameEncoding.DELTA_RUNS in [encoding for encoding, _ in left_frames]
+
+
+def test_dropping_and_blocking_players_observe_apart():
+    blocking_key = observation_key(ObservationSpec(delivery_policy=DeliveryPolicy.BLOCK), 2)
+    drop_oldest_key = observation_key(ObservationSpec(delivery_policy=DeliveryPolicy.DROP_OLDEST), 2)
+    latest_only_key = observation_key(ObservationSpec(delivery_policy=DeliveryPolicy.LATEST_ONLY), 2)
+
+    assert blocking_key != drop_oldest_key
+    assert drop_oldest_key == latest_only_key
+
+
+if __name__ == "__main__":
+    test_dropping_player_decodes_every_frame_it_gets()
+    test_dropping_and_blocking_players_observe_apart()
@@ -0,0 +1,91 @@
+from typing import Tuple
+
+import numpy
+
+from config.property_configurator import game_render_config
+from gameengine.gameactors import Actor, Ball, BallFlavor, Paddle, Net, BackLine
+
+"""
+ Every color the arena can be drawn in, each with a small palette index.  Rasterized observations hold palette indices
+ rather than colors, one byte per pixel, and the lookup tables here turn a frame of indices into grey scale or 32 bit
+ color (0x00RRGGBB, the pixel format of a 32 bit pygame surface) with a single numpy take.
+ Nothing here needs pygame.
+"""
+
+color_config = game_render_config.color_config
+
+ARENA = 0
+PADDLE = 1
+PRIMARY_BALL = 2
+GROW_PADDLE_BALL = 3
+SHRINK_PADDLE_BALL = 4
+NET = 5
+BACKLINE = 6
+OBSTACLE = 7
+
+
+def palette_index_of(actor: Actor) -> int:
+    """
+    :param actor: an actor
+    :return: the palette index the actor is drawn with
+    """
+    if isinstance(actor, Paddle):
+        return PADDLE
+    if isinstance(actor, Ball):
+        if actor.flavor is BallFlavor.GROW_PADDLE:
+            return GROW_PADDLE_BALL
+        if actor.flavor is BallFlavor.SHRINK_PADDLE:
+            return SHRINK_PADDLE_BALL
+        return PRIMARY_BALL
+    if isinstance(actor, Net):
+        return NET
+    if isinstance(actor, BackLine):
+        return BACKLINE
+    return OBSTACLE
+
+
+class ArenaPalette:
+    def __init__(self, colors: Tuple[Tuple[int, int, int], ...]):
+        """
+        :param colors: the (r, g, b) color of each palette index, in palette index order
+        """
+        self.colors = tuple(tuple(color) for color in colors)
+        self.rgb = numpy.array(self.colors, dtype=numpy.uint8)
+        red, green, blue = (self.rgb[:, channel].astype(numpy.uint32) for channel in range(3))
+        self.color32 = (red << 16) | (green << 8) | blue
+        # ITU-R 601 luma, the weights PIL uses to convert rgb to its 'L' mode
+        self.grey = ((red * 299 + green * 587 + blue * 114) // 1000).astype(numpy.uint8)
+
+    def __len__(self):
+        return len(self.colors)
+
+    def color_of(self, actor: Actor) -> Tuple[int, int, int]:
+        return self.colors[palette_index_of(actor)]
+
+    def to_grey(self, indices: numpy.ndarray, out: numpy.ndarray = None) -> numpy.ndarray:
+        """
+        :param indices: an array of palette indices
+        :param out:     optional preallocated uint8 array the shape of indices
+        :return: the grey scale value of every index
+        """
+        return numpy.take(self.grey, indices, out=out, mode='clip')
+
+    def to_color32(self, indices: numpy.ndarray, out: numpy.ndarray = None) -> numpy.ndarray:
+        """
+        :param indices: an array of palette indices
+        :param out:     optional preallocated uint32 array the shape of indices
+        :return: the 32 bit color of every index
+        """
+        return numpy.take(self.color32, indices, out=out, mode='clip')
+
+    def to_rgb(self, indices: numpy.ndarray) -> numpy.ndarray:
+        """
+        :param indices: an array of palette indices
+        :return: an array the shape of indices with a trailing r, g, b axis
+        """
+        return self.rgb[indices]
+
+
+DEFAULT_PALETTE = ArenaPalette((color_config.arena_color, color_config.paddle_color, color_config.primary_ball_color,
+                                color_config.grow_paddle_ball_color, color_config.shrink_paddle_ball_color,
+                                color_config.net_color, color_config.backline_color, color_config.obstacle_color))
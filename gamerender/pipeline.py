@@ -0,0 +1,125 @@
+import threading
+from collections import namedtuple
+from queue import Queue, Full, Empty
+from typing import Optional, Tuple
+
+from config import logging_configurator
+from gameengine.arena import Arena
+from gamerender.observations import PlayerObservations
+from gamerender.publishing import GameStatePublisher
+from gamerender.scorecards import ScoreKeeper
+
+"""
+ Pipelined game states.  Rather than rasterizing and building the game states of a frame itself, the game thread
+ takes an immutable snapshot of the frame, the kinematic state of every moving actor plus the score, queues it and
+ moves on to the physics of the next frame.  A builder thread restores each snapshot into a copy of the arena of its
+ own, then rasterizes, builds and encodes the game states of the frame and hands them to the publisher.  Arena frames
+ are delta encoded and written to shared frame rings in order, so there is exactly one builder, and snapshots are
+ built in the order they were taken.  The publisher then serializes the game states on a thread of its own, so frame
+ N is serialized while frame N + 1 is built and frame N + 2 is simulated.
+"""
+
+logger = logging_configurator.get_logger(__name__)
+
+# how long stop waits for the builder thread to take the stop request, and then to build what is left
+PIPELINE_STOP_TIMEOUT_SECONDS = 5
+
+# a frame as the builder thread needs it.  actor_states is Arena.actor_states() and scorekeeper_snapshot is
+# ScoreKeeper.snapshot(), both immutable
+FrameSnapshot = namedtuple('FrameSnapshot', ['frame_index', 'actor_states', 'scorekeeper_snapshot'])
+
+
+class FramePipeline:
+    """
+    Builds the game states of each frame off the game thread, from snapshots of the frame
+    """
+
+    def __init__(self, observed_arena: Arena, player_observations: PlayerObservations,
+                 game_state_publisher: GameStatePublisher, max_pending_frames: int):
+        """
+        :param observed_arena:       a copy of the arena that the player observations are built upon.  Only the
+                                     builder thread moves its actors
+        :param player_observations:  builds the game states of every player from the observed arena
+        :param game_state_publisher: serializes and queues the built game states
+        :param max_pending_frames:   the game thread blocks once this many snapshots wait to be built
+        """
+        self.observed_arena = observed_arena
+        self.player_observations = player_observations
+        self.game_state_publisher = game_state_publisher
+        self._pending_snapshots: Queue = Queue(maxsize=max_pending_frames)
+        self._builder_thread: Optional[threading.Thread] = None
+
+        # the score is snapshot only when it changes.  The builder restores it into a scorekeeper of its own
+        self._scorekeeper: Optional[ScoreKeeper] = None
+        self._scorekeeper_version: int = 0
+        self._scorekeeper_snapshot: Optional[Tuple[Tuple[int, int, int, int], ...]] = None
+        self._observed_scorekeeper: Optional[ScoreKeeper] = None
+
+    def start(self, scorekeeper: ScoreKeeper):
+        """
+        :param scorekeeper: the scorekeeper of the game
+        :return: None
+        """
+        if self._builder_thread is None:
+            self._observed_scorekeeper = ScoreKeeper(*[scorecard.player_identifier
+                                                       for scorecard in scorekeeper.get_scorecards()])
+            self._builder_thread = threading.Thread(target=self._build_frames, name="game_state_builder",
+                                                    daemon=True)
+            self._builder_thread.start()
+            logger.info(f"Building game states off the game thread, up to {self._pending_snapshots.maxsize} frames "
+                        f"behind it")
+
+    def submit(self, frame_index: int, arena: Arena, scorekeeper: ScoreKeeper):
+        """
+        Called by the game thread once the frame is simulated and scored
+        :param frame_index: the frame index
+        :param arena:       the arena of the game
+        :param scorekeeper: the scorekeeper of the game
+        :return: None
+        """
+        if scorekeeper is not self._scorekeeper or scorekeeper.version != self._scorekeeper_version:
+            self._scorekeeper_snapshot = scorekeeper.snapshot()
+            self._scorekeeper, self._scorekeeper_version = scorekeeper, scorekeeper.version
+        self._pending_snapshots.put(FrameSnapshot(frame_index, arena.actor_states(), self._scorekeeper_snapshot))
+
+    def stop(self):
+        """
+        Builds the snapshots already submitted and stops the builder thread.  Gives up on a builder thread that is gone
+        or stuck, dropping the snapshots it did not build, so the game always gets to end
+        :return: None
+        """
+        if self._builder_thread is not None:
+            try:
+                self._pending_snapshots.put(None, timeout=PIPELINE_STOP_TIMEOUT_SECONDS)
+            except Full:
+                self._drop_pending_snapshots()
+                self._pending_snapshots.put_nowait(None)
+            self._builder_thread.join(timeout=PIPELINE_STOP_TIMEOUT_SECONDS)
+            if self._builder_thread.is_alive():
+                logger.warning(f"The game state builder did not stop within {PIPELINE_STOP_TIMEOUT_SECONDS} seconds, "
+                               f"leaving it behind")
+            self._builder_thread = None
+
+    def _drop_pending_snapshots(self):
+        dropped_count = 0
+        try:
+            while True:
+                self._pending_snapshots.get_nowait()
+                dropped_count += 1
+        except Empty:
+            pass
+        logger.warning(f"The game state builder is not keeping up, dropped the last {dropped_count} frames")
+
+    def _build_frames(self):
+        restored_scorekeeper_snapshot = None
+        while True:
+            frame_snapshot: Optional[FrameSnapshot] = self._pending_snapshots.get()
+            if frame_snapshot is None:
+                return
+            self.observed_arena.restore_actor_states(frame_snapshot.actor_states)
+            if frame_snapshot.scorekeeper_snapshot is not restored_scorekeeper_snapshot:
+                self._observed_scorekeeper.restore(frame_snapshot.scorekeeper_snapshot)
+                restored_scorekeeper_snapshot = frame_snapshot.scorekeeper_snapshot
+            self.game_state_publisher.publish(
+                self.player_observations.build_game_states(frame_snapshot.frame_index, self._observed_scorekeeper),
+                self.player_observations.release_game_states)
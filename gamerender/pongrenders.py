@@ -1,4 +1,5 @@
 # to get rid of alsa sound errors: see https://raspberrypi.stackexchange.com/questions/83254/pygame-and-alsa-lib-error
+import copy
 import os
 import sys
 from queue import Queue
@@ -8,23 +9,33 @@ from pygame.time import Clock
 from gamerender.caches import CachedScoreFontImages
 from gamerender.rendersupport import ScorePaneManager, MetaPaneManager, ArenaPaneManager, PaddleManager, \
     RegistrationManager, RegisteredPlayer, ScoringManager
-from translators.proto_translations import GameStateBuilder
+from config.property_configurator import game_render_config
+from translators.proto_translations import ArenaFrameEncoder
 
 os.environ['SDL_AUDIODRIVER'] = 'dsp'
 
+# when running headless there is no window, so make sure SDL never goes looking for a display
+if game_render_config.is_headless:
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
 from collections import namedtuple
 from threading import RLock
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 
 import pygame
 from pygame import font
 
 from config import logging_configurator
-from config.property_configurator import game_render_config
 from gameengine.arena import Arena
 from gameengine.collision_engine import GameCollisionEngine
+from gameengine.replay import MatchRecorder
+from gamerender.numpy_rasterizer import ArenaRasterizer
+from gamerender.observations import PlayerObservations
+from gamerender.pipeline import FramePipeline
+from gamerender.publishing import GameStatePublisher
 from gamerender.scorecards import ScoreKeeper
-from proto_gen.gamemaster_pb2 import PlayerIdentifier, PaddleType, PaddleAction, PaddleDirective
+from proto_gen.gamemaster_pb2 import PlayerIdentifier, PaddleType, PaddleAction, PaddleDirective, PixelFormat, \
+    ObservationSpec
 
 logger = logging_configurator.get_logger(__name__)
 color_config = game_render_config.color_config
@@ -44,20 +55,37 @@ GamePane = namedtuple("GamePane", ['surface', 'pos'])
 # game is capped at this fps
 FPS_CAP: int = game_render_config.fps_cap
 
+# in headless mode, frames are logged at this interval so we can see the uncapped frame rate
+HEADLESS_FPS_LOG_INTERVAL: int = 10000
+
 
 class DefaultPongRenderer:
     def __init__(self, arena: Arena, game_engine: GameCollisionEngine,
                  left_paddle_queue: Queue, right_paddle_queue: Queue,
-                 left_game_state_queue: Queue, right_game_state_queue):
+                 game_state_publisher: GameStatePublisher, headless: bool = False,
+                 replay_log_path: Optional[str] = None, pixel_format: int = PixelFormat.COLOR32,
+                 frame_encoder_factory: Callable[[], ArenaFrameEncoder] = ArenaFrameEncoder,
+                 shared_memory_ring_slots: int = 0, pipeline_depth: int = 0):
         """
 
         :param arena:                This contains all the actors
         :param game_engine:          Provices the collision physics
         :param left_paddle_queue:    Thread safe queue for incoming left paddle actions
         :param right_paddle_queue:   Thread safe queue for incoming right paddle actions
-        :param left_game_state_queue:     Thread safe queue for outgoing game state to left paddle player
-        :param right_game_state_queue:     Thread safe queue for outgoing game state to right paddle player
+        :param game_state_publisher: Serializes the outgoing game states off the game thread and queues them for
+                                     the players
+        :param headless:             If true, no window is opened, there is no commencement countdown, nothing is
+                                     drawn to the canvas and the frame rate is uncapped
+        :param replay_log_path:      If set, the match is recorded to this file so it can be replayed and verified
+        :param pixel_format:         The PixelFormat of the arena frames sent to players
+        :param frame_encoder_factory: Creates the encoder that packs the arena frames of each distinct observation.
+                                     Defaults to raw frames
+        :param shared_memory_ring_slots: The slots of the shared memory ring of each observation whose frames are
+                                     written to shared memory.  Zero to send every frame over grpc
+        :param pipeline_depth:       If above zero, the game states are built off the game thread, which runs at most
+                                     this many frames ahead of them.  See gamerender.pipeline
         """
+        self.headless = headless
         self.score_pane_manager = ScorePaneManager()
         self.meta_pane_manager = MetaPaneManager()
         self.arena_pane_manager = ArenaPaneManager()
@@ -69,8 +97,9 @@ class DefaultPongRenderer:
         self.game_engine = game_engine
         self.left_paddle_queue = left_paddle_queue
         self.right_paddle_queue = right_paddle_queue
-        self.left_game_state_queue = left_game_state_queue
-        self.right_game_state_queue = right_game_state_queue
+        self.game_state_publisher = game_state_publisher
+        # set by stop_game, from any thread
+        self.stop_requested = False
 
         self.scoreboard_font_info = game_render_config.score_board_font
         self.registration_font_info = game_render_config.registration_font
@@ -100,7 +129,9 @@ class DefaultPongRenderer:
         self.canvas_height = game_render_config.score_board_height + game_render_config.generic_spacer + \
                              game_render_config.meta_board_height + game_render_config.generic_spacer + \
                              self.arena.arena_height + game_render_config.generic_spacer
-        self.canvas = pygame.display.set_mode([self.canvas_width, self.canvas_height], depth=32)
+        self.canvas = None if headless else pygame.display.set_mode([self.canvas_width, self.canvas_height],
+                                                                    depth=32)
+        self.fps_cap = 0 if headless else FPS_CAP
 
         # create the scoreboard surface, meta-data surface, and arena surface and record their positions on the canvas
         score_y_pos = 0
@@ -112,6 +143,17 @@ class DefaultPongRenderer:
                                       (0, metadata_y_pos))
         self.arena_pane = GamePane(pygame.Surface((self.arena.arena_width, self.arena.arena_height)), (0, arena_y_pos))
 
+        # players get their pixel frames from the numpy rasterizer, never from the canvas.  A pipeline builds them
+        # from a copy of the arena, so the game thread can move the actors of the next frame in the meantime
+        self.observed_arena = copy.deepcopy(self.arena) if pipeline_depth else self.arena
+        self.arena_rasterizer = ArenaRasterizer(self.observed_arena, game_render_config.observation_downsample)
+        self.player_observations = PlayerObservations(self.observed_arena, self.arena_rasterizer, pixel_format,
+                                                      frame_encoder_factory, shared_memory_ring_slots)
+        self.frame_pipeline: Optional[FramePipeline] = None
+        if pipeline_depth:
+            self.frame_pipeline = FramePipeline(self.observed_arena, self.player_observations,
+                                                self.game_state_publisher, pipeline_depth)
+
         # dict to track registerd players.  key is paddle type and value is registered player
         self.registered_player_by_paddle_type: Dict[PaddleType, RegisteredPlayer] = {}
         self.cached_score_fonts_by_paddle_type: Dict[PaddleType, CachedScoreFontImages] = {}
@@ -138,12 +180,17 @@ class DefaultPongRenderer:
         self.left_paddle_action: Optional[PaddleAction] = None
         self.right_paddle_action: Optional[PaddleAction] = None
 
-    def register_player(self, player: PlayerIdentifier) -> bool:
+        # records the match, see gameengine.replay
+        self.replay_log_path = replay_log_path
+        self.match_recorder: Optional[MatchRecorder] = None
+
+    def register_player(self, player: PlayerIdentifier, observation_spec: Optional[ObservationSpec] = None) -> bool:
         """
-        :param player:  a player identifier
+        :param player:           a player identifier
+        :param observation_spec: what the player is sent every frame.  Defaults to the full observation
         :return: True if player successfully registered otherwise false
         """
-        return self.registration_manager.register_player(self, player)
+        return self.registration_manager.register_player(self, player, observation_spec or ObservationSpec())
 
     def render_commencement(self):
         blit_rectangle = None
@@ -168,6 +215,14 @@ class DefaultPongRenderer:
         blitted_rectangles.extend(self.arena_pane_manager.visit(self))
         return blitted_rectangles
 
+    def update_display(self):
+        """
+        Refreshes the display.  When headless, there is no display to refresh
+        :return: None
+        """
+        if not self.headless:
+            pygame.display.update(self.update_panes())
+
     def initialize_paddle_actions(self):
         self.left_paddle_action = PaddleAction(
             player_identifier=self.registered_player_by_paddle_type[PaddleType.LEFT].player_id,
@@ -185,19 +240,32 @@ class DefaultPongRenderer:
         registered_player_ids = [player.player_id for player in self.registered_player_by_paddle_type.values()]
         self.scorekeeper = ScoreKeeper(*registered_player_ids)
 
+        if self.headless:
+            return
+
         for paddle_type, registered_player in self.registered_player_by_paddle_type.items():
             scorecard = self.scorekeeper.get_scorecard(registered_player.player_id)
             self.cached_score_fonts_by_paddle_type[paddle_type].update(scorecard)
 
     def send_game_state(self):
-        builder = GameStateBuilder()
-        for actor in self.arena.actors: builder.add_game_actor(actor)
-        builder.add_state_iteration(self.frame_index)
-        builder.add_arena_surface(self.arena_pane.surface)
-        builder.add_scorekeeper(self.scorekeeper)
-        game_state = builder.build()
-        self.left_game_state_queue.put(game_state)
-        self.right_game_state_queue.put(game_state)
+        if self.frame_pipeline is not None:
+            self.frame_pipeline.submit(self.frame_index, self.arena, self.scorekeeper)
+            return
+        self.game_state_publisher.publish(
+            self.player_observations.build_game_states(self.frame_index, self.scorekeeper),
+            self.player_observations.release_game_states)
+
+    def stop_game(self):
+        """
+        Ends the game loop of start_game, from any thread.  No more game states are published, and the game thread
+        stops the pipeline and closes the observations on its way out
+        :return: None
+        """
+        self.stop_requested = True
+        self.game_state_publisher.stop()
+        # the game thread may be waiting for paddle actions, see PaddleManager
+        for paddle_queue in (self.left_paddle_queue, self.right_paddle_queue):
+            paddle_queue.put(PaddleAction(paddle_directive=PaddleDirective.STATIONARY))
 
     def start_game(self):
         with game_lock:
@@ -213,26 +281,46 @@ class DefaultPongRenderer:
         logger.info("GAME COMMENCING")
         self.initialize_paddle_actions()
         self.initialize_scoring()
-        self.render_commencement()
+        self.game_state_publisher.start()
+        if self.frame_pipeline is not None:
+            self.frame_pipeline.start(self.scorekeeper)
+        if not self.headless:
+            self.render_commencement()
         self.fps_clock = pygame.time.Clock()
-        pygame.display.update(self.update_panes())
+        self.update_display()
+
+        if self.replay_log_path:
+            self.match_recorder = MatchRecorder(self.replay_log_path, self.arena.seed)
 
         logger.debug("Sending first game state")
         self.send_game_state()
 
-        while True:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-
-            logger.debug("Getting paddle actions")
-            self.paddle_manager.visit(self)
-
-            logger.debug("Updating game state")
-            self.game_engine.update_state(self.arena.actors)
-            pygame.display.update(self.update_panes())
-            self.scoring_manager.update_score(self)
-            self.frame_index += 1
-            self.send_game_state()
-            self.fps_clock.tick(FPS_CAP)
+        try:
+            while not self.stop_requested:
+                if not self.headless:
+                    for event in pygame.event.get():
+                        if event.type == pygame.QUIT:
+                            pygame.quit()
+                            sys.exit()
+
+                logger.debug("Getting paddle actions")
+                self.paddle_manager.visit(self)
+
+                logger.debug("Updating game state")
+                self.game_engine.update_state(self.arena.actors)
+                self.update_display()
+                self.scoring_manager.update_score(self)
+                if self.match_recorder:
+                    self.match_recorder.record_frame(self.left_paddle_action.paddle_directive,
+                                                     self.right_paddle_action.paddle_directive, self.arena)
+                self.frame_index += 1
+                self.send_game_state()
+                self.fps_clock.tick(self.fps_cap)
+                if self.headless and self.frame_index % HEADLESS_FPS_LOG_INTERVAL == 0:
+                    logger.info(f"Headless frame {self.frame_index} at {int(self.fps_clock.get_fps())} fps")
+        finally:
+            if self.match_recorder:
+                self.match_recorder.close()
+            if self.frame_pipeline is not None:
+                self.frame_pipeline.stop()
+            self.player_observations.close()
@@ -0,0 +1,128 @@
+import threading
+from queue import Queue, Full
+from typing import Callable, Dict, Optional
+
+from config import logging_configurator
+from proto_gen.gamemaster_pb2 import GameState, PaddleType
+from translators.proto_translations import frame_game_state
+
+"""
+ The game thread hands the game states of every frame to a publisher and moves on.  On a thread of its own, the
+ publisher serializes each distinct game state exactly once and puts the very same bytes on the queue of every player
+ observing it.  The bytes are framed as an entry of a GameStateBuffer (see proto_translations.frame_game_state), so the
+ servicer streams buffers by joining them, and grpc sends them without serializing anything again.  More players
+ observing the same game state cost a queue put each, not a serialization each.  Once serialized, the game states
+ can be handed back to whoever built them for reuse.
+"""
+
+logger = logging_configurator.get_logger(__name__)
+
+# how often a put on a full game state queue checks whether the publisher was stopped
+STOP_POLL_SECONDS = 0.1
+
+# how long stop waits for the serializer thread
+PUBLISHER_STOP_TIMEOUT_SECONDS = 5
+
+
+class GameStatePublisher:
+    """
+    Serializes the game states of every frame off the game thread and fans the bytes out to the player queues
+    """
+
+    def __init__(self, left_game_state_queue: Queue, right_game_state_queue: Queue, max_pending_frames: int = 0):
+        """
+        :param left_game_state_queue:  Thread safe queue for outgoing serialized game states to left paddle player
+        :param right_game_state_queue: Thread safe queue for outgoing serialized game states to right paddle player
+        :param max_pending_frames:     The game thread blocks once this many frames wait to be serialized.  Zero for
+                                       no limit
+        """
+        self.game_state_queue_by_paddle_type: Dict[PaddleType, Queue] = {PaddleType.LEFT: left_game_state_queue,
+                                                                         PaddleType.RIGHT: right_game_state_queue}
+        self._pending_frames: Queue = Queue(maxsize=max_pending_frames)
+        self._serializer_thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def set_game_state_queue(self, paddle_type: PaddleType, game_state_queue: Queue):
+        """
+        Only before the first frame is published
+        :param paddle_type:      the paddle of a player
+        :param game_state_queue: the queue the game states of the player are put on from now on
+        :return: None
+        """
+        self.game_state_queue_by_paddle_type[paddle_type] = game_state_queue
+
+    def start(self):
+        if self._serializer_thread is None:
+            self._serializer_thread = threading.Thread(target=self._serialize_frames, name="game_state_serializer",
+                                                       daemon=True)
+            self._serializer_thread.start()
+
+    def publish(self, game_state_by_paddle_type: Dict[PaddleType, GameState],
+                release: Optional[Callable[[Dict[PaddleType, GameState]], None]] = None):
+        """
+        The game states must not be changed once published, until they are released
+        :param game_state_by_paddle_type: the game state of each player for one frame.  Players observing the same
+                                          game state should be given the very same object
+        :param release:                   called with the game states, on the serializer thread, once they are
+                                          serialized
+        :return: None
+        """
+        if self._stopped.is_set():
+            return
+        self._pending_frames.put((game_state_by_paddle_type, release))
+
+    def stop(self):
+        """
+        Stops putting game states on the player queues, even on a full BLOCK queue of a player that is gone.  Frames
+        published from now on are dropped
+        :return: None
+        """
+        self._stopped.set()
+        if self._serializer_thread is not None:
+            try:
+                # the serializer drops what is pending once stopped, so there is soon room
+                self._pending_frames.put(None, timeout=PUBLISHER_STOP_TIMEOUT_SECONDS)
+            except Full:
+                pass
+            self._serializer_thread.join(timeout=PUBLISHER_STOP_TIMEOUT_SECONDS)
+            if self._serializer_thread.is_alive():
+                logger.warning(f"The game state serializer did not stop within {PUBLISHER_STOP_TIMEOUT_SECONDS} "
+                               f"seconds, leaving it behind")
+            self._serializer_thread = None
+
+    def serialize_frame(self, game_state_by_paddle_type: Dict[PaddleType, GameState]) -> Dict[PaddleType, bytes]:
+        """
+        :param game_state_by_paddle_type: the game state of each player for one frame
+        :return: the framed bytes of each player.  A game state shared by players is serialized once
+        """
+        framed_game_state_by_id: Dict[int, bytes] = {}
+        framed_game_state_by_paddle_type: Dict[PaddleType, bytes] = {}
+        for paddle_type, game_state in game_state_by_paddle_type.items():
+            framed_game_state = framed_game_state_by_id.get(id(game_state))
+            if framed_game_state is None:
+                framed_game_state = frame_game_state(game_state.SerializeToString())
+                framed_game_state_by_id[id(game_state)] = framed_game_state
+            framed_game_state_by_paddle_type[paddle_type] = framed_game_state
+        return framed_game_state_by_paddle_type
+
+    def _put_until_stopped(self, game_state_queue: Queue, framed_game_state: bytes):
+        while not self._stopped.is_set():
+            try:
+                game_state_queue.put(framed_game_state, timeout=STOP_POLL_SECONDS)
+                return
+            except Full:
+                pass
+
+    def _serialize_frames(self):
+        while True:
+            pending_frame = self._pending_frames.get()
+            if pending_frame is None:
+                return
+            if self._stopped.is_set():
+                continue
+            game_state_by_paddle_type, release = pending_frame
+            framed_game_state_by_paddle_type = self.serialize_frame(game_state_by_paddle_type)
+            if release is not None:
+                release(game_state_by_paddle_type)
+            for paddle_type, framed_game_state in framed_game_state_by_paddle_type.items():
+                self._put_until_stopped(self.game_state_queue_by_paddle_type[paddle_type], framed_game_state)
@@ -0,0 +1,31 @@
+import threading
+from queue import Queue
+
+from gamerender.publishing import GameStatePublisher
+from proto_gen.gamemaster_pb2 import GameState, PaddleType
+
+
+def test_stop_unblocks_a_full_player_queue():
+    left_game_state_queue = Queue(maxsize=1)
+    publisher = GameStatePublisher(left_game_state_queue, Queue(), max_pending_frames=2)
+    publisher.start()
+
+    # nobody takes the game states of the left player, so the publisher and then the game thread block
+    game_thread = threading.Thread(target=lambda: [
+        publisher.publish({PaddleType.LEFT: GameState(state_iteration=state_iteration)})
+        for state_iteration in range(10)], daemon=True)
+    game_thread.start()
+    game_thread.join(timeout=0.5)
+    assert game_thread.is_alive()
+
+    publisher.stop()
+    game_thread.join(timeout=1)
+    assert not game_thread.is_alive()
+    assert left_game_state_queue.qsize() == 1
+    # published once stopped, so dropped
+    publisher.publish({PaddleType.LEFT: GameState(state_iteration=10)})
+    assert left_game_state_queue.qsize() == 1
+
+
+if __name__ == "__main__":
+    test_stop_unblocks_a_full_player_queue()
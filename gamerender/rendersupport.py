@@ -1,20 +1,23 @@
 from __future__ import annotations
 
+import math
 from collections import namedtuple
-from enum import Enum
 from queue import Empty
 from threading import RLock
-from typing import TYPE_CHECKING, List, Tuple, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
 import pygame
 from shapely.geometry import Polygon
 
 from config import logging_configurator
-from config.property_configurator import game_render_config, server_client_communication_config, game_engine_config, \
-    match_play_config
-from gameengine.gameactors import Ball, BallFlavor, Actor, Paddle, Net, BackLine
+from config.property_configurator import game_render_config, server_client_communication_config
+from gameengine.arena import Arena
+from gameengine.gameactors import Actor, StationaryActor
+from gameengine.match_rules import RallyTracker, PointOutcome, get_paddle_velocity
+from gameengine.primitives import Circle, Box
 from gamerender.caches import CachedScoreFontImages
-from proto_gen.gamemaster_pb2 import PaddleType, PaddleAction, PaddleDirective, PlayerIdentifier
+from gamerender.palette import DEFAULT_PALETTE
+from proto_gen.gamemaster_pb2 import PaddleType, PaddleAction, PlayerIdentifier, ObservationSpec
 
 if TYPE_CHECKING:
     from gamerender.pongrenders import DefaultPongRenderer
@@ -23,54 +26,36 @@ color_config = game_render_config.color_config
 
 logger = logging_configurator.get_logger(__name__)
 
-# player_id is expected to be PlayerIdentifer object and scorecard a StandardScoreCard
-RegisteredPlayer = namedtuple("RegisteredPlayer", ['player_id'])
-
-
-def color_from_ball(actor: Ball) -> Tuple[int, int, int]:
-    if actor.flavor is BallFlavor.PRIMARY:
-        color = color_config.primary_ball_color
-    elif actor.flavor is BallFlavor.GROW_PADDLE:
-        color = color_config.grow_paddle_ball_color
-    elif actor.flavor is BallFlavor.SHRINK_PADDLE:
-        color = color_config.shrink_paddle_ball_color
-    else:
-        color = (0, 0, 0)
-    return color
+# player_id is expected to be PlayerIdentifer object and observation_spec the ObservationSpec the player registered with
+RegisteredPlayer = namedtuple("RegisteredPlayer", ['player_id', 'observation_spec'])
 
 
 def color_from_actor(actor: Actor) -> Tuple[int, int, int]:
-    if isinstance(actor, Paddle):
-        color = color_config.paddle_color
-    elif isinstance(actor, Ball):
-        color = color_from_ball(actor)
-    elif isinstance(actor, Net):
-        color = color_config.net_color
-    elif isinstance(actor, BackLine):
-        color = color_config.backline_color
-    else:
-        color = color_config.obstacle_color
-    return color
-
-
-PADDLE_QUEUE_BLOCK = server_client_communication_config.is_client_response_lock
-DEFAULT_PADDLE_SPEED = game_engine_config.default_paddle_speed
-
-paddle_directive_to_velocity = {
-    PaddleDirective.UP: (0, -DEFAULT_PADDLE_SPEED),
-    PaddleDirective.DOWN: (0, DEFAULT_PADDLE_SPEED),
-    PaddleDirective.STATIONARY: (0, 0)
-    }
+    return DEFAULT_PALETTE.color_of(actor)
 
 
-def get_paddle_velocity(paddle_directive: PaddleDirective) -> Tuple[int, int]:
+def draw_actor(surface: pygame.Surface, actor: Actor, color: Tuple[int, int, int]) -> pygame.Rect:
     """
-    :param paddle_directive:  a directive for paddle direction
-    :return:  the velocity as 2-tuple
+    Draws the actor from its primitive shape.  Only arbitrary polygons need a shapely geometry
+    :param surface: the surface to draw upon
+    :param actor:   the actor
+    :param color:   the fill color
+    :return: the rectangle of the surface that was drawn
     """
-    return paddle_directive_to_velocity.get(paddle_directive, (0, 0))
+    primitive = actor.primitive
+    if isinstance(primitive, Circle):
+        return pygame.draw.circle(surface, color, (round(primitive.center[0]), round(primitive.center[1])),
+                                  round(primitive.radius))
+    if isinstance(primitive, Box):
+        min_x, min_y, max_x, max_y = primitive.bounds
+        return pygame.draw.rect(surface, color, pygame.Rect(round(min_x), round(min_y),
+                                                            round(max_x - min_x), round(max_y - min_y)))
+    shape: Polygon = actor.shape
+    return pygame.draw.polygon(surface, color, list(shape.exterior.coords))
 
 
+PADDLE_QUEUE_BLOCK = server_client_communication_config.is_client_response_lock
+
 class ScorePaneManager:
     def visit(self, pong_renderer: DefaultPongRenderer) -> List[pygame.Rect]:
         """
@@ -119,21 +104,106 @@ class MetaPaneManager:
         return [pong_renderer.canvas.blit(surface, pong_renderer.metadata_pane.pos)]
 
 
+def actor_rect(actor: Actor, clip_rect: pygame.Rect) -> pygame.Rect:
+    """
+    :param actor:     an actor
+    :param clip_rect: the rectangle of the surface the actor is drawn on
+    :return: a rectangle covering every pixel draw_actor could touch for the actor, with a pixel to spare for rounding
+    """
+    min_x, min_y, max_x, max_y = actor.bounds
+    left, top = math.floor(min_x) - 1, math.floor(min_y) - 1
+    return pygame.Rect(left, top, math.ceil(max_x) - left + 2, math.ceil(max_y) - top + 2).clip(clip_rect)
+
+
 class ArenaPaneManager:
+    """
+    Walls, nets, back lines and obstacles never move, so they are drawn once onto a cached background.  Every frame only
+    the rectangles the moving actors covered on the previous frame are restored from the background, the moving actors
+    are drawn again, and only the rectangles they covered before and after are reported as changed
+    """
+
+    def __init__(self):
+        self.arena: Optional[Arena] = None
+        self.background: Optional[pygame.Surface] = None
+        # (actor, rectangle of the background it was drawn on) of stationary actors rendered over a moving actor
+        self.overlay_actors: List[Tuple[Actor, pygame.Rect]] = []
+        # the actors drawn every frame in rendering order, starting with the first moving actor
+        self.render_order: List[Actor] = []
+        # the rectangle of each moving actor on the last painted frame
+        self.moving_rects: Dict[Actor, pygame.Rect] = {}
+
+    def invalidate(self):
+        """
+        Forces the background to be drawn again on the next paint, for instance after actors were added to the arena
+        :return: None
+        """
+        self.arena = None
+
+    def paint_background(self, pong_renderer: DefaultPongRenderer):
+        arena = pong_renderer.arena
+        self.arena = arena
+        self.background = pong_renderer.arena_pane.surface.copy()
+        self.background.fill(color_config.arena_color)
+
+        first_moving_index = next((index for index, actor in enumerate(arena.actors)
+                                   if not isinstance(actor, StationaryActor)), len(arena.actors))
+        self.overlay_actors = []
+        for index, actor in enumerate(arena.actors):
+            if isinstance(actor, StationaryActor):
+                drawn_rect = draw_actor(self.background, actor, color_from_actor(actor))
+                if index > first_moving_index:
+                    self.overlay_actors.append((actor, drawn_rect))
+        self.render_order = arena.actors[first_moving_index:]
+        self.moving_rects = {}
+
+    def paint(self, pong_renderer: DefaultPongRenderer) -> List[pygame.Rect]:
+        """
+        Paints the actors onto the arena surface without touching the canvas
+        :return: The rectangles of the arena surface that changed since the last paint
+        """
+        surface = pong_renderer.arena_pane.surface
+        surface_rect = surface.get_rect()
+        if self.arena is not pong_renderer.arena:
+            self.paint_background(pong_renderer)
+            surface.blit(self.background, (0, 0))
+            dirty_rects = [surface_rect]
+        else:
+            dirty_rects = []
+            for previous_rect in self.moving_rects.values():
+                surface.blit(self.background, previous_rect, previous_rect)
+
+        # a stationary actor later in the rendering order than a moving actor it overlaps is drawn again on top of it
+        updated_rects = {actor: actor_rect(actor, surface_rect) for actor in self.arena.moving_actors}
+        changed_rects = list(self.moving_rects.values())
+        changed_rects.extend(updated_rects.values())
+        redrawn_overlays = {actor for actor, drawn_rect in self.overlay_actors
+                            if drawn_rect.collidelist(changed_rects) != -1}
+        for actor in self.render_order:
+            if actor in updated_rects or actor in redrawn_overlays:
+                draw_actor(surface, actor, color_from_actor(actor))
+
+        if not dirty_rects:
+            for actor, updated_rect in updated_rects.items():
+                previous_rect = self.moving_rects.get(actor)
+                if previous_rect is None:
+                    dirty_rects.append(updated_rect)
+                elif previous_rect.colliderect(updated_rect):
+                    dirty_rects.append(previous_rect.union(updated_rect))
+                else:
+                    dirty_rects.extend((previous_rect, updated_rect))
+        self.moving_rects = updated_rects
+        return dirty_rects
+
     def visit(self, pong_renderer: DefaultPongRenderer) -> List[pygame.Rect]:
         """
-        This wil blit score changes to the working canvas.
+        This wil blit arena changes to the working canvas.
         :return: A list of rectangles that can be used for pygame.display.update that represent
         canvas areas that were updated
         """
         surface = pong_renderer.arena_pane.surface
-        surface.fill(color_config.arena_color)
-        for actor in pong_renderer.arena.actors:
-            color = color_from_actor(actor)
-            shape: Polygon = actor.shape
-            coords = list(shape.exterior.coords)
-            pygame.draw.polygon(surface, color, coords)
-        return [pong_renderer.canvas.blit(surface, pong_renderer.arena_pane.pos)]
+        pane_x, pane_y = pong_renderer.arena_pane.pos
+        return [pong_renderer.canvas.blit(surface, (pane_x + dirty_rect.x, pane_y + dirty_rect.y), dirty_rect)
+                for dirty_rect in self.paint(pong_renderer)]
 
 
 class PaddleManager:
@@ -167,9 +237,11 @@ class RegistrationManager:
         self.game_started: bool = False
         self.registration_closed: bool = False
 
-    def register_player(self, pong_renderer: DefaultPongRenderer, player: PlayerIdentifier) -> bool:
+    def register_player(self, pong_renderer: DefaultPongRenderer, player: PlayerIdentifier,
+                        observation_spec: ObservationSpec) -> bool:
         """
-        :param player:  a player identifier
+        :param player:           a player identifier
+        :param observation_spec: what the player is sent every frame
         :return: True if player successfully registered otherwise false
         """
         with registration_lock:
@@ -186,7 +258,13 @@ class RegistrationManager:
                     f"Cannot register player {player.player_name}-{player.paddle_strategy_name} because {player.paddle_type} already registered")
                 return False
 
-            pong_renderer.registered_player_by_paddle_type[player.paddle_type] = RegisteredPlayer(player)
+            pong_renderer.registered_player_by_paddle_type[player.paddle_type] = RegisteredPlayer(player, observation_spec)
+            # before the registration reply, which tells the player about its shared frame ring
+            pong_renderer.player_observations.add_player(player.paddle_type, observation_spec)
+            self.registration_closed = len(pong_renderer.registered_player_by_paddle_type) == 2
+            if pong_renderer.headless:
+                return True
+
             pong_renderer.cached_score_fonts_by_paddle_type[player.paddle_type] = CachedScoreFontImages()
 
             for paddle_type, registered_player in pong_renderer.registered_player_by_paddle_type.items():
@@ -197,63 +275,40 @@ class RegistrationManager:
                                                                             pong_renderer.registration_font_info.color)
                 font_pos = pong_renderer.player_left_registration_pos if paddle_type is PaddleType.LEFT else pong_renderer.player_right_registration_pos
                 pong_renderer.canvas.blit(registration_image, font_pos)
-            self.registration_closed = len(pong_renderer.registered_player_by_paddle_type) == 2
             pygame.display.update()
             return True
 
 
-class Direction(Enum):
-    UNSET = 1
-    LEFT = 2
-    RIGHT = 3
-
-
 class ScoringManager:
     def __init__(self):
-        self.change_of_direction_count: int = 0
-        self.last_ball_dirction: Optional[Direction] = Direction.UNSET
+        # the rules of a rally live in the game engine, so planners can apply them without a renderer
+        self.rally_tracker = RallyTracker()
 
     def update_score(self, pong_renderer: DefaultPongRenderer):
-        current_ball_direction = Direction.RIGHT if pong_renderer.arena.primary_ball.velocity[0] > 0 else Direction.LEFT
-        if self.last_ball_dirction is Direction.UNSET:
-            self.last_ball_dirction = current_ball_direction
-
-        if self.last_ball_dirction is not current_ball_direction:
-            self.change_of_direction_count += 1
-            self.last_ball_dirction = current_ball_direction
-
-        primary_ball_centroid = pong_renderer.arena.primary_ball.centroid
-        left_back_line_centroid = pong_renderer.arena.left_back_line.centroid
-        right_back_line_centroid = pong_renderer.arena.right_back_line.centroid
-        winner_discovered = False
-        if primary_ball_centroid[0] < left_back_line_centroid[0]:
+        outcome = self.rally_tracker.update(pong_renderer.arena)
+        if outcome is PointOutcome.NONE:
+            return
+
+        if outcome is PointOutcome.RIGHT_WINS:
             winning_player = pong_renderer.registered_player_by_paddle_type[PaddleType.RIGHT].player_id
             losing_player = pong_renderer.registered_player_by_paddle_type[PaddleType.LEFT].player_id
             pong_renderer.scorekeeper.tally_point(winning_player, losing_player)
-            pong_renderer.cached_score_fonts_by_paddle_type[PaddleType.RIGHT].update(
-                pong_renderer.scorekeeper.get_scorecard(winning_player))
-            pong_renderer.cached_score_fonts_by_paddle_type[PaddleType.LEFT].update(
-                pong_renderer.scorekeeper.get_scorecard(losing_player))
-            winner_discovered = True
-        elif primary_ball_centroid[0] > right_back_line_centroid[0]:
+            if not pong_renderer.headless:
+                pong_renderer.cached_score_fonts_by_paddle_type[PaddleType.RIGHT].update(
+                    pong_renderer.scorekeeper.get_scorecard(winning_player))
+                pong_renderer.cached_score_fonts_by_paddle_type[PaddleType.LEFT].update(
+                    pong_renderer.scorekeeper.get_scorecard(losing_player))
+        elif outcome is PointOutcome.LEFT_WINS:
             winning_player = pong_renderer.registered_player_by_paddle_type[PaddleType.LEFT].player_id
             losing_player = pong_renderer.registered_player_by_paddle_type[PaddleType.RIGHT].player_id
             pong_renderer.scorekeeper.tally_point(winning_player, losing_player)
-            pong_renderer.cached_score_fonts_by_paddle_type[PaddleType.LEFT].update(
-                pong_renderer.scorekeeper.get_scorecard(winning_player))
-            pong_renderer.cached_score_fonts_by_paddle_type[PaddleType.RIGHT].update(
-                pong_renderer.scorekeeper.get_scorecard(losing_player))
-            winner_discovered = True
-
-        if winner_discovered:
-            self.change_of_direction_count = 0
-            self.last_ball_dirction = Direction.UNSET
-            pong_renderer.arena.reset_starting_positions()
-
-        elif self.change_of_direction_count >= match_play_config.hits_for_draw:
-            self.change_of_direction_count = 0
-            self.last_ball_dirction = Direction.UNSET
+            if not pong_renderer.headless:
+                pong_renderer.cached_score_fonts_by_paddle_type[PaddleType.LEFT].update(
+                    pong_renderer.scorekeeper.get_scorecard(winning_player))
+                pong_renderer.cached_score_fonts_by_paddle_type[PaddleType.RIGHT].update(
+                    pong_renderer.scorekeeper.get_scorecard(losing_player))
+        else:
             pong_renderer.scorekeeper.tally_aborted_point()
             for score_font_cache in pong_renderer.cached_score_fonts_by_paddle_type.values():
                 score_font_cache.points_drawn = score_font_cache.points_drawn + 1
-            pong_renderer.arena.reset_starting_positions()
+        pong_renderer.arena.reset_starting_positions()
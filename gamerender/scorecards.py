@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Tuple
 
 from config.property_configurator import match_play_config
 from proto_gen.gamemaster_pb2 import PlayerIdentifier
@@ -67,6 +67,19 @@ class StandardScoreCard:
         """
         self._current_match_points_won = 0
 
+    def snapshot(self) -> Tuple[int, int, int, int]:
+        """
+        :return:  (current match points, total points, matches won, points drawn)
+        """
+        return self._current_match_points_won, self._total_points_won, self._matches_won, self._points_drawn
+
+    def restore(self, snapshot: Tuple[int, int, int, int]):
+        """
+        :param snapshot:  counters from snapshot()
+        :return:  None
+        """
+        self._current_match_points_won, self._total_points_won, self._matches_won, self._points_drawn = snapshot
+
 
 class ScoreKeeper:
     def __init__(self, player1: PlayerIdentifier, player2: PlayerIdentifier):
@@ -77,10 +90,13 @@ class ScoreKeeper:
         """
         self.player_to_scorecard = {hashable_id(player1): StandardScoreCard(player1),
                                     hashable_id(player2): StandardScoreCard(player2)}
+        # counts the changes to the scorecards, so their protos are only rebuilt when the score changes
+        self.version: int = 0
 
     def tally_aborted_point(self):
         for scorecard in self.player_to_scorecard.values():
             scorecard.add_drawn_point()
+        self.version += 1
 
     def tally_point(self, winning_player: PlayerIdentifier, losing_player: PlayerIdentifier):
         """
@@ -93,6 +109,7 @@ class ScoreKeeper:
         if winning_scorecard.add_match_point():
             losing_scorecard = self.player_to_scorecard[hashable_id(losing_player)]
             losing_scorecard.match_over()
+        self.version += 1
 
     def get_scorecard(self, player: PlayerIdentifier) -> StandardScoreCard:
         """
@@ -103,3 +120,18 @@ class ScoreKeeper:
 
     def get_scorecards(self) -> List[StandardScoreCard]:
         return list(self.player_to_scorecard.values())
+
+    def snapshot(self) -> Tuple[Tuple[int, int, int, int], ...]:
+        """
+        :return:  an immutable copy of the counters of every scorecard
+        """
+        return tuple(scorecard.snapshot() for scorecard in self.player_to_scorecard.values())
+
+    def restore(self, snapshot: Tuple[Tuple[int, int, int, int], ...]):
+        """
+        :param snapshot:  counters from snapshot()
+        :return:  None
+        """
+        for scorecard, scorecard_snapshot in zip(self.player_to_scorecard.values(), snapshot):
+            scorecard.restore(scorecard_snapshot)
+        self.version += 1
@@ -0,0 +1,172 @@
+import asyncio
+import threading
+from queue import Queue, Full, Empty
+from typing import Union
+
+from proto_gen.gamemaster_pb2 import DeliveryPolicy
+
+"""
+ The game states of every player wait in a queue of their own until the stream of the player takes them, see
+ GameStatePublisher.  Players choose what happens once a player falls behind and its queue fills up, see
+ DeliveryPolicy in gamemaster.proto.  A BLOCK queue makes the publisher wait, which in turn holds up the game and every
+ other player of the match.  The other policies never wait: the oldest game state is dropped instead, and counted, so
+ the stream can tell the player how many game states it missed.  Streams of the asyncio server take their game states
+ from an EventLoopGameStateQueue instead, which the publisher puts on from its thread straight into the event loop.
+"""
+
+
+class DroppingQueue(Queue):
+    """
+    A bounded queue that never blocks a put.  Once full, the oldest item is dropped to make room for the new one
+    """
+
+    def __init__(self, maxsize: int):
+        """
+        :param maxsize: the most items kept, at least 1
+        """
+        super().__init__(maxsize=max(maxsize, 1))
+        self._dropped_count = 0
+
+    def put(self, item, block=True, timeout=None):
+        with self.not_full:
+            if self._qsize() >= self.maxsize:
+                self._get()
+                # nobody takes the dropped item, so nobody marks it done
+                self.unfinished_tasks -= 1
+                self._dropped_count += 1
+            self._put(item)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+
+    def take_dropped_count(self) -> int:
+        """
+        :return: the number of items dropped since the last call
+        """
+        with self.mutex:
+            dropped_count, self._dropped_count = self._dropped_count, 0
+        return dropped_count
+
+
+class EventLoopGameStateQueue:
+    """
+    The game state queue of a player of the asyncio server.  The publisher puts on it from its own thread, and each
+    game state is handed to an asyncio queue with call_soon_threadsafe, which the stream awaits on the event loop.
+    Delivery policies work as for the other queues: BLOCK makes the publisher wait for a free place, the others drop
+    the oldest game state on the event loop and count it
+    """
+
+    def __init__(self, delivery_policy: int, maxsize: int, event_loop: asyncio.AbstractEventLoop):
+        """
+        :param delivery_policy: the DeliveryPolicy of the player
+        :param maxsize:         the most game states waiting, always 1 for LATEST_ONLY
+        :param event_loop:      the event loop of the stream of the player
+        """
+        self.is_dropping = delivery_policy in (DeliveryPolicy.DROP_OLDEST, DeliveryPolicy.LATEST_ONLY)
+        self.maxsize = 1 if delivery_policy == DeliveryPolicy.LATEST_ONLY else max(maxsize, 1)
+        self.event_loop = event_loop
+        # only touched on the event loop, so unbounded, the bound is kept by put
+        self._async_queue: asyncio.Queue = asyncio.Queue()
+        self._free_places = threading.Semaphore(self.maxsize)
+        self._dropped_count = 0
+
+    def put(self, item, block=True, timeout=None):
+        """
+        Called from the publisher thread.  Like Queue.put, raises Full once a BLOCK queue stays full for the timeout
+        """
+        if self.is_dropping:
+            self.event_loop.call_soon_threadsafe(self._put_dropping, item)
+        else:
+            if not self._free_places.acquire(block, timeout):
+                raise Full
+            self.event_loop.call_soon_threadsafe(self._async_queue.put_nowait, item)
+
+    def end(self):
+        """
+        Called from any thread once nothing is put anymore.  The stream takes None as the end of its game states
+        """
+        try:
+            self.event_loop.call_soon_threadsafe(self._async_queue.put_nowait, None)
+        except RuntimeError:
+            # the event loop is closed, so there is no stream left to end
+            pass
+
+    def _put_dropping(self, item):
+        if self._async_queue.qsize() >= self.maxsize:
+            self._async_queue.get_nowait()
+            self._dropped_count += 1
+        self._async_queue.put_nowait(item)
+
+    async def get(self):
+        """
+        Called on the event loop
+        """
+        item = await self._async_queue.get()
+        self._taken()
+        return item
+
+    def get_nowait(self):
+        """
+        Called on the event loop
+        """
+        item = self._async_queue.get_nowait()
+        self._taken()
+        return item
+
+    def _taken(self):
+        if not self.is_dropping:
+            self._free_places.release()
+
+    def qsize(self) -> int:
+        return self._async_queue.qsize()
+
+    def take_dropped_count(self) -> int:
+        """
+        Called on the event loop
+        :return: the number of game states dropped since the last call
+        """
+        dropped_count, self._dropped_count = self._dropped_count, 0
+        return dropped_count
+
+
+def create_game_state_queue(delivery_policy: int, max_game_state_buffer_size: int) -> Queue:
+    """
+    :param delivery_policy:            the DeliveryPolicy of the player
+    :param max_game_state_buffer_size: the bound of the queue, unless the policy is LATEST_ONLY
+    :return: the game state queue of a player
+    """
+    if delivery_policy == DeliveryPolicy.DROP_OLDEST:
+        return DroppingQueue(max_game_state_buffer_size)
+    if delivery_policy == DeliveryPolicy.LATEST_ONLY:
+        return DroppingQueue(1)
+    return Queue(maxsize=max_game_state_buffer_size)
+
+
+def take_skipped_game_states(game_state_queue: Union[Queue, EventLoopGameStateQueue]) -> int:
+    """
+    :param game_state_queue: the game state queue of a player
+    :return: the game states dropped from the queue since the last call.  Always 0 for BLOCK queues
+    """
+    if isinstance(game_state_queue, (DroppingQueue, EventLoopGameStateQueue)):
+        return game_state_queue.take_dropped_count()
+    return 0
+
+
+def end_game_state_queue(game_state_queue: Union[Queue, EventLoopGameStateQueue]):
+    """
+    Ends the stream taking from a game state queue nobody puts on anymore.  Game states still waiting are dropped, the
+    stream takes None as the end of its game states
+    :param game_state_queue: the game state queue of a player
+    :return: None
+    """
+    if isinstance(game_state_queue, EventLoopGameStateQueue):
+        game_state_queue.end()
+        return
+    while True:
+        try:
+            game_state_queue.put_nowait(None)
+            return
+        except Full:
+            try:
+                game_state_queue.get_nowait()
+            except Empty:
+                pass
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+from queue import Queue
+
+from gameserver.delivery import DroppingQueue, EventLoopGameStateQueue, create_game_state_queue, \
+    take_skipped_game_states
+from proto_gen.gamemaster_pb2 import DeliveryPolicy
+
+
+def test_dropping_queue_drops_the_oldest():
+    dropping_queue = DroppingQueue(3)
+    for item in range(10):
+        dropping_queue.put(item)
+
+    assert [dropping_queue.get_nowait() for _ in range(dropping_queue.qsize())] == [7, 8, 9]
+    assert dropping_queue.take_dropped_count() == 7
+    # the count starts over once taken
+    assert dropping_queue.take_dropped_count() == 0
+
+
+def test_dropping_queue_only_waits_for_the_items_it_kept():
+    dropping_queue = DroppingQueue(2)
+    for item in range(5):
+        dropping_queue.put(item)
+    assert dropping_queue.unfinished_tasks == 2
+
+    for _ in range(2):
+        dropping_queue.get_nowait()
+        dropping_queue.task_done()
+    assert dropping_queue.unfinished_tasks == 0
+    # join returns at once, as the dropped items are not waited for
+    dropping_queue.join()
+
+
+def test_game_state_queue_of_every_delivery_policy():
+    blocking_queue = create_game_state_queue(DeliveryPolicy.BLOCK, 5)
+    drop_oldest_queue = create_game_state_queue(DeliveryPolicy.DROP_OLDEST, 5)
+    latest_only_queue = create_game_state_queue(DeliveryPolicy.LATEST_ONLY, 5)
+
+    assert type(blocking_queue) is Queue and blocking_queue.maxsize == 5
+    assert isinstance(drop_oldest_queue, DroppingQueue) and drop_oldest_queue.maxsize == 5
+    assert isinstance(latest_only_queue, DroppingQueue) and latest_only_queue.maxsize == 1
+
+    for item in range(3):
+        latest_only_queue.put(item)
+    assert latest_only_queue.get_nowait() == 2
+    assert take_skipped_game_states(latest_only_queue) == 2
+    assert take_skipped_game_states(blocking_queue) == 0
+
+
+def test_event_loop_queue_drops_the_oldest():
+    async def publish_and_take():
+        game_state_queue = EventLoopGameStateQueue(DeliveryPolicy.DROP_OLDEST, 3, asyncio.get_running_loop())
+        publisher = threading.Thread(target=lambda: [game_state_queue.put(item) for item in range(10)])
+        publisher.start()
+        publisher.join()
+        # the puts reach the event loop once it runs again
+        first_item = await game_state_queue.get()
+        return [first_item] + [game_state_queue.get_nowait() for _ in range(game_state_queue.qsize())], \
+            take_skipped_game_states(game_state_queue)
+
+    assert asyncio.run(publish_and_take()) == ([7, 8, 9], 7)
+
+
+def test_event_loop_queue_blocks_the_publisher():
+    async def publish_and_take():
+        game_state_queue = EventLoopGameStateQueue(DeliveryPolicy.BLOCK, 2, asyncio.get_running_loop())
+        publisher = threading.Thread(target=lambda: [game_state_queue.put(item) for item in range(5)], daemon=True)
+        publisher.start()
+        items = [await game_state_queue.get()]
+        await asyncio.sleep(0.1)
+        # with two items waiting, the publisher waits for the stream to take one
+        assert publisher.is_alive() and game_state_queue.qsize() == 2
+        while len(items) < 5:
+            items.append(await game_state_queue.get())
+        publisher.join()
+        return items, take_skipped_game_states(game_state_queue)
+
+    assert asyncio.run(publish_and_take()) == ([0, 1, 2, 3, 4], 0)
+
+
+if __name__ == "__main__":
+    test_dropping_queue_drops_the_oldest()
+    test_dropping_queue_only_waits_for_the_items_it_kept()
+    test_game_state_queue_of_every_delivery_policy()
+    test_event_loop_queue_drops_the_oldest()
+    test_event_loop_queue_blocks_the_publisher()
@@ -0,0 +1,244 @@
+import hashlib
+import os
+import re
+import threading
+from queue import Queue
+from typing import Callable, Dict, Optional, Set
+
+from config import logging_configurator
+from gameengine.arena import Arena
+from gameengine.collision_engine import GameCollisionEngine
+from gameserver.delivery import create_game_state_queue, end_game_state_queue
+from gamerender.pongrenders import DefaultPongRenderer
+from gamerender.publishing import GameStatePublisher
+from proto_gen.gamemaster_pb2 import PaddleType, PaddleAction, PlayerIdentifier, ObservationSpec
+
+"""
+ A server hosts any number of matches at once.  Players name the match they play in with the match_id of their
+ PlayerIdentifier, and every rpc is routed to the match it names.  A match is created when its first player
+ registers, with an arena, game engine, renderer and queues of its own, and starts on a game thread of its own once
+ both players are registered.  Every match but the default one, the empty match id, is headless, as there is only
+ one window.  Once the game state streams of all its players have ended, a match is stopped and removed, which frees
+ its place for another match.
+"""
+
+logger = logging_configurator.get_logger(__name__)
+
+DEFAULT_MATCH_ID = ''
+
+# match ids are chosen by players, so only these characters of a match id make it into a file name
+UNSAFE_FILE_NAME_CHARACTERS = re.compile(r'[^\w.-]')
+
+
+def match_seed(random_seed: Optional[int], match_id: str) -> Optional[int]:
+    """
+    :param random_seed: the configured seed, or None
+    :param match_id:    a match id
+    :return: the seed of the arena of the match.  The configured seed for the default match, and a seed derived from
+             the configured seed and the match id for any other, so matches do not all play out the same.  None to
+             draw a seed when no seed is configured
+    """
+    if random_seed is None or match_id == DEFAULT_MATCH_ID:
+        return random_seed
+    digest = hashlib.blake2b(f"{random_seed}:{match_id}".encode('utf-8'), digest_size=8).digest()
+    # below 2 ** 63, as drawn seeds are
+    return int.from_bytes(digest, 'little') >> 1
+
+
+def match_replay_log_path(replay_log_path: Optional[str], match_id: str) -> Optional[str]:
+    """
+    :param replay_log_path: the configured replay log, or None to not record
+    :param match_id:        a match id
+    :return: the replay log of the match.  The configured file for the default match, and the file with the match id
+             appended to its name for any other, so matches do not overwrite each other
+    """
+    if replay_log_path is None or match_id == DEFAULT_MATCH_ID:
+        return replay_log_path
+    root, extension = os.path.splitext(replay_log_path)
+    return f"{root}_{UNSAFE_FILE_NAME_CHARACTERS.sub('_', match_id)}{extension}"
+
+
+class Match:
+    """
+    A match and everything it plays with
+    """
+
+    def __init__(self, match_id: str, pong_renderer: DefaultPongRenderer, left_paddle_queue: Queue,
+                 right_paddle_queue: Queue, game_state_publisher: GameStatePublisher,
+                 max_game_state_buffer_size: int):
+        """
+        :param match_id:                   the match id the players of the match register with
+        :param pong_renderer:              runs the match
+        :param left_paddle_queue:          Thread safe queue for incoming left paddle actions
+        :param right_paddle_queue:         Thread safe queue for incoming right paddle actions
+        :param game_state_publisher:       puts the game states of the match on the game state queue of each player
+        :param max_game_state_buffer_size: the bound of the game state queues
+        """
+        self.match_id = match_id
+        self.pong_renderer = pong_renderer
+        self.paddle_queue_by_paddle_type: Dict[PaddleType, Queue] = {PaddleType.LEFT: left_paddle_queue,
+                                                                     PaddleType.RIGHT: right_paddle_queue}
+        self.game_state_publisher = game_state_publisher
+        self.max_game_state_buffer_size = max_game_state_buffer_size
+        self.registered_player_count = 0
+        self._registration_lock = threading.Lock()
+        self.game_thread: Optional[threading.Thread] = None
+        self.ended_stream_paddle_types: Set[PaddleType] = set()
+        self.is_over = False
+
+    def register_player(self, player: PlayerIdentifier, observation_spec: ObservationSpec,
+                        game_state_queue_factory: Callable[[int, int], Queue] = create_game_state_queue) -> bool:
+        """
+        Starts the match once both players are registered
+        :param player:                   a player identifier
+        :param observation_spec:         what the player is sent every frame, and how, see DeliveryPolicy
+        :param game_state_queue_factory: creates the game state queue of the player from its delivery policy and the
+                                         bound of the queue, see delivery.create_game_state_queue
+        :return: True if player successfully registered otherwise false
+        """
+        with self._registration_lock:
+            if self.is_over:
+                logger.warning(f"Match '{self.match_id}' is over.  Not taking new registrations")
+                return False
+            registered = self.pong_renderer.register_player(player, observation_spec)
+            if registered:
+                self.registered_player_count += 1
+                # the game has not started, so nothing is on the queue being replaced
+                self.game_state_publisher.set_game_state_queue(
+                    player.paddle_type, game_state_queue_factory(observation_spec.delivery_policy,
+                                                                 self.max_game_state_buffer_size))
+            if self.registered_player_count == 2 and self.game_thread is None:
+                logger.info(f"Starting match '{self.match_id}' on a different thread")
+                self.game_thread = threading.Thread(target=self.pong_renderer.start_game,
+                                                    name=f"game_thread_{self.match_id}" if self.match_id
+                                                    else "game_thread")
+                self.game_thread.start()
+        return registered
+
+    def start_stream(self, paddle_type: PaddleType):
+        """
+        :param paddle_type: the paddle of a player whose game state stream starts
+        :return: None
+        """
+        with self._registration_lock:
+            self.ended_stream_paddle_types.discard(paddle_type)
+
+    def end_stream(self, paddle_type: PaddleType) -> bool:
+        """
+        :param paddle_type: the paddle of a player whose game state stream ended
+        :return: True if the match is over, as the streams of all its players have ended.  The match is then closed
+                 for registrations, and should be stopped, see stop
+        """
+        with self._registration_lock:
+            self.ended_stream_paddle_types.add(paddle_type)
+            registered_paddle_types = set(self.pong_renderer.registered_player_by_paddle_type)
+            if registered_paddle_types and registered_paddle_types <= self.ended_stream_paddle_types:
+                self.is_over = True
+            return self.is_over
+
+    def stop(self):
+        """
+        Stops the game of a match that is over and ends the streams still waiting on its game state queues
+        :return: None
+        """
+        self.pong_renderer.stop_game()
+        for game_state_queue in self.game_state_publisher.game_state_queue_by_paddle_type.values():
+            end_game_state_queue(game_state_queue)
+        if self.game_thread is None:
+            # otherwise the game thread closes them as it ends
+            self.pong_renderer.player_observations.close()
+        logger.info(f"Stopped match '{self.match_id}'")
+
+    def game_state_queue_of(self, paddle_type: PaddleType) -> Queue:
+        return self.game_state_publisher.game_state_queue_by_paddle_type[paddle_type]
+
+    def queue_paddle_action(self, paddle_action: PaddleAction):
+        paddle_queue = self.paddle_queue_by_paddle_type.get(paddle_action.player_identifier.paddle_type)
+        if paddle_queue is not None:
+            paddle_queue.put(paddle_action)
+
+
+class MatchRegistry:
+    """
+    The matches hosted by the server, by match id
+    """
+
+    def __init__(self, pong_renderer_factory: Callable[..., DefaultPongRenderer], arena_factory: Callable[..., Arena],
+                 game_engine_factory: Callable[[], GameCollisionEngine], max_game_state_buffer_size: int,
+                 max_matches: int = 0, random_seed: Optional[int] = None, replay_log_path: Optional[str] = None):
+        """
+        :param pong_renderer_factory:      creates the renderer of a match from its arena, engine and queues
+        :param arena_factory:              creates the arena of a match from its seed
+        :param game_engine_factory:        creates the game engine of a match.  Engines keep state of their own, so
+                                           matches must not share one
+        :param max_game_state_buffer_size: the bound of the game state queues of every match
+        :param max_matches:                registrations for new matches are refused once this many matches are
+                                           hosted.  Zero for no limit
+        :param random_seed:                the configured seed, see match_seed.  None to draw a seed every match
+        :param replay_log_path:            the configured replay log, see match_replay_log_path.  None to not record
+        """
+        self.pong_renderer_factory = pong_renderer_factory
+        self.arena_factory = arena_factory
+        self.game_engine_factory = game_engine_factory
+        self.max_game_state_buffer_size = max_game_state_buffer_size
+        self.max_matches = max_matches
+        self.random_seed = random_seed
+        self.replay_log_path = replay_log_path
+        self.match_by_id: Dict[str, Match] = {}
+        self._lock = threading.Lock()
+
+    def match_of(self, match_id: str) -> Optional[Match]:
+        """
+        :param match_id: a match id
+        :return: the match, None if no player registered for it
+        """
+        return self.match_by_id.get(match_id)
+
+    def match_for_registration(self, match_id: str) -> Optional[Match]:
+        """
+        :param match_id: the match id of a registering player
+        :return: the match, created if it is the first player of the match.  None if the server hosts too many matches
+        """
+        with self._lock:
+            match = self.match_by_id.get(match_id)
+            if match is None:
+                if self.max_matches and len(self.match_by_id) >= self.max_matches:
+                    logger.warning(f"Already hosting {len(self.match_by_id)} matches.  Not creating match "
+                                   f"'{match_id}'")
+                    return None
+                match = self._create_match(match_id)
+                self.match_by_id[match_id] = match
+                logger.info(f"Created match '{match_id}', hosting {len(self.match_by_id)} matches")
+            return match
+
+    def end_stream(self, match_id: str, paddle_type: PaddleType):
+        """
+        Stops and removes the match once the streams of all its players have ended
+        :param match_id:    the match id of a player whose game state stream ended
+        :param paddle_type: the paddle of the player
+        :return: None
+        """
+        with self._lock:
+            match = self.match_by_id.get(match_id)
+            if match is None or not match.end_stream(paddle_type):
+                return
+            del self.match_by_id[match_id]
+            logger.info(f"Match '{match_id}' is over, hosting {len(self.match_by_id)} matches")
+        match.stop()
+
+    def _create_match(self, match_id: str) -> Match:
+        left_paddle_queue = Queue()
+        right_paddle_queue = Queue()
+        # replaced by the queue of the delivery policy of each player as it registers
+        game_state_publisher = GameStatePublisher(Queue(maxsize=self.max_game_state_buffer_size),
+                                                  Queue(maxsize=self.max_game_state_buffer_size),
+                                                  max_pending_frames=self.max_game_state_buffer_size)
+        renderer_overrides = {} if match_id == DEFAULT_MATCH_ID else {'headless': True}
+        arena = self.arena_factory(seed=match_seed(self.random_seed, match_id))
+        pong_renderer = self.pong_renderer_factory(arena=arena, game_engine=self.game_engine_factory(),
+                                                   replay_log_path=match_replay_log_path(self.replay_log_path, match_id),
+                                                   left_paddle_queue=left_paddle_queue,
+                                                   right_paddle_queue=right_paddle_queue,
+                                                   game_state_publisher=game_state_publisher, **renderer_overrides)
+        return Match(match_id, pong_renderer, left_paddle_queue, right_paddle_queue, game_state_publisher,
+                     self.max_game_state_buffer_size)
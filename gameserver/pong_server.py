@@ -1,12 +1,35 @@
+import asyncio
 import time
 from concurrent import futures
 
 import grpc
 
-from proto_gen import gamemaster_pb2_grpc
+from config import logging_configurator
+from config.physics_constants import SERVER_IDLE_SLEEP_SECONDS
+from gameserver.pong_servicer import add_pong_servicer_to_server, AsyncPongServicer
 from proto_gen.gamemaster_pb2_grpc import GameMasterServicer
-from utils import measures
-from utils.measures import ureg
+
+try:
+    from grpc import aio
+except ImportError:
+    # grpc.aio is new in grpcio 1.32.  Without it, only the thread pool server is available
+    aio = None
+
+logger = logging_configurator.get_logger(__name__)
+
+# the grpc.so_reuseport option makes it so multiple servers, if instantiated on the same host, can
+# all use the same listen port -- somehow.  Apparently, this is a feature not a bug.
+#  However, this feature isn't compatible with the python grpc package available
+# from the anaconda repository.  You will notice an error when the server is started about SO_RESUSEPORT unavailable.
+# This is because the c-binary provided with the anaconda python grpc was compiled with this option not supported.
+# (You could re-compile from source , but meh)
+# So .. lets formally set the option to zero here so that the server itself knows to throw an error if
+# it detects it is sharing a listen port with another server, just as a safety safeguard
+SERVER_OPTIONS = [('grpc.so_reuseport', 0), ]
+
+
+def is_asyncio_available() -> bool:
+    return aio is not None
 
 
 class PongServer:
@@ -24,24 +47,16 @@ class PongServer:
         :param port:          The listen port for client connections
         """
 
-        # the grpc.so_reuseport option makes it so multiple servers, if instantiated on the same host, can
-        # all use the same listen port -- somehow.  Apparently, this is a feature not a bug.
-        #  However, this feature isn't compatible with the python grpc package available
-        # from the anaconda repository.  You will notice an error when the server is started about SO_RESUSEPORT unavailable.
-        # This is because the c-binary provided with the anaconda python grpc was compiled with this option not supported.
-        # (You could re-compile from source , but meh)
-        # So .. lets formally set the option to zero here so that the server itself knows to throw an error if
-        # it detects it is sharing a listen port with another server, just as a safety safeguard
-        server_options = [('grpc.so_reuseport', 0), ]
+        # see SERVER_OPTIONS about grpc.so_reuseport
         self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers,
                                                              thread_name_prefix=thread_prefix),
                                   handlers=None,
                                   interceptors=None,
-                                  options=server_options,
+                                  options=SERVER_OPTIONS,
                                   maximum_concurrent_rpcs=None)
 
         # add our handler for the service apis
-        gamemaster_pb2_grpc.add_GameMasterServicer_to_server(servicer, self.server)
+        add_pong_servicer_to_server(servicer, self.server)
 
         # specify the listen port.  insecure means no authentication is done
         self.server.add_insecure_port("{}:{}".format('localhost', port))
@@ -50,9 +65,41 @@ class PongServer:
         self.server.start()
 
         # this is needed because gameserver.start() doesn't block
-        seconds_per_day = measures.seconds_per_min.to(ureg.sec / ureg.day)
         try:
             while True:
-                time.sleep(seconds_per_day.magnitude)
+                time.sleep(SERVER_IDLE_SLEEP_SECONDS)
         except KeyboardInterrupt:
             self.server.stop(0)
+
+
+class AsyncPongServer:
+    """
+    Sets up and runs the grpc asyncio server.  Every rpc is a coroutine on one event loop, so a long lived stream does
+    not hold a thread for the whole match and the number of players and streams is not limited by a thread pool
+    """
+
+    def __init__(self, servicer: AsyncPongServicer, port: str):
+        """
+        :param servicer: The asyncio implementation of GameMasterServicer
+        :param port:     The listen port for client connections
+        """
+        self.servicer = servicer
+        self.port = port
+
+    async def serve(self):
+        # the server belongs to the event loop it is created on
+        server = aio.server(options=SERVER_OPTIONS)
+        add_pong_servicer_to_server(self.servicer, server)
+        server.add_insecure_port("{}:{}".format('localhost', self.port))
+        await server.start()
+        logger.info(f"Serving on port {self.port} from an asyncio event loop")
+        try:
+            await server.wait_for_termination()
+        finally:
+            await server.stop(0)
+
+    def start_server_blocking(self):
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            pass
@@ -1,35 +1,87 @@
-import queue
-import threading
+import asyncio
+import functools
 import time
-from typing import Generator
+from queue import Queue
+from typing import AsyncGenerator, AsyncIterator, Callable, Generator, List, Union
 
+import grpc
 from google.protobuf.empty_pb2 import Empty
 from google.protobuf.timestamp_pb2 import Timestamp
 
 from config import logging_configurator
-from gamerender.pongrenders import DefaultPongRenderer
+from gameengine.gameactors import StationaryActor
+from gameserver.delivery import EventLoopGameStateQueue, create_game_state_queue, take_skipped_game_states
+from gameserver.match_registry import MatchRegistry
 from proto_gen import gamemaster_pb2_grpc
-from proto_gen.gamemaster_pb2 import GameState, PlayerIdentifier, PaddleType, PaddleAction, GameStateBuffer
+from proto_gen.gamemaster_pb2 import GameState, PlayerIdentifier, PaddleType, PaddleAction, \
+    RegistrationReply, PlayerRegistration, ObservationMode
+from translators.proto_translations import create_proto_palette, create_proto_actor, serialize_game_state_buffer, \
+    frame_skipped_game_states
 
 logger = logging_configurator.get_logger(__name__)
 
 
+def add_pong_servicer_to_server(servicer: gamemaster_pb2_grpc.GameMasterServicer, server: grpc.Server):
+    """
+    The generated add_GameMasterServicer_to_server, except that stream_game_state may yield game state buffers that
+    are already serialized, which are sent as is.  Handlers registered first take precedence
+    :param servicer: the servicer
+    :param server:   the grpc server
+    :return: None
+    """
+    stream_game_state_handler = grpc.unary_stream_rpc_method_handler(
+        servicer.stream_game_state,
+        request_deserializer=PlayerIdentifier.FromString,
+        response_serializer=serialize_game_state_buffer)
+    server.add_generic_rpc_handlers((grpc.method_handlers_generic_handler(
+        'GameMaster', {'stream_game_state': stream_game_state_handler}),))
+    gamemaster_pb2_grpc.add_GameMasterServicer_to_server(servicer, server)
+
+
+def game_state_buffer_of(framed_game_states: List[bytes],
+                         game_state_queue: Union[Queue, EventLoopGameStateQueue]) -> bytes:
+    """
+    :param framed_game_states: game states taken from the game state queue of a player
+    :param game_state_queue:   the game state queue
+    :return: the serialized game state buffer, with the game states dropped from the queue since the last buffer
+    """
+    skipped_game_states = take_skipped_game_states(game_state_queue)
+    if skipped_game_states:
+        framed_game_states.append(frame_skipped_game_states(skipped_game_states))
+    return b''.join(framed_game_states)
+
+
 class DefaultPongServicer(gamemaster_pb2_grpc.GameMasterServicer):
-    def __init__(self, left_paddle_queue: queue.Queue, right_paddle_queue: queue.Queue,
-                 left_game_state_queue: queue.Queue, right_game_state_queue,
-                 pong_renderer: DefaultPongRenderer):
-        self.left_paddle_queue = left_paddle_queue
-        self.right_paddle_queue = right_paddle_queue
-        self.left_game_state_queue = left_game_state_queue
-        self.right_game_state_queue = right_game_state_queue
-        self.pong_renderer = pong_renderer
-        self.registered_player_count = 0
-
-    def stream_game_state(self, request: PlayerIdentifier, context) -> Generator[GameStateBuffer, None, None]:
-        if request.paddle_type is PaddleType.LEFT:
-            game_state_queue = self.left_game_state_queue
-        else:
-            game_state_queue = self.right_game_state_queue
+    def __init__(self, match_registry: MatchRegistry):
+        """
+        :param match_registry: the matches of the server.  Every rpc goes to the match of its player identifier
+        """
+        self.match_registry = match_registry
+
+    def queue_paddle_action(self, paddle_action: PaddleAction):
+        player_identifier = paddle_action.player_identifier
+        logger.debug("Received paddle action from [{}:{}]".format(player_identifier.player_name,
+                                                                  player_identifier.paddle_strategy_name))
+        match = self.match_registry.match_of(player_identifier.match_id)
+        if match is None:
+            logger.warning(f"Dropping paddle action for unknown match '{player_identifier.match_id}'")
+            return
+        match.queue_paddle_action(paddle_action)
+
+    def stream_game_state(self, request: PlayerIdentifier, context) -> Generator[bytes, None, None]:
+        """
+        The game state queues hold game states already serialized and framed by the GameStatePublisher, so a game
+        state buffer is just their bytes joined together, see proto_translations.frame_game_state.  The bytes are
+        sent as is by the serializer add_pong_servicer_to_server registers.  The match is over once the streams of
+        all its players have ended, see MatchRegistry.end_stream
+        """
+        match = self.match_registry.match_of(request.match_id)
+        if match is None:
+            context.abort(grpc.StatusCode.NOT_FOUND, f"No player registered for match '{request.match_id}'")
+        game_state_queue = match.game_state_queue_of(request.paddle_type)
+        match.start_stream(request.paddle_type)
+        context.add_callback(functools.partial(self.match_registry.end_stream, request.match_id,
+                                               request.paddle_type))
 
         while True:
             # lets block until at least one game state is found
@@ -38,34 +90,94 @@ class DefaultPongServicer(gamemaster_pb2_grpc.GameMasterServicer):
             # now drain the rest
             #following_game_states = [game_state_queue.get_nowait() for _ in range(game_state_queue.qsize())]
             following_game_states = [game_state_queue.get() for _ in range(game_state_queue.qsize())]
-            game_state_buffer = GameStateBuffer()
-            game_state_buffer.game_states.append(first_game_state)
-            game_state_buffer.game_states.extend(following_game_states)
-            yield game_state_buffer
-
-    def register_player(self, request, context):
-        logger.info("Registering {}:{} controlling the {}".format(request.player_name,
-                                                                  request.paddle_strategy_name,
-                                                                  request.paddle_type))
-        if self.pong_renderer.register_player(request):
-            self.registered_player_count += 1
-
-        if self.registered_player_count == 2:
-            logger.info("Starting Pong Game on a different thread")
-            game_thread = threading.Thread(target=self.pong_renderer.start_game, name="game_thread")
-            game_thread.start()
-        return Empty()
+            # None ends the game states of a match that is over, see Match.stop
+            if first_game_state is None or None in following_game_states:
+                return
+            yield game_state_buffer_of([first_game_state] + following_game_states, game_state_queue)
+
+    def register_player(self, request: PlayerRegistration, context) -> RegistrationReply:
+        return self.register_player_with(request, create_game_state_queue)
+
+    def register_player_with(self, request: PlayerRegistration,
+                             game_state_queue_factory: Callable[[int, int], Queue]) -> RegistrationReply:
+        """
+        :param request:                  the registration of a player
+        :param game_state_queue_factory: creates the game state queue of the player, see Match.register_player
+        :return: the registration reply
+        """
+        player = request.player_identifier
+        logger.info("Registering {}:{} controlling the {} observing {} in match '{}'".format(
+            player.player_name, player.paddle_strategy_name, player.paddle_type,
+            ObservationMode.Name(request.observation_spec.mode), player.match_id))
+        match = self.match_registry.match_for_registration(player.match_id)
+        if match is None:
+            return RegistrationReply(registered=False)
+        registered = match.register_player(player, request.observation_spec, game_state_queue_factory)
+
+        pong_renderer = match.pong_renderer
+        reply = RegistrationReply(registered=registered,
+                                  palette=create_proto_palette(pong_renderer.arena_rasterizer.palette),
+                                  arena_width=pong_renderer.arena.arena_width,
+                                  arena_height=pong_renderer.arena.arena_height,
+                                  static_actors=[create_proto_actor(actor) for actor in pong_renderer.arena.actors
+                                                 if isinstance(actor, StationaryActor)])
+        if registered:
+            shared_frame_ring = pong_renderer.player_observations.shared_frame_ring_of(player.paddle_type)
+            if shared_frame_ring is not None:
+                reply.shared_frame_ring.CopyFrom(shared_frame_ring.to_proto())
+        return reply
 
     def submit_paddle_actions(self, request_iterator: Generator[PaddleAction, None, None], context):
         for paddle_action in request_iterator:
-            player_identifier = paddle_action.player_identifier
-            logger.debug("Received paddle action from [{}:{}]".format(player_identifier.player_name,
-                                                                      player_identifier.paddle_strategy_name))
+            self.queue_paddle_action(paddle_action)
+        return Empty()
+
+
+class AsyncPongServicer(DefaultPongServicer):
+    """
+    The DefaultPongServicer for the asyncio server, see AsyncPongServer.  Every rpc is a coroutine on the event loop
+    of the server.  The game state queue of each player is an EventLoopGameStateQueue, which the publisher of the
+    match puts on straight into the event loop, so no thread waits on a stream and the number of threads does not grow
+    with the number of streams
+    """
 
-            if player_identifier.paddle_type is PaddleType.LEFT:
-                self.left_paddle_queue.put(paddle_action)
-            elif player_identifier.paddle_type is PaddleType.RIGHT:
-                self.right_paddle_queue.put(paddle_action)
+    async def stream_game_state(self, request: PlayerIdentifier, context) -> AsyncGenerator[bytes, None]:
+        """
+        See DefaultPongServicer.stream_game_state
+        """
+        match = self.match_registry.match_of(request.match_id)
+        if match is None:
+            await context.abort(grpc.StatusCode.NOT_FOUND, f"No player registered for match '{request.match_id}'")
+        game_state_queue = match.game_state_queue_of(request.paddle_type)
+        if not isinstance(game_state_queue, EventLoopGameStateQueue):
+            await context.abort(grpc.StatusCode.FAILED_PRECONDITION,
+                                f"No {PaddleType.Name(request.paddle_type)} player registered for match "
+                                f"'{request.match_id}'")
+        match.start_stream(request.paddle_type)
+
+        try:
+            while True:
+                first_game_state = await game_state_queue.get()
+                following_game_states = [game_state_queue.get_nowait() for _ in range(game_state_queue.qsize())]
+                if first_game_state is None or None in following_game_states:
+                    return
+                yield game_state_buffer_of([first_game_state] + following_game_states, game_state_queue)
+        finally:
+            # stopping the match waits for its threads, so not on the event loop
+            asyncio.get_running_loop().run_in_executor(None, self.match_registry.end_stream, request.match_id,
+                                                       request.paddle_type)
+
+    async def register_player(self, request: PlayerRegistration, context) -> RegistrationReply:
+        event_loop = asyncio.get_running_loop()
+        # registering may wait on the registration lock of the match, so it must not hold up the event loop
+        return await event_loop.run_in_executor(
+            None, self.register_player_with, request,
+            functools.partial(EventLoopGameStateQueue, event_loop=event_loop))
+
+    async def submit_paddle_actions(self, request_iterator: AsyncIterator[PaddleAction], context):
+        async for paddle_action in request_iterator:
+            # the paddle action queues are unbounded, so this never blocks the event loop
+            self.queue_paddle_action(paddle_action)
         return Empty()
 
 
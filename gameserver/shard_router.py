@@ -0,0 +1,200 @@
+import multiprocessing
+import multiprocessing.connection
+import zlib
+from concurrent import futures
+from typing import Callable, Iterator, List
+
+import grpc
+
+from config import logging_configurator
+from gameserver.pong_server import SERVER_OPTIONS
+from proto_gen.gamemaster_pb2 import PlayerIdentifier, PlayerRegistration, PaddleAction
+
+"""
+ Matches hosted by many processes, so physics and encoding are not limited to the one core the GIL allows a process.
+ A supervisor spawns one shard process per core, each a game master server of its own listening on a port of its
+ own, and every match is hosted by exactly one shard, chosen from its match id.  Players still connect to the one
+ game master port, where a router passes every rpc on to the shard of its match.  The router only parses the first
+ message of an rpc, for the match id, and passes the serialized messages through untouched, so it does not serialize
+ anything again and a frame costs it a copy of its bytes.
+"""
+
+logger = logging_configurator.get_logger(__name__)
+
+SERVICE_NAME = 'GameMaster'
+
+# how long the supervisor waits for a shard to start serving
+SHARD_STARTUP_TIMEOUT_SECONDS = 60
+
+# the maximum message size of the shard channels, as for the channels of the players
+SHARD_CHANNEL_OPTIONS = [('grpc.max_receive_message_length', 100 * 1024 * 1024)]
+
+
+def shard_of(match_id: str, num_shards: int) -> int:
+    """
+    :param match_id:   a match id
+    :param num_shards: the number of shards
+    :return: the shard hosting the match.  The same in every process, unlike hash()
+    """
+    return zlib.crc32(match_id.encode('utf-8')) % num_shards
+
+
+def shard_port(port: int, shard: int) -> int:
+    """
+    :param port:  the game master port, where the router listens
+    :param shard: a shard
+    :return: the port the shard listens on
+    """
+    return port + 1 + shard
+
+
+def _paddle_actions(first_paddle_action: bytes, request_iterator: Iterator[bytes]) -> Iterator[bytes]:
+    yield first_paddle_action
+    try:
+        yield from request_iterator
+    except grpc.RpcError:
+        # the player is gone, which ends the paddle actions to the shard as well
+        return
+
+
+class ShardStub:
+    """
+    Calls a shard with serialized messages
+    """
+
+    def __init__(self, channel: grpc.Channel):
+        # without serializers, requests and responses are passed as bytes
+        self.channel = channel
+        self.stream_game_state = channel.unary_stream(f'/{SERVICE_NAME}/stream_game_state')
+        self.register_player = channel.unary_unary(f'/{SERVICE_NAME}/register_player')
+        self.submit_paddle_actions = channel.stream_unary(f'/{SERVICE_NAME}/submit_paddle_actions')
+
+
+class ShardRouter:
+    """
+    Passes every rpc on to the shard hosting its match
+    """
+
+    def __init__(self, shard_stubs: List[ShardStub]):
+        """
+        :param shard_stubs: a stub of every shard, by shard
+        """
+        self.shard_stubs = shard_stubs
+
+    def shard_stub_of(self, player_identifier: PlayerIdentifier) -> ShardStub:
+        return self.shard_stubs[shard_of(player_identifier.match_id, len(self.shard_stubs))]
+
+    def stream_game_state(self, request: bytes, context) -> Iterator[bytes]:
+        game_state_call = self.shard_stub_of(PlayerIdentifier.FromString(request)).stream_game_state(request)
+        # the shard stops streaming once the player is gone
+        context.add_callback(game_state_call.cancel)
+        try:
+            for game_state_buffer in game_state_call:
+                yield game_state_buffer
+        except grpc.RpcError as rpc_error:
+            if rpc_error.code() != grpc.StatusCode.CANCELLED:
+                context.abort(rpc_error.code(), rpc_error.details())
+
+    def register_player(self, request: bytes, context) -> bytes:
+        player_identifier = PlayerRegistration.FromString(request).player_identifier
+        try:
+            return self.shard_stub_of(player_identifier).register_player(request)
+        except grpc.RpcError as rpc_error:
+            context.abort(rpc_error.code(), rpc_error.details())
+
+    def submit_paddle_actions(self, request_iterator: Iterator[bytes], context) -> bytes:
+        # every action of a stream is of the same player, so the first one tells the shard
+        first_paddle_action = next(request_iterator, None)
+        if first_paddle_action is None:
+            return b''
+        player_identifier = PaddleAction.FromString(first_paddle_action).player_identifier
+        try:
+            return self.shard_stub_of(player_identifier).submit_paddle_actions(
+                _paddle_actions(first_paddle_action, request_iterator))
+        except grpc.RpcError as rpc_error:
+            context.abort(rpc_error.code(), rpc_error.details())
+
+    def generic_handler(self) -> grpc.GenericRpcHandler:
+        # without serializers, the handlers are given and return bytes
+        return grpc.method_handlers_generic_handler(SERVICE_NAME, {
+            'stream_game_state': grpc.unary_stream_rpc_method_handler(self.stream_game_state),
+            'register_player': grpc.unary_unary_rpc_method_handler(self.register_player),
+            'submit_paddle_actions': grpc.stream_unary_rpc_method_handler(self.submit_paddle_actions),
+        })
+
+
+class ShardedPongServer:
+    """
+    Spawns the shard processes and routes the rpcs of the players to them
+    """
+
+    def __init__(self, serve_shard: Callable[[int, int], None], num_shards: int, max_workers: int,
+                 thread_prefix: str, port: str):
+        """
+        :param serve_shard:   runs a game master server, called with the shard and the port to listen on in a new
+                              process.  Must be a module level function, as shard processes are spawned
+        :param num_shards:    the number of shard processes, one per core is best
+        :param max_workers:   the size of the thread pool of the router.  A player holds two router threads for the
+                              whole match, so the router serves max_workers / 2 players at most.  Rpcs beyond
+                              max_workers fail with RESOURCE_EXHAUSTED rather than wait for a thread
+        :param thread_prefix: For logging, the name of the router threads
+        :param port:          The listen port for client connections.  Shard n listens on the port n + 1 above it
+        """
+        self.serve_shard = serve_shard
+        self.num_shards = num_shards
+        self.max_workers = max_workers
+        self.thread_prefix = thread_prefix
+        self.port = int(port)
+        self.shard_processes: List[multiprocessing.Process] = []
+        self.shard_channels: List[grpc.Channel] = []
+
+    def start_shards(self):
+        # spawned rather than forked, as grpc does not survive a fork
+        spawn_context = multiprocessing.get_context('spawn')
+        for shard in range(self.num_shards):
+            shard_process = spawn_context.Process(target=self.serve_shard,
+                                                  args=(shard, shard_port(self.port, shard)),
+                                                  name=f"game_master_shard_{shard}", daemon=True)
+            shard_process.start()
+            self.shard_processes.append(shard_process)
+        for shard in range(self.num_shards):
+            channel = grpc.insecure_channel(f"localhost:{shard_port(self.port, shard)}",
+                                            options=SHARD_CHANNEL_OPTIONS)
+            grpc.channel_ready_future(channel).result(timeout=SHARD_STARTUP_TIMEOUT_SECONDS)
+            self.shard_channels.append(channel)
+        logger.info(f"{self.num_shards} game master shards serving on ports {shard_port(self.port, 0)} to "
+                    f"{shard_port(self.port, self.num_shards - 1)}")
+
+    def stop_shards(self):
+        for channel in self.shard_channels:
+            channel.close()
+        for shard_process in self.shard_processes:
+            shard_process.terminate()
+        for shard_process in self.shard_processes:
+            shard_process.join()
+
+    def start_server_blocking(self):
+        self.start_shards()
+        shard_router = ShardRouter([ShardStub(channel) for channel in self.shard_channels])
+
+        # see SERVER_OPTIONS about grpc.so_reuseport.  Streams hold their thread for the whole match, so an rpc
+        # queued behind them would wait for a match to end.  Rather than that, rpcs beyond the pool are refused
+        server = grpc.server(futures.ThreadPoolExecutor(max_workers=self.max_workers,
+                                                        thread_name_prefix=self.thread_prefix),
+                             handlers=(shard_router.generic_handler(),),
+                             options=SERVER_OPTIONS,
+                             maximum_concurrent_rpcs=self.max_workers)
+        server.add_insecure_port("{}:{}".format('localhost', self.port))
+        server.start()
+        logger.info(f"Routing matches to {self.num_shards} shards from port {self.port}, for up to "
+                    f"{self.max_workers // 2} players")
+
+        # a match on a dead shard cannot be played, so the server goes down with any shard
+        try:
+            multiprocessing.connection.wait([shard_process.sentinel for shard_process in self.shard_processes])
+            logger.error("A game master shard exited, stopping the server")
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.stop(0)
+            self.stop_shards()
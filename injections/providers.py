@@ -6,19 +6,25 @@ import dependency_injector.providers as providers
 from config import property_configurator
 from config.property_configurator import server_client_communication_config
 from gameengine.arena import Arena
+from gameengine.batch_engine import BatchArenaEngine
+from gameengine.broadphase import SweepAndPruneBroadphase
 from gameengine.ball_to_ball_collision import BilliardBallCollider
 from gameengine.ball_to_barrier_collision import IncidentAngleRebounder
 from gameengine.ball_to_paddle_collision import BallPaddleCollider, CollisionStrategyByFlavor, update_primary_ball
 from gameengine.collision_engine import CollisionPairHandlerFactory, AccurateGameCollisionEngine, \
-    FastGameCollisionEngine
+    FastGameCollisionEngine, FixedTimestepGameEngine
+from gameengine.continuous_collision_engine import ContinuousGameCollisionEngine
 from gameengine.paddle_to_wall_collision import PaddleWallCollider
 from gamerender.pongrenders import DefaultPongRenderer
-from gameserver.pong_server import PongServer
-from gameserver.pong_servicer import DummyPongServicer, DefaultPongServicer
+from gamerender.publishing import GameStatePublisher
+from gameserver.pong_server import PongServer, AsyncPongServer
+from gameserver.match_registry import MatchRegistry
+from gameserver.pong_servicer import DummyPongServicer, DefaultPongServicer, AsyncPongServicer
 from paddles.paddle import StationaryPaddle, FollowTheBallPaddle, AlwaysDownPaddle, AlwaysUpPaddle, \
     EnhancedFollowTheBallPaddle
 from player.controller import PlayerController
 from proto_gen.gamemaster_pb2 import PaddleType
+from translators.proto_translations import ArenaFrameEncoder
 
 
 class PaddleProviders(containers.DeclarativeContainer):
@@ -53,16 +59,25 @@ class PlayerProviders(containers.DeclarativeContainer):
     left_player = providers.Singleton(PlayerController,
                                       name=property_configurator.player_config.left_player_name,
                                       paddle_type=PaddleType.LEFT,
-                                      paddle_controller=PaddleProviders.left_follow_the_ball_paddle)
+                                      match_id=property_configurator.player_config.match_id,
+                                      paddle_controller=PaddleProviders.left_follow_the_ball_paddle,
+                                      frame_transport=property_configurator.player_config.frame_transport,
+                                      delivery_policy=property_configurator.player_config.delivery_policy)
 
     right_player = providers.Singleton(PlayerController,
                                        name=property_configurator.player_config.right_player_name,
                                        paddle_type=PaddleType.RIGHT,
-                                       paddle_controller=PaddleProviders.right_enhanced_follow_the_ball_paddle)
+                                       match_id=property_configurator.player_config.match_id,
+                                       paddle_controller=PaddleProviders.right_enhanced_follow_the_ball_paddle,
+                                       frame_transport=property_configurator.player_config.frame_transport,
+                                       delivery_policy=property_configurator.player_config.delivery_policy)
 
 
 class GameArenaProvider(containers.DeclarativeContainer):
-    default_arena = providers.Singleton(Arena)
+    default_arena = providers.Singleton(Arena, seed=property_configurator.match_play_config.random_seed)
+
+    # a new arena for every match the server hosts, seeded by the match registry
+    match_arena = providers.Factory(Arena)
 
 
 class GameEngineProviders(containers.DeclarativeContainer):
@@ -90,11 +105,35 @@ class GameEngineProviders(containers.DeclarativeContainer):
                                                          ball_to_paddle_handler=ball_paddle_collision,
                                                          paddle_to_wall_handler=paddle_wall_collision)
 
+    # narrows down the pairs of actors that may collide, each engine keeps its own index of stationary actors
+    broadphase = providers.Factory(SweepAndPruneBroadphase)
+
     accurate_game_engine = providers.Singleton(AccurateGameCollisionEngine,
-                                               collision_pair_handler_factory=collision_pair_handler_factory)
+                                               collision_pair_handler_factory=collision_pair_handler_factory,
+                                               broadphase=broadphase)
 
     fast_game_engine = providers.Singleton(FastGameCollisionEngine,
-                                           collision_pair_handler_factory=collision_pair_handler_factory)
+                                           collision_pair_handler_factory=collision_pair_handler_factory,
+                                           broadphase=broadphase)
+
+    # resolves collisions at their exact time of impact
+    continuous_game_engine = providers.Singleton(ContinuousGameCollisionEngine, broadphase=broadphase)
+
+    # runs the fast engine at a physics rate of physics_substeps steps per rendered frame
+    fixed_timestep_game_engine = providers.Singleton(FixedTimestepGameEngine,
+                                                     game_engine=fast_game_engine,
+                                                     substeps=property_configurator.game_engine_config.physics_substeps)
+
+    # a new engine for every match the server hosts, as the broadphase of an engine keeps state of its own
+    match_game_engine = providers.Factory(FixedTimestepGameEngine,
+                                          game_engine=providers.Factory(FastGameCollisionEngine,
+                                                                        collision_pair_handler_factory=collision_pair_handler_factory,
+                                                                        broadphase=broadphase),
+                                          substeps=property_configurator.game_engine_config.physics_substeps)
+
+    # steps many independent games at once, for generating training transitions without rendering
+    batch_arena_engine = providers.Factory(BatchArenaEngine,
+                                           num_games=property_configurator.game_engine_config.batch_num_games)
 
 
 class ThreadCommunicationProviders(containers.DeclarativeContainer):
@@ -108,18 +147,36 @@ class ThreadCommunicationProviders(containers.DeclarativeContainer):
     left_paddle_action_queue = providers.Singleton(Queue)
     right_paddle_action_queue = providers.Singleton(Queue)
 
+    # serializes every game state once, off the game thread, onto the game state queues
+    game_state_publisher = providers.Singleton(GameStatePublisher,
+                                               left_game_state_queue=left_game_state_queue,
+                                               right_game_state_queue=right_game_state_queue,
+                                               max_pending_frames=server_client_communication_config.max_game_state_buffer_size)
+
 
 class GameRendererProviders(containers.DeclarativeContainer):
     """
     Container for game rendering objects
     """
+    # packs the arena frames sent to players, one encoder per distinct observation
+    arena_frame_encoder = providers.Factory(ArenaFrameEncoder,
+                                            frame_encoding=server_client_communication_config.frame_encoding,
+                                            keyframe_interval=server_client_communication_config.keyframe_interval,
+                                            compression_level=server_client_communication_config.keyframe_compression_level,
+                                            delta_from_keyframe=server_client_communication_config.delta_from_keyframe)
+
     pong_renderer = providers.Factory(DefaultPongRenderer,
                                       arena=GameArenaProvider.default_arena,
-                                      game_engine=GameEngineProviders.fast_game_engine,
+                                      game_engine=GameEngineProviders.fixed_timestep_game_engine,
                                       left_paddle_queue=ThreadCommunicationProviders.left_paddle_action_queue,
                                       right_paddle_queue=ThreadCommunicationProviders.right_paddle_action_queue,
-                                      left_game_state_queue=ThreadCommunicationProviders.left_game_state_queue,
-                                      right_game_state_queue=ThreadCommunicationProviders.right_game_state_queue,
+                                      game_state_publisher=ThreadCommunicationProviders.game_state_publisher,
+                                      headless=property_configurator.game_render_config.is_headless,
+                                      replay_log_path=property_configurator.match_play_config.replay_log_path,
+                                      pixel_format=server_client_communication_config.pixel_format,
+                                      frame_encoder_factory=arena_frame_encoder.delegate(),
+                                      shared_memory_ring_slots=server_client_communication_config.shared_memory_ring_slots,
+                                      pipeline_depth=property_configurator.game_render_config.pipeline_depth,
                                       )
 
 
@@ -130,14 +187,22 @@ class ServicerProviders(containers.DeclarativeContainer):
     # For testing
     dummy_pong_servicer = providers.Factory(DummyPongServicer)
 
+    # every match the server hosts gets an arena, engine, renderer and queues of its own
+    match_registry = \
+        providers.Singleton(MatchRegistry,
+                            pong_renderer_factory=GameRendererProviders.pong_renderer.delegate(),
+                            arena_factory=GameArenaProvider.match_arena.delegate(),
+                            game_engine_factory=GameEngineProviders.match_game_engine.delegate(),
+                            max_game_state_buffer_size=server_client_communication_config.max_game_state_buffer_size,
+                            max_matches=property_configurator.game_server_config.max_matches,
+                            random_seed=property_configurator.match_play_config.random_seed,
+                            replay_log_path=property_configurator.match_play_config.replay_log_path)
+
     # the real deal
-    default_pong_servicer = \
-        providers.Factory(DefaultPongServicer,
-                          left_paddle_queue=ThreadCommunicationProviders.left_paddle_action_queue,
-                          right_paddle_queue=ThreadCommunicationProviders.right_paddle_action_queue,
-                          left_game_state_queue=ThreadCommunicationProviders.left_game_state_queue,
-                          right_game_state_queue=ThreadCommunicationProviders.right_game_state_queue,
-                          pong_renderer=GameRendererProviders.pong_renderer)
+    default_pong_servicer = providers.Factory(DefaultPongServicer, match_registry=match_registry)
+
+    # streams are coroutines, for the asyncio server
+    async_pong_servicer = providers.Factory(AsyncPongServicer, match_registry=match_registry)
 
 
 class GrpcServerProviders(containers.DeclarativeContainer):
@@ -149,3 +214,7 @@ class GrpcServerProviders(containers.DeclarativeContainer):
                                       max_workers=property_configurator.game_server_config.max_workers,
                                       thread_prefix=property_configurator.game_server_config.thread_pool_prefix,
                                       port=property_configurator.game_server_config.port)
+
+    async_pong_server = providers.Singleton(AsyncPongServer,
+                                            servicer=ServicerProviders.async_pong_servicer,
+                                            port=property_configurator.game_server_config.port)
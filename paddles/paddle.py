@@ -4,13 +4,18 @@ from typing import Optional
 
 from config import logging_configurator
 from paddles.paddle_utils import GameStateWrapper
-from proto_gen.gamemaster_pb2 import PaddleAction, PaddleDirective, PaddleType, GameStateBuffer
+from proto_gen.gamemaster_pb2 import PaddleAction, PaddleDirective, PaddleType, GameStateBuffer, ObservationSpec, \
+    ObservationMode
 
 logger = logging_configurator.get_logger(__name__)
 
+# what paddles that only look at the paddles and balls ask to be sent
+VECTOR_ONLY_OBSERVATION = ObservationSpec(mode=ObservationMode.VECTOR_ONLY)
+
 
 class PaddleController(ABC):
-    def __init__(self, paddle_type: PaddleType, mirror_image: bool = False, preserve_alpha: bool = False):
+    def __init__(self, paddle_type: PaddleType, mirror_image: bool = False, preserve_alpha: bool = False,
+                 seed: Optional[int] = None, observation_spec: Optional[ObservationSpec] = None):
         """
 
         :param paddle_type:    left of right
@@ -19,8 +24,13 @@ class PaddleController(ABC):
         left becomes right and right becomes left.  This is useful if a paddle model has been trained on the
         left hand side so that it can be used on the right hand side
         :param preserve_alpha: if true, the alpha channel will be preserved in the grey scale and rgb images
+        :param seed:           seed for any random choices of the paddle.  If None, the paddle is not reproducible
+        :param observation_spec: what the server sends every frame.  Defaults to the full observation, every actor
+        and the arena frame.  Ask only for what process_game_state uses, the server then builds nothing else
         """
         self._paddle_type = paddle_type
+        self.observation_spec = observation_spec or ObservationSpec()
+        self.rng = random.Random(seed)
         self.game_state_wrapper = GameStateWrapper(paddle_type, mirror_image, preserve_alpha)
 
     @abstractmethod
@@ -38,7 +48,7 @@ class PaddleController(ABC):
 
 class StationaryPaddle(PaddleController):
     def __init__(self, paddle_type: PaddleType):
-        super().__init__(paddle_type)
+        super().__init__(paddle_type, observation_spec=VECTOR_ONLY_OBSERVATION)
 
     def process_game_state(self, game_state_buffer: GameStateBuffer):
         return PaddleAction(paddle_directive=PaddleDirective.STATIONARY)
@@ -46,7 +56,7 @@ class StationaryPaddle(PaddleController):
 
 class AlwaysUpPaddle(PaddleController):
     def __init__(self, paddle_type: PaddleType):
-        super().__init__(paddle_type)
+        super().__init__(paddle_type, observation_spec=VECTOR_ONLY_OBSERVATION)
 
     def process_game_state(self, game_state_buffer: GameStateBuffer):
         return PaddleAction(paddle_directive=PaddleDirective.UP)
@@ -54,15 +64,15 @@ class AlwaysUpPaddle(PaddleController):
 
 class AlwaysDownPaddle(PaddleController):
     def __init__(self, paddle_type: PaddleType):
-        super().__init__(paddle_type)
+        super().__init__(paddle_type, observation_spec=VECTOR_ONLY_OBSERVATION)
 
     def process_game_state(self, game_state_buffer: GameStateBuffer):
         return PaddleAction(paddle_directive=PaddleDirective.DOWN)
 
 
 class FollowTheBallPaddle(PaddleController):
-    def __init__(self, paddle_type: PaddleType):
-        super().__init__(paddle_type)
+    def __init__(self, paddle_type: PaddleType, seed: Optional[int] = None):
+        super().__init__(paddle_type, seed=seed, observation_spec=VECTOR_ONLY_OBSERVATION)
 
     def process_game_state(self, game_state_buffer: GameStateBuffer):
         # lets just get the most recent game state
@@ -70,19 +80,19 @@ class FollowTheBallPaddle(PaddleController):
         primary_ball = self.game_state_wrapper.primary_ball
         my_paddle = self.game_state_wrapper.my_paddle
 
-        if primary_ball.shape.centroid.y < my_paddle.shape.centroid.y:
+        if primary_ball.center[1] < my_paddle.center[1]:
             directive = PaddleDirective.UP
-        elif primary_ball.shape.centroid.y > my_paddle.shape.centroid.y:
+        elif primary_ball.center[1] > my_paddle.center[1]:
             directive = PaddleDirective.DOWN
         else:
             # lets add some randomness here so that when the paddles play each other they don't get stuck in a loop
-            directive = random.choice([PaddleDirective.UP, PaddleDirective.DOWN])
+            directive = self.rng.choice([PaddleDirective.UP, PaddleDirective.DOWN])
         return PaddleAction(paddle_directive=directive)
 
 
 class EnhancedFollowTheBallPaddle(PaddleController):
-    def __init__(self, paddle_type: PaddleType, mirror_image=False):
-        super().__init__(paddle_type, mirror_image)
+    def __init__(self, paddle_type: PaddleType, mirror_image=False, seed: Optional[int] = None):
+        super().__init__(paddle_type, mirror_image, seed=seed, observation_spec=VECTOR_ONLY_OBSERVATION)
 
     def process_game_state(self, game_state_buffer: GameStateBuffer):
         # lets just get the most recent game state
@@ -92,19 +102,19 @@ class EnhancedFollowTheBallPaddle(PaddleController):
 
         ball_moving_away = primary_ball.vel.vel_x > 0
         if ball_moving_away:
-            arena_height = self.game_state_wrapper.image_grey_array.shape[0] // 2
-            if my_paddle.shape.centroid.y > arena_height:
+            arena_height = self.game_state_wrapper.arena_height // 2
+            if my_paddle.center[1] > arena_height:
                 directive = PaddleDirective.UP
-            elif my_paddle.shape.centroid.y < arena_height:
+            elif my_paddle.center[1] < arena_height:
                 directive = PaddleDirective.DOWN
             else:
                 directive = PaddleDirective.STATIONARY
         else:
-            if primary_ball.shape.centroid.y < my_paddle.shape.centroid.y:
+            if primary_ball.center[1] < my_paddle.center[1]:
                 directive = PaddleDirective.UP
-            elif primary_ball.shape.centroid.y > my_paddle.shape.centroid.y:
+            elif primary_ball.center[1] > my_paddle.center[1]:
                 directive = PaddleDirective.DOWN
             else:
                 # lets add some randomness here so that when the paddles play each other they don't get stuck in a loop
-                directive = random.choice([PaddleDirective.UP, PaddleDirective.DOWN])
+                directive = self.rng.choice([PaddleDirective.UP, PaddleDirective.DOWN])
         return PaddleAction(paddle_directive=directive)
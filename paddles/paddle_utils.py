@@ -1,4 +1,5 @@
-from typing import Tuple, Optional, List
+import zlib
+from typing import Tuple, Optional, List, Iterable
 
 import numpy
 from PIL import Image
@@ -6,9 +7,14 @@ from shapely import affinity
 from shapely.geometry import Polygon
 
 from gameengine.gameactors import Velocity
-from proto_gen.gamemaster_pb2 import ImageFrame, PaddleType, GameState, Actor, ScoreCard, ActorType
+from gameengine.primitives import Primitive, Box, Circle, PolygonPrimitive
+from proto_gen.gamemaster_pb2 import ImageFrame, PaddleType, GameState, Actor, ScoreCard, ActorType, Palette, \
+    PixelFormat, FrameEncoding, ActorShape, SharedFrameRing as ProtoSharedFrameRing
+from translators.shared_frames import PIXEL_DTYPES, SharedFrameRing
 
 
+MISSING_PALETTE_MESSAGE = "A PALETTE8 frame can only be decoded with the palette of the registration reply"
+
 def color_integer_to_rgb(color_integer: int) -> Tuple[int, int, int, int]:
     """
     Converts a color integer representing 32 bit depth into tuple of (alpha, red, blue, green)
@@ -22,11 +28,26 @@ def color_integer_to_rgb(color_integer: int) -> Tuple[int, int, int, int]:
     return alpha, red, green, blue
 
 
-def image_frame_to_array(image_frame: ImageFrame) -> numpy.ndarray:
+def image_frame_to_palette_indices(image_frame: ImageFrame) -> numpy.ndarray:
+    """
+    :param image_frame:  a RAW PALETTE8 frame from the pygame server
+    :return: a numpy array of palette indices
     """
-    :param image_frame:  a frame from the pygame server
-    :return: a numpy array representation
+    flat_array: numpy.ndarray = numpy.frombuffer(image_frame.image, dtype=numpy.uint8)
+    return numpy.reshape(flat_array, (image_frame.num_rows, image_frame.num_cols))
+
+
+def image_frame_to_array(image_frame: ImageFrame,
+                         palette: Optional['PaletteLookup'] = None) -> numpy.ndarray:
     """
+    :param image_frame:  a RAW frame from the pygame server
+    :param palette:      the palette from registration, needed to decode PALETTE8 frames
+    :return: a numpy array representation, with pixels as 32 bit color
+    """
+    if image_frame.pixel_format == PixelFormat.PALETTE8:
+        if palette is None:
+            raise ValueError(MISSING_PALETTE_MESSAGE)
+        return palette.color32[image_frame_to_palette_indices(image_frame)]
     flat_array: numpy.ndarray = numpy.frombuffer(image_frame.image, dtype=numpy.uint32)
     return numpy.reshape(flat_array, (image_frame.num_rows, image_frame.num_cols))
 
@@ -63,19 +84,182 @@ def convert_bitdepth32_to_rgb(array: numpy.ndarray, preserve_alpha: bool = False
     return numpy.array(rgb_image)
 
 
+def grey_levels_to_channels(grey_levels: numpy.ndarray, num_channels: int, preserve_alpha: bool = False):
+    """
+    Converts a GREY8 frame to the layout of the conversions above
+    :param grey_levels:    the grey level of every pixel
+    :param num_channels:   1 for grey scale, 3 for rgb
+    :param preserve_alpha: if true, an opaque alpha channel is added
+    :return: the grey level of every pixel, repeated in each channel
+    """
+    if num_channels == 1 and not preserve_alpha:
+        return grey_levels
+    channels = [grey_levels] * num_channels
+    if preserve_alpha:
+        channels.append(numpy.full_like(grey_levels, 255))
+    return numpy.stack(channels, axis=-1)
+
+
+class PaletteLookup:
+    """
+    Decodes arrays of palette indices into the same color32, grey scale and rgb arrays the conversions above give for
+    32 bit color frames.  Each conversion is applied once to the palette itself, then looked up per pixel
+    """
+
+    def __init__(self, palette: Palette):
+        """
+        :param palette: the palette sent by the server at registration
+        """
+        # a one row image holding every color of the palette
+        self.color32 = numpy.array(palette.colors, dtype=numpy.uint32)
+        palette_image = self.color32[numpy.newaxis, :]
+        self.grey = convert_bitdepth32_to_greyscale(palette_image)[0]
+        self.grey_alpha = convert_bitdepth32_to_greyscale(palette_image, preserve_alpha=True)[0]
+        self.rgb = convert_bitdepth32_to_rgb(palette_image)[0]
+        self.rgba = convert_bitdepth32_to_rgb(palette_image, preserve_alpha=True)[0]
+
+    def to_grey(self, palette_indices: numpy.ndarray, preserve_alpha: bool = False) -> numpy.ndarray:
+        return (self.grey_alpha if preserve_alpha else self.grey)[palette_indices]
+
+    def to_rgb(self, palette_indices: numpy.ndarray, preserve_alpha: bool = False) -> numpy.ndarray:
+        return (self.rgba if preserve_alpha else self.rgb)[palette_indices]
+
+
+def unpack_pixel_runs(image: bytes, reference_pixels: numpy.ndarray) -> numpy.ndarray:
+    """
+    :param image:            DELTA_RUNS image bytes, see FrameEncoding in gamemaster.proto
+    :param reference_pixels: the flat pixels of the frame the delta applies to
+    :return: the flat pixels of the frame
+    """
+    run_count = int(numpy.frombuffer(image, dtype='<u4', count=1)[0])
+    if run_count == 0:
+        return reference_pixels
+    run_starts = numpy.frombuffer(image, dtype='<u4', count=run_count, offset=4).astype(numpy.int64)
+    run_lengths = numpy.frombuffer(image, dtype='<u4', count=run_count, offset=4 + 4 * run_count).astype(numpy.int64)
+    changed_values = numpy.frombuffer(image, dtype=reference_pixels.dtype, offset=4 + 8 * run_count)
+
+    # the index of every changed pixel is the start of its run plus its position within the run
+    run_offsets = numpy.cumsum(run_lengths) - run_lengths
+    changed_indices = numpy.repeat(run_starts - run_offsets, run_lengths) + numpy.arange(len(changed_values))
+    pixels = reference_pixels.copy()
+    pixels[changed_indices] = changed_values
+    return pixels
+
+
+class ArenaFrameDecoder:
+    """
+    Decodes the arena frames of consecutive game states.  A DELTA_RUNS frame only decodes against the frame it was
+    encoded against, either the previous frame or the last keyframe, so the frame of every game state should pass
+    through decode, in order, even when only the latest game state is used.  A frame that cannot be decoded is
+    skipped, frames decode again from the next keyframe on.  A SHARED_SLOT frame is a view of the shared frame ring,
+    and cannot be decoded once the server has written the slot again
+    """
+
+    def __init__(self):
+        # the last decoded frame and the last decoded keyframe, with their state iterations
+        self._last_pixels: Optional[numpy.ndarray] = None
+        self._last_iteration: Optional[int] = None
+        self._keyframe_pixels: Optional[numpy.ndarray] = None
+        self._keyframe_iteration: Optional[int] = None
+        self.shared_frame_ring: Optional[SharedFrameRing] = None
+        self.undecodable_frame_count: int = 0
+
+    def set_shared_frame_ring(self, proto_ring: ProtoSharedFrameRing):
+        """
+        :param proto_ring: the shared frame ring sent by the server at registration
+        :return: None
+        """
+        if self.shared_frame_ring is not None:
+            self.shared_frame_ring.close()
+        self.shared_frame_ring = SharedFrameRing.attach(proto_ring)
+
+    def decode(self, game_state: GameState) -> Optional[numpy.ndarray]:
+        """
+        :param game_state: a game state from the server
+        :return: the read only pixels of the arena frame, with shape (rows, columns), as uint8 palette indices or grey
+                 levels or uint32 colors depending on the pixel format.  None if the game state has no arena frame or
+                 the frame is a delta against a missed frame
+        """
+        if not game_state.HasField('arena_frame'):
+            return None
+        image_frame = game_state.arena_frame
+        if image_frame.encoding == FrameEncoding.SHARED_SLOT:
+            # read the slot every time, it may have been written again since
+            pixels = None if self.shared_frame_ring is None \
+                else self.shared_frame_ring.read(image_frame.shared_slot, game_state.state_iteration)
+            if pixels is None:
+                self.undecodable_frame_count += 1
+            return pixels
+        if self._last_iteration is not None and game_state.state_iteration == self._last_iteration:
+            return self._last_pixels
+
+        dtype = PIXEL_DTYPES[image_frame.pixel_format]
+        is_keyframe = image_frame.encoding != FrameEncoding.DELTA_RUNS
+        if is_keyframe:
+            image = zlib.decompress(image_frame.image) if image_frame.encoding == FrameEncoding.ZLIB \
+                else image_frame.image
+            flat_pixels = numpy.frombuffer(image, dtype=dtype)
+        elif self._last_iteration is not None and image_frame.reference_iteration == self._last_iteration:
+            flat_pixels = unpack_pixel_runs(image_frame.image, self._last_pixels.reshape(-1))
+        elif self._keyframe_iteration is not None and image_frame.reference_iteration == self._keyframe_iteration:
+            flat_pixels = unpack_pixel_runs(image_frame.image, self._keyframe_pixels.reshape(-1))
+        else:
+            self.undecodable_frame_count += 1
+            return None
+
+        pixels = flat_pixels.reshape((image_frame.num_rows, image_frame.num_cols))
+        pixels.flags.writeable = False
+        self._last_pixels, self._last_iteration = pixels, game_state.state_iteration
+        if is_keyframe:
+            self._keyframe_pixels, self._keyframe_iteration = pixels, game_state.state_iteration
+        return pixels
+
+
 class ActorSummary:
-    def __init__(self, poly: Polygon, vel: Velocity):
-        self.shape = poly
+    """
+    An actor of a game state.  The center and velocity are at hand, the shapely polygon is only built when asked for
+    """
+
+    def __init__(self, primitive: Primitive, vel: Velocity):
+        self.primitive = primitive
         self.vel = vel
+        self._shape: Optional[Polygon] = None
+
+    @property
+    def center(self) -> numpy.ndarray:
+        return self.primitive.center
+
+    @property
+    def shape(self) -> Polygon:
+        if self._shape is None:
+            self._shape = self.primitive.to_geometry()
+        return self._shape
 
 
 def actor_to_summary(actor: Actor, transform: List[int]) -> ActorSummary:
-    poly = Polygon([(coord.x, coord.y) for coord in actor.coords])
-    vel = [actor.velocity.x, actor.velocity.y]
+    """
+    :param actor:     an actor of a game state
+    :param transform: the affine transform to apply to the actor, empty for none.  It must keep boxes axis aligned, as
+                      the mirror image transform of GameStateWrapper does
+    :return: the summary of the actor
+    """
+    center_x, center_y, vel_x, vel_y = actor.geometry[:4]
     if transform:
-        poly = affinity.affine_transform(poly, transform)
-        vel[0] *= -1
-    return ActorSummary(poly, Velocity(*vel))
+        x_x, x_y, y_x, y_y, x_offset, y_offset = transform
+        center_x, center_y = x_x * center_x + x_y * center_y + x_offset, y_x * center_x + y_y * center_y + y_offset
+        vel_x, vel_y = x_x * vel_x + x_y * vel_y, y_x * vel_x + y_y * vel_y
+
+    if actor.shape == ActorShape.BOX:
+        half_width, half_height = actor.geometry[4:6]
+        primitive = Box(center_x - half_width, center_y - half_height, center_x + half_width, center_y + half_height)
+    elif actor.shape == ActorShape.CIRCLE:
+        primitive = Circle(center_x, center_y, actor.geometry[4])
+    else:
+        poly = Polygon([(coord.x, coord.y) for coord in actor.coords])
+        if transform:
+            poly = affinity.affine_transform(poly, transform)
+        primitive = PolygonPrimitive(poly)
+    return ActorSummary(primitive, Velocity(vel_x, vel_y))
 
 
 class GameStateWrapper():
@@ -96,6 +280,16 @@ class GameStateWrapper():
         self.mirror_reflect_arena = mirror_reflect_arena
         self.preserve_alpha = preserve_alpha
         self._game_state: Optional[GameState] = None
+        self.palette: Optional[PaletteLookup] = None
+        self.frame_decoder = ArenaFrameDecoder()
+        # the game states the server dropped because the player fell behind, see DeliveryPolicy
+        self.skipped_game_states = 0
+        self.arena_width: Optional[int] = None
+        self.arena_height: Optional[int] = None
+        self._static_proto_actors: List[Actor] = []
+        self._static_actors: Optional[List[ActorSummary]] = None
+        self._image_palette_array: Optional[numpy.ndarray] = None
+        self._image_grey_levels: Optional[numpy.ndarray] = None
         self._image_color32_array: Optional[numpy.ndarray] = None
         self._image_grey_array: Optional[numpy.ndarray] = None
         self._image_rgb_array: Optional[numpy.ndarray] = None
@@ -108,6 +302,67 @@ class GameStateWrapper():
         # if mirror image is set to true, this provides the affine transform to convert all actors to mirror image
         self.transform: List[int] = []
 
+    def set_palette(self, palette: Palette):
+        """
+        :param palette: the palette sent by the server at registration, used to decode PALETTE8 frames
+        :return: None
+        """
+        self.palette = PaletteLookup(palette)
+
+    def set_arena_size(self, arena_width: int, arena_height: int):
+        """
+        :param arena_width:  the width of the arena sent by the server at registration, in the coordinates of the actors
+        :param arena_height: the height of the arena
+        :return: None
+        """
+        self.arena_width = arena_width
+        self.arena_height = arena_height
+        if self.mirror_reflect_arena:
+            # [-1 0   xoffset]
+            # [0 1    yoffset]
+            # This transforms basis so x-axis is flipped and then slides the origin back the full width of the arena
+            # to provide a mirror image
+            self.transform[:] = [-1, 0, 0, 1, arena_width, 0]
+        self._static_actors = None
+
+    def set_static_actors(self, static_actors: Iterable[Actor]):
+        """
+        :param static_actors: the actors that never move, sent by the server at registration.  Game states leave them out
+        :return: None
+        """
+        self._static_proto_actors = list(static_actors)
+        self._static_actors = None
+
+    def set_shared_frame_ring(self, proto_ring: ProtoSharedFrameRing):
+        """
+        Arena frames are then read straight from shared memory, without a copy.  The image arrays of a game state are
+        views of the ring, valid until the server comes round the ring again
+        :param proto_ring: the shared frame ring sent by the server at registration
+        :return: None
+        """
+        self.frame_decoder.set_shared_frame_ring(proto_ring)
+
+    @property
+    def static_actors(self) -> List[ActorSummary]:
+        """
+        :return:  the walls, net and back lines
+        """
+        if self._static_actors is None:
+            self._static_actors = [actor_to_summary(actor, self.transform) for actor in self._static_proto_actors]
+        return self._static_actors
+
+    def track_game_states(self, game_states: Iterable[GameState], skipped_game_states: int = 0):
+        """
+        Decodes the arena frame of every game state, in order, so delta encoded frames stay decodable when only the
+        latest game state of a buffer is used
+        :param game_states:         the game states of a game state buffer
+        :param skipped_game_states: the skipped_game_states of the game state buffer
+        :return: None
+        """
+        self.skipped_game_states += skipped_game_states
+        for game_state in game_states:
+            self.frame_decoder.decode(game_state)
+
     @property
     def game_state(self) -> GameState:
         """
@@ -120,26 +375,67 @@ class GameStateWrapper():
         self._game_state = game_state
         self._primary_ball = None
         self._my_paddle = None
-        self._oppenent_paddle = None
+        self._opponent_paddle = None
         self._my_scorecard = None
         self._oppenent_scorecard = None
+        self._image_palette_array = None
+        self._image_grey_levels = None
+        self._image_color32_array = None
+        self._image_grey_array = None
+        self._image_rgb_array = None
+
+        # palette and grey frames are only decoded to color on demand
+        arena_frame = self._game_state.arena_frame
+        pixels = self.frame_decoder.decode(game_state)
+        if pixels is not None and self.mirror_reflect_arena:
+            pixels = numpy.fliplr(pixels)
+        if arena_frame.pixel_format == PixelFormat.PALETTE8:
+            self._image_palette_array = pixels
+        elif arena_frame.pixel_format == PixelFormat.GREY8:
+            self._image_grey_levels = pixels
+        else:
+            self._image_color32_array = pixels
+
+        if self.mirror_reflect_arena and not self.transform:
+            # without the arena size from registration, the frame is taken to span the full arena
+            self.transform.extend([-1, 0, 0, 1, arena_frame.num_cols, 0])
+
+    @property
+    def has_arena_frame(self) -> bool:
+        """
+        :return:  False if the game state has no arena frame, see ObservationSpec, or the arena frame could not be
+        decoded, see ArenaFrameDecoder
+        """
+        return self._image_palette_array is not None or self._image_grey_levels is not None or \
+               self._image_color32_array is not None
 
-        self._image_color32_array = image_frame_to_array(self._game_state.arena_frame)
+    def _required_palette(self) -> 'PaletteLookup':
+        """
+        :return: the palette to decode PALETTE8 frames with
+        """
+        if self.palette is None:
+            raise ValueError(MISSING_PALETTE_MESSAGE)
+        return self.palette
 
-        if self.mirror_reflect_arena:
-            self._image_color32_array = numpy.fliplr(self._image_color32_array)
-            if not self.transform:
-                # [-1 0   xoffset]
-                # [0 1    yoffset]
-                # This transforms basis so x-axis is flipped and then slides the origin back the full width of the frame
-                # to provide a mirror image
-                self.transform.extend([-1, 0, 0, 1, self._image_color32_array.shape[1], 0])
+    @property
+    def image_palette_array(self) -> Optional[numpy.ndarray]:
+        """
+        :return:  the arena frame as palette indices, None if the server sends 32 bit color frames or the frame could
+        not be decoded
+        """
+        return self._image_palette_array
 
     @property
     def image_color32_array(self) -> numpy.ndarray:
         """
-        :return:  the arena frame where rgba pixels are encoded as 32 bit integers
+        :return:  the arena frame where rgba pixels are encoded as 32 bit integers.  None if there is no arena frame,
+        see has_arena_frame
         """
+        if self._image_color32_array is None:
+            if self._image_palette_array is not None:
+                self._image_color32_array = self._required_palette().color32[self._image_palette_array]
+            elif self._image_grey_levels is not None:
+                self._image_color32_array = self._image_grey_levels.astype(numpy.uint32) * 0x010101
         return self._image_color32_array
 
     @property
@@ -147,8 +443,13 @@ class GameStateWrapper():
         """
         :return: the arena frame as greyscale array
         """
-        if self._image_grey_array is None:
-            self._image_grey_array = convert_bitdepth32_to_greyscale(self._image_color32_array, self.preserve_alpha)
+        if self._image_grey_array is None and self.has_arena_frame:
+            if self._image_palette_array is not None:
+                self._image_grey_array = self._required_palette().to_grey(self._image_palette_array, self.preserve_alpha)
+            elif self._image_grey_levels is not None:
+                self._image_grey_array = grey_levels_to_channels(self._image_grey_levels, 1, self.preserve_alpha)
+            else:
+                self._image_grey_array = convert_bitdepth32_to_greyscale(self._image_color32_array, self.preserve_alpha)
         return self._image_grey_array
 
     @property
@@ -156,8 +457,13 @@ class GameStateWrapper():
         """
         :return: the arena frame as greyscale array
         """
-        if self._image_rgb_array is None:
-            self._image_rgb_array = convert_bitdepth32_to_rgb(self._image_color32_array, self.preserve_alpha)
+        if self._image_rgb_array is None and self.has_arena_frame:
+            if self._image_palette_array is not None:
+                self._image_rgb_array = self._required_palette().to_rgb(self._image_palette_array, self.preserve_alpha)
+            elif self._image_grey_levels is not None:
+                self._image_rgb_array = grey_levels_to_channels(self._image_grey_levels, 3, self.preserve_alpha)
+            else:
+                self._image_rgb_array = convert_bitdepth32_to_rgb(self._image_color32_array, self.preserve_alpha)
         return self._image_rgb_array
 
     @property
@@ -183,7 +489,7 @@ class GameStateWrapper():
         return self._my_paddle
 
     @property
-    def opponent_paddle(self) -> Actor:
+    def opponent_paddle(self) -> ActorSummary:
         if self._opponent_paddle is None:
             if self.paddle_type is PaddleType.LEFT:
                 the_paddle = next(
@@ -193,7 +499,7 @@ class GameStateWrapper():
                     filter(lambda actor: actor.actor_type is ActorType.LEFT_PADDLE, self._game_state.actors), None)
             if the_paddle:
                 self._opponent_paddle = actor_to_summary(the_paddle, self.transform)
-        return self._oppenent_paddle
+        return self._opponent_paddle
 
     @property
     def my_scorecard(self) -> ScoreCard:
@@ -4,7 +4,8 @@ from queue import Queue
 from config import logging_configurator
 from paddles.paddle import PaddleController
 from player import serverstub
-from proto_gen.gamemaster_pb2 import PlayerIdentifier, PaddleType
+from proto_gen.gamemaster_pb2 import PlayerIdentifier, PaddleType, PlayerRegistration, FrameTransport, \
+    ObservationSpec, DeliveryPolicy
 
 logger = logging_configurator.get_logger(__name__)
 
@@ -28,28 +29,52 @@ def paddle_action_provider():
 
 
 class PlayerController:
-    def __init__(self, name: str, paddle_type: PaddleType, paddle_controller: PaddleController):
+    def __init__(self, name: str, paddle_type: PaddleType, paddle_controller: PaddleController,
+                 frame_transport: int = FrameTransport.GRPC, match_id: str = '',
+                 delivery_policy: int = DeliveryPolicy.BLOCK):
         """
 
         :param name:                 player name
         :param paddle_type:          left or right
         :param paddle_controller:    the strategy for moving the paddle
+        :param frame_transport:      how the arena frames are sent, SHARED_MEMORY only works on the host of the server
+        :param match_id:             the match to play in, empty for the default match of the server
+        :param delivery_policy:      what the server does with game states once the player falls behind
         """
         self.paddle_controller = paddle_controller
+        self.frame_transport = frame_transport
+        self.delivery_policy = delivery_policy
         self.player_identifier: PlayerIdentifier = PlayerIdentifier(player_name=name, paddle_type=paddle_type,
-                                                                    paddle_strategy_name=paddle_controller.__class__.__name__)
+                                                                    paddle_strategy_name=paddle_controller.__class__.__name__,
+                                                                    match_id=match_id)
 
     def start_playing(self):
         self._register()
         self._process_game_state()
 
     def _register(self):
-        serverstub.register_player(self.player_identifier)
+        observation_spec = ObservationSpec()
+        observation_spec.CopyFrom(self.paddle_controller.observation_spec)
+        observation_spec.frame_transport = self.frame_transport
+        observation_spec.delivery_policy = self.delivery_policy
+        player_registration = PlayerRegistration(player_identifier=self.player_identifier,
+                                                 observation_spec=observation_spec)
+        registration_reply = serverstub.register_player(player_registration)
+        game_state_wrapper = self.paddle_controller.game_state_wrapper
+        game_state_wrapper.set_palette(registration_reply.palette)
+        game_state_wrapper.set_arena_size(registration_reply.arena_width, registration_reply.arena_height)
+        game_state_wrapper.set_static_actors(registration_reply.static_actors)
+        # the server falls back to grpc when it cannot share memory, and then sends no ring
+        if registration_reply.HasField('shared_frame_ring'):
+            game_state_wrapper.set_shared_frame_ring(registration_reply.shared_frame_ring)
         serverstub.submit_paddle_action_iterator(paddle_action_provider())
 
     def _process_game_state(self):
         for game_state_buffer in serverstub.serve_game_states(self.player_identifier):
             logger.debug(f"Received game state buffer from server having {len(game_state_buffer.game_states)} frames")
+            # paddles usually only look at the latest game state, but delta encoded frames need every frame decoded
+            self.paddle_controller.game_state_wrapper.track_game_states(game_state_buffer.game_states,
+                                                                        game_state_buffer.skipped_game_states)
             paddle_action = self.paddle_controller.process_game_state(game_state_buffer)
             if paddle_action is not None:
                 paddle_action.player_identifier.CopyFrom(self.player_identifier)
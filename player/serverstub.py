@@ -4,14 +4,14 @@ from typing import Generator
 import grpc
 
 from config import logging_configurator
-from proto_gen.gamemaster_pb2 import PlayerIdentifier, PaddleAction, GameStateBuffer
+from proto_gen.gamemaster_pb2 import PlayerIdentifier, PaddleAction, GameStateBuffer, RegistrationReply, \
+    PlayerRegistration
 
 logger = logging_configurator.get_logger(__name__)
 
 from proto_gen.gamemaster_pb2_grpc import GameMasterStub
-from config.property_configurator import GameServerConfig
+from config.property_configurator import game_server_config as _game_server_config
 
-_game_server_config = GameServerConfig()
 _game_master_address = "{}:{}".format(_game_server_config.host, _game_server_config.port)
 
 # the default max message size is 4MB, lets crank that up to 100
@@ -34,16 +34,18 @@ def get_transactional_server_stub() -> Generator[GameMasterStub, None, None]:
     logger.info("Transactional channel to GameMasterService is now closed")
 
 
-def register_player(player_identifier: PlayerIdentifier):
+def register_player(player_registration: PlayerRegistration) -> RegistrationReply:
     """
     Game service is notified that the player is ready to play!
-    :param player_identifier: identity object for player
-    :return:  None
+    :param player_registration: identity object for player and the observation it wants every frame
+    :return:  the reply of the server, holding the palette of the arena frames and the size of the arena
     """
+    player_identifier = player_registration.player_identifier
     with get_transactional_server_stub() as game_master_stub:
-        game_master_stub.register_player(player_identifier)
+        registration_reply = game_master_stub.register_player(player_registration)
         logger.info("Player {}:{} has registered with the game server".format(player_identifier.player_name,
                                                                               player_identifier.paddle_strategy_name));
+    return registration_reply
 
 
 def serve_game_states(playerIdentifier: PlayerIdentifier) -> Generator[GameStateBuffer, None, None]:
@@ -22,7 +22,7 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   package='',
   syntax='proto3',
   serialized_options=None,
-  serialized_pb=_b('\n\x10gamemaster.proto\x1a\x1bgoogle/protobuf/empty.proto\x1a\x1fgoogle/protobuf/timestamp.proto\"g\n\x10PlayerIdentifier\x12\x13\n\x0bplayer_name\x18\x01 \x01(\t\x12\x1c\n\x14paddle_strategy_name\x18\x02 \x01(\t\x12 \n\x0bpaddle_type\x18\x03 \x01(\x0e\x32\x0b.PaddleType\"\x1d\n\x05\x43oord\x12\t\n\x01x\x18\x01 \x01(\x05\x12\t\n\x01y\x18\x02 \x01(\x05\"Y\n\x05\x41\x63tor\x12\x1e\n\nactor_type\x18\x01 \x01(\x0e\x32\n.ActorType\x12\x16\n\x06\x63oords\x18\x02 \x03(\x0b\x32\x06.Coord\x12\x18\n\x08velocity\x18\x03 \x01(\x0b\x32\x06.Coord\"?\n\nImageFrame\x12\r\n\x05image\x18\x01 \x01(\x0c\x12\x10\n\x08num_rows\x18\x02 \x01(\r\x12\x10\n\x08num_cols\x18\x03 \x01(\r\"}\n\tScoreCard\x12!\n\x06player\x18\x01 \x01(\x0b\x32\x11.PlayerIdentifier\x12\x1b\n\x13\x63urrent_game_points\x18\x02 \x01(\r\x12\x1a\n\x12total_match_points\x18\x03 \x01(\r\x12\x14\n\x0ctotal_points\x18\x04 \x01(\r\"\xa7\x01\n\tGameState\x12\x17\n\x0fstate_iteration\x18\x02 \x01(\x04\x12\x16\n\x06\x61\x63tors\x18\x03 \x03(\x0b\x32\x06.Actor\x12 \n\x0b\x61rena_frame\x18\x04 \x01(\x0b\x32\x0b.ImageFrame\x12\"\n\x0eleft_scorecard\x18\x05 \x01(\x0b\x32\n.ScoreCard\x12#\n\x0fright_scorecard\x18\x06 \x01(\x0b\x32\n.ScoreCard\"2\n\x0fGameStateBuffer\x12\x1f\n\x0bgame_states\x18\x01 \x03(\x0b\x32\n.GameState\"h\n\x0cPaddleAction\x12,\n\x11player_identifier\x18\x01 \x01(\x0b\x32\x11.PlayerIdentifier\x12*\n\x10paddle_directive\x18\x02 \x01(\x0e\x32\x10.PaddleDirective*.\n\nPaddleType\x12\x0b\n\x07NOT_SET\x10\x00\x12\x08\n\x04LEFT\x10\x01\x12\t\n\x05RIGHT\x10\x02*W\n\tActorType\x12\x0b\n\x07UNKNOWN\x10\x00\x12\x0f\n\x0bLEFT_PADDLE\x10\x01\x12\x10\n\x0cRIGHT_PADDLE\x10\x02\x12\x10\n\x0cPRIMARY_BALL\x10\x03\x12\x08\n\x04WALL\x10\x04*3\n\x0fPaddleDirective\x12\x06\n\x02UP\x10\x00\x12\x08\n\x04\x44OWN\x10\x01\x12\x0e\n\nSTATIONARY\x10\x02\x32\xce\x01\n\nGameMaster\x12<\n\x11stream_game_state\x12\x11.PlayerIdentifier\x1a\x10.GameStateBuffer\"\x00\x30\x01\x12>\n\x0fregister_player\x12\x11.PlayerIdentifier\x1a\x16.google.protobuf.Empty\"\x00\x12\x42\n\x15submit_paddle_actions\x12\r.PaddleAction\x1a\x16.google.protobuf.Empty\"\x00(\x01\x62\x06proto3')
+  serialized_pb=_b('\n\x10gamemaster.proto\x1a\x1bgoogle/protobuf/empty.proto\x1a\x1fgoogle/protobuf/timestamp.proto\"y\n\x10PlayerIdentifier\x12\x13\n\x0bplayer_name\x18\x01 \x01(\t\x12\x1c\n\x14paddle_strategy_name\x18\x02 \x01(\t\x12 \n\x0bpaddle_type\x18\x03 \x01(\x0e\x32\x0b.PaddleType\x12\x10\n\x08match_id\x18\x04 \x01(\t\"\x1d\n\x05\x43oord\x12\t\n\x01x\x18\x01 \x01(\x05\x12\t\n\x01y\x18\x02 \x01(\x05\"\x87\x01\n\x05\x41\x63tor\x12\x1e\n\nactor_type\x18\x01 \x01(\x0e\x32\n.ActorType\x12\x16\n\x06\x63oords\x18\x02 \x03(\x0b\x32\x06.Coord\x12\x18\n\x08velocity\x18\x03 \x01(\x0b\x32\x06.Coord\x12\x1a\n\x05shape\x18\x04 \x01(\x0e\x32\x0b.ActorShape\x12\x10\n\x08geometry\x18\x05 \x03(\x02\"\xb7\x01\n\nImageFrame\x12\r\n\x05image\x18\x01 \x01(\x0c\x12\x10\n\x08num_rows\x18\x02 \x01(\r\x12\x10\n\x08num_cols\x18\x03 \x01(\r\x12\"\n\x0cpixel_format\x18\x04 \x01(\x0e\x32\x0c.PixelFormat\x12 \n\x08\x65ncoding\x18\x05 \x01(\x0e\x32\x0e.FrameEncoding\x12\x1b\n\x13reference_iteration\x18\x06 \x01(\x04\x12\x13\n\x0bshared_slot\x18\x07 \x01(\r\"\x19\n\x07Palette\x12\x0e\n\x06\x63olors\x18\x01 \x03(\r\"F\n\nCropRegion\x12\x0c\n\x04left\x18\x01 \x01(\r\x12\x0b\n\x03top\x18\x02 \x01(\r\x12\r\n\x05width\x18\x03 \x01(\r\x12\x0e\n\x06height\x18\x04 \x01(\r\"\xc7\x01\n\x0fObservationSpec\x12\x1e\n\x04mode\x18\x01 \x01(\x0e\x32\x10.ObservationMode\x12\x11\n\tgreyscale\x18\x02 \x01(\x08\x12\x12\n\ndownsample\x18\x03 \x01(\r\x12\x19\n\x04\x63rop\x18\x04 \x01(\x0b\x32\x0b.CropRegion\x12(\n\x0f\x66rame_transport\x18\x05 \x01(\x0e\x32\x0f.FrameTransport\x12(\n\x0f\x64\x65livery_policy\x18\x06 \x01(\x0e\x32\x0f.DeliveryPolicy\"z\n\x0fSharedFrameRing\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x11\n\tnum_slots\x18\x02 \x01(\r\x12\x10\n\x08num_rows\x18\x03 \x01(\r\x12\x10\n\x08num_cols\x18\x04 \x01(\r\x12\"\n\x0cpixel_format\x18\x05 \x01(\x0e\x32\x0c.PixelFormat\"n\n\x12PlayerRegistration\x12,\n\x11player_identifier\x18\x01 \x01(\x0b\x32\x11.PlayerIdentifier\x12*\n\x10observation_spec\x18\x02 \x01(\x0b\x32\x10.ObservationSpec\"\xb9\x01\n\x11RegistrationReply\x12\x12\n\nregistered\x18\x01 \x01(\x08\x12\x19\n\x07palette\x18\x02 \x01(\x0b\x32\x08.Palette\x12\x13\n\x0b\x61rena_width\x18\x03 \x01(\r\x12\x14\n\x0c\x61rena_height\x18\x04 \x01(\r\x12\x1d\n\rstatic_actors\x18\x05 \x03(\x0b\x32\x06.Actor\x12+\n\x11shared_frame_ring\x18\x06 \x01(\x0b\x32\x10.SharedFrameRing\"}\n\tScoreCard\x12!\n\x06player\x18\x01 \x01(\x0b\x32\x11.PlayerIdentifier\x12\x1b\n\x13\x63urrent_game_points\x18\x02 \x01(\r\x12\x1a\n\x12total_match_points\x18\x03 \x01(\r\x12\x14\n\x0ctotal_points\x18\x04 \x01(\r\"\xa7\x01\n\tGameState\x12\x17\n\x0fstate_iteration\x18\x02 \x01(\x04\x12\x16\n\x06\x61\x63tors\x18\x03 \x03(\x0b\x32\x06.Actor\x12 \n\x0b\x61rena_frame\x18\x04 \x01(\x0b\x32\x0b.ImageFrame\x12\"\n\x0eleft_scorecard\x18\x05 \x01(\x0b\x32\n.ScoreCard\x12#\n\x0fright_scorecard\x18\x06 \x01(\x0b\x32\n.ScoreCard\"O\n\x0fGameStateBuffer\x12\x1f\n\x0bgame_states\x18\x01 \x03(\x0b\x32\n.GameState\x12\x1b\n\x13skipped_game_states\x18\x02 \x01(\r\"h\n\x0cPaddleAction\x12,\n\x11player_identifier\x18\x01 \x01(\x0b\x32\x11.PlayerIdentifier\x12*\n\x10paddle_directive\x18\x02 \x01(\x0e\x32\x10.PaddleDirective*.\n\nPaddleType\x12\x0b\n\x07NOT_SET\x10\x00\x12\x08\n\x04LEFT\x10\x01\x12\t\n\x05RIGHT\x10\x02*o\n\tActorType\x12\x0b\n\x07UNKNOWN\x10\x00\x12\x0f\n\x0bLEFT_PADDLE\x10\x01\x12\x10\n\x0cRIGHT_PADDLE\x10\x02\x12\x10\n\x0cPRIMARY_BALL\x10\x03\x12\x08\n\x04WALL\x10\x04\x12\x07\n\x03NET\x10\x05\x12\r\n\tBACK_LINE\x10\x06*.\n\nActorShape\x12\x0b\n\x07POLYGON\x10\x00\x12\x07\n\x03\x42OX\x10\x01\x12\n\n\x06\x43IRCLE\x10\x02*3\n\x0bPixelFormat\x12\x0b\n\x07\x43OLOR32\x10\x00\x12\x0c\n\x08PALETTE8\x10\x01\x12\t\n\x05GREY8\x10\x02*C\n\rFrameEncoding\x12\x07\n\x03RAW\x10\x00\x12\x08\n\x04ZLIB\x10\x01\x12\x0e\n\nDELTA_RUNS\x10\x02\x12\x0f\n\x0bSHARED_SLOT\x10\x03*N\n\x0fObservationMode\x12\x08\n\x04\x46ULL\x10\x00\x12\x0f\n\x0bVECTOR_ONLY\x10\x01\x12\x0f\n\x0b\x41\x43TORS_ONLY\x10\x02\x12\x0f\n\x0bPIXELS_ONLY\x10\x03*-\n\x0e\x46rameTransport\x12\x08\n\x04GRPC\x10\x00\x12\x11\n\rSHARED_MEMORY\x10\x01*=\n\x0e\x44\x65liveryPolicy\x12\t\n\x05\x42LOCK\x10\x00\x12\x0f\n\x0b\x44ROP_OLDEST\x10\x01\x12\x0f\n\x0bLATEST_ONLY\x10\x02*3\n\x0fPaddleDirective\x12\x06\n\x02UP\x10\x00\x12\x08\n\x04\x44OWN\x10\x01\x12\x0e\n\nSTATIONARY\x10\x02\x32\xcc\x01\n\nGameMaster\x12<\n\x11stream_game_state\x12\x11.PlayerIdentifier\x1a\x10.GameStateBuffer\"\x00\x30\x01\x12<\n\x0fregister_player\x12\x13.PlayerRegistration\x1a\x12.RegistrationReply\"\x00\x12\x42\n\x15submit_paddle_actions\x12\r.PaddleAction\x1a\x16.google.protobuf.Empty\"\x00(\x01\x62\x06proto3')
   ,
   dependencies=[google_dot_protobuf_dot_empty__pb2.DESCRIPTOR,google_dot_protobuf_dot_timestamp__pb2.DESCRIPTOR,])
 
@@ -47,8 +47,8 @@ _PADDLETYPE = _descriptor.EnumDescriptor(
   ],
   containing_type=None,
   serialized_options=None,
-  serialized_start=829,
-  serialized_end=875,
+  serialized_start=1769,
+  serialized_end=1815,
 )
 _sym_db.RegisterEnumDescriptor(_PADDLETYPE)
 
@@ -79,15 +79,189 @@ _ACTORTYPE = _descriptor.EnumDescriptor(
       name='WALL', index=4, number=4,
       serialized_options=None,
       type=None),
+    _descriptor.EnumValueDescriptor(
+      name='NET', index=5, number=5,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='BACK_LINE', index=6, number=6,
+      serialized_options=None,
+      type=None),
   ],
   containing_type=None,
   serialized_options=None,
-  serialized_start=877,
-  serialized_end=964,
+  serialized_start=1817,
+  serialized_end=1928,
 )
 _sym_db.RegisterEnumDescriptor(_ACTORTYPE)
 
 ActorType = enum_type_wrapper.EnumTypeWrapper(_ACTORTYPE)
+_ACTORSHAPE = _descriptor.EnumDescriptor(
+  name='ActorShape',
+  full_name='ActorShape',
+  filename=None,
+  file=DESCRIPTOR,
+  values=[
+    _descriptor.EnumValueDescriptor(
+      name='POLYGON', index=0, number=0,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='BOX', index=1, number=1,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='CIRCLE', index=2, number=2,
+      serialized_options=None,
+      type=None),
+  ],
+  containing_type=None,
+  serialized_options=None,
+  serialized_start=1930,
+  serialized_end=1976,
+)
+_sym_db.RegisterEnumDescriptor(_ACTORSHAPE)
+
+ActorShape = enum_type_wrapper.EnumTypeWrapper(_ACTORSHAPE)
+_PIXELFORMAT = _descriptor.EnumDescriptor(
+  name='PixelFormat',
+  full_name='PixelFormat',
+  filename=None,
+  file=DESCRIPTOR,
+  values=[
+    _descriptor.EnumValueDescriptor(
+      name='COLOR32', index=0, number=0,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='PALETTE8', index=1, number=1,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='GREY8', index=2, number=2,
+      serialized_options=None,
+      type=None),
+  ],
+  containing_type=None,
+  serialized_options=None,
+  serialized_start=1978,
+  serialized_end=2029,
+)
+_sym_db.RegisterEnumDescriptor(_PIXELFORMAT)
+
+PixelFormat = enum_type_wrapper.EnumTypeWrapper(_PIXELFORMAT)
+_FRAMEENCODING = _descriptor.EnumDescriptor(
+  name='FrameEncoding',
+  full_name='FrameEncoding',
+  filename=None,
+  file=DESCRIPTOR,
+  values=[
+    _descriptor.EnumValueDescriptor(
+      name='RAW', index=0, number=0,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='ZLIB', index=1, number=1,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='DELTA_RUNS', index=2, number=2,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='SHARED_SLOT', index=3, number=3,
+      serialized_options=None,
+      type=None),
+  ],
+  containing_type=None,
+  serialized_options=None,
+  serialized_start=2031,
+  serialized_end=2098,
+)
+_sym_db.RegisterEnumDescriptor(_FRAMEENCODING)
+
+FrameEncoding = enum_type_wrapper.EnumTypeWrapper(_FRAMEENCODING)
+_OBSERVATIONMODE = _descriptor.EnumDescriptor(
+  name='ObservationMode',
+  full_name='ObservationMode',
+  filename=None,
+  file=DESCRIPTOR,
+  values=[
+    _descriptor.EnumValueDescriptor(
+      name='FULL', index=0, number=0,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='VECTOR_ONLY', index=1, number=1,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='ACTORS_ONLY', index=2, number=2,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='PIXELS_ONLY', index=3, number=3,
+      serialized_options=None,
+      type=None),
+  ],
+  containing_type=None,
+  serialized_options=None,
+  serialized_start=2100,
+  serialized_end=2178,
+)
+_sym_db.RegisterEnumDescriptor(_OBSERVATIONMODE)
+
+ObservationMode = enum_type_wrapper.EnumTypeWrapper(_OBSERVATIONMODE)
+_FRAMETRANSPORT = _descriptor.EnumDescriptor(
+  name='FrameTransport',
+  full_name='FrameTransport',
+  filename=None,
+  file=DESCRIPTOR,
+  values=[
+    _descriptor.EnumValueDescriptor(
+      name='GRPC', index=0, number=0,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='SHARED_MEMORY', index=1, number=1,
+      serialized_options=None,
+      type=None),
+  ],
+  containing_type=None,
+  serialized_options=None,
+  serialized_start=2180,
+  serialized_end=2225,
+)
+_sym_db.RegisterEnumDescriptor(_FRAMETRANSPORT)
+
+FrameTransport = enum_type_wrapper.EnumTypeWrapper(_FRAMETRANSPORT)
+_DELIVERYPOLICY = _descriptor.EnumDescriptor(
+  name='DeliveryPolicy',
+  full_name='DeliveryPolicy',
+  filename=None,
+  file=DESCRIPTOR,
+  values=[
+    _descriptor.EnumValueDescriptor(
+      name='BLOCK', index=0, number=0,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='DROP_OLDEST', index=1, number=1,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='LATEST_ONLY', index=2, number=2,
+      serialized_options=None,
+      type=None),
+  ],
+  containing_type=None,
+  serialized_options=None,
+  serialized_start=2227,
+  serialized_end=2288,
+)
+_sym_db.RegisterEnumDescriptor(_DELIVERYPOLICY)
+
+DeliveryPolicy = enum_type_wrapper.EnumTypeWrapper(_DELIVERYPOLICY)
 _PADDLEDIRECTIVE = _descriptor.EnumDescriptor(
   name='PaddleDirective',
   full_name='PaddleDirective',
@@ -109,8 +283,8 @@ _PADDLEDIRECTIVE = _descriptor.EnumDescriptor(
   ],
   containing_type=None,
   serialized_options=None,
-  serialized_start=966,
-  serialized_end=1017,
+  serialized_start=2290,
+  serialized_end=2341,
 )
 _sym_db.RegisterEnumDescriptor(_PADDLEDIRECTIVE)
 
@@ -123,6 +297,27 @@ LEFT_PADDLE = 1
 RIGHT_PADDLE = 2
 PRIMARY_BALL = 3
 WALL = 4
+NET = 5
+BACK_LINE = 6
+POLYGON = 0
+BOX = 1
+CIRCLE = 2
+COLOR32 = 0
+PALETTE8 = 1
+GREY8 = 2
+RAW = 0
+ZLIB = 1
+DELTA_RUNS = 2
+SHARED_SLOT = 3
+FULL = 0
+VECTOR_ONLY = 1
+ACTORS_ONLY = 2
+PIXELS_ONLY = 3
+GRPC = 0
+SHARED_MEMORY = 1
+BLOCK = 0
+DROP_OLDEST = 1
+LATEST_ONLY = 2
 UP = 0
 DOWN = 1
 STATIONARY = 2
@@ -157,6 +352,13 @@ _PLAYERIDENTIFIER = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='match_id', full_name='PlayerIdentifier.match_id', index=3,
+      number=4, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -170,7 +372,7 @@ _PLAYERIDENTIFIER = _descriptor.Descriptor(
   oneofs=[
   ],
   serialized_start=82,
-  serialized_end=185,
+  serialized_end=203,
 )
 
 
@@ -207,8 +409,8 @@ _COORD = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=187,
-  serialized_end=216,
+  serialized_start=205,
+  serialized_end=234,
 )
 
 
@@ -240,6 +442,20 @@ _ACTOR = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='shape', full_name='Actor.shape', index=3,
+      number=4, type=14, cpp_type=8, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='geometry', full_name='Actor.geometry', index=4,
+      number=5, type=2, cpp_type=6, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -252,8 +468,8 @@ _ACTOR = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=218,
-  serialized_end=307,
+  serialized_start=237,
+  serialized_end=372,
 )
 
 
@@ -285,6 +501,34 @@ _IMAGEFRAME = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='pixel_format', full_name='ImageFrame.pixel_format', index=3,
+      number=4, type=14, cpp_type=8, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='encoding', full_name='ImageFrame.encoding', index=4,
+      number=5, type=14, cpp_type=8, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='reference_iteration', full_name='ImageFrame.reference_iteration', index=5,
+      number=6, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='shared_slot', full_name='ImageFrame.shared_slot', index=6,
+      number=7, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -297,8 +541,320 @@ _IMAGEFRAME = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=309,
-  serialized_end=372,
+  serialized_start=375,
+  serialized_end=558,
+)
+
+
+_PALETTE = _descriptor.Descriptor(
+  name='Palette',
+  full_name='Palette',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='colors', full_name='Palette.colors', index=0,
+      number=1, type=13, cpp_type=3, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=560,
+  serialized_end=585,
+)
+
+
+_CROPREGION = _descriptor.Descriptor(
+  name='CropRegion',
+  full_name='CropRegion',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='left', full_name='CropRegion.left', index=0,
+      number=1, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='top', full_name='CropRegion.top', index=1,
+      number=2, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='width', full_name='CropRegion.width', index=2,
+      number=3, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='height', full_name='CropRegion.height', index=3,
+      number=4, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=587,
+  serialized_end=657,
+)
+
+
+_OBSERVATIONSPEC = _descriptor.Descriptor(
+  name='ObservationSpec',
+  full_name='ObservationSpec',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='mode', full_name='ObservationSpec.mode', index=0,
+      number=1, type=14, cpp_type=8, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='greyscale', full_name='ObservationSpec.greyscale', index=1,
+      number=2, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='downsample', full_name='ObservationSpec.downsample', index=2,
+      number=3, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='crop', full_name='ObservationSpec.crop', index=3,
+      number=4, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='frame_transport', full_name='ObservationSpec.frame_transport', index=4,
+      number=5, type=14, cpp_type=8, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='delivery_policy', full_name='ObservationSpec.delivery_policy', index=5,
+      number=6, type=14, cpp_type=8, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=660,
+  serialized_end=859,
+)
+
+
+_SHAREDFRAMERING = _descriptor.Descriptor(
+  name='SharedFrameRing',
+  full_name='SharedFrameRing',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='name', full_name='SharedFrameRing.name', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='num_slots', full_name='SharedFrameRing.num_slots', index=1,
+      number=2, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='num_rows', full_name='SharedFrameRing.num_rows', index=2,
+      number=3, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='num_cols', full_name='SharedFrameRing.num_cols', index=3,
+      number=4, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='pixel_format', full_name='SharedFrameRing.pixel_format', index=4,
+      number=5, type=14, cpp_type=8, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=861,
+  serialized_end=983,
+)
+
+
+_PLAYERREGISTRATION = _descriptor.Descriptor(
+  name='PlayerRegistration',
+  full_name='PlayerRegistration',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='player_identifier', full_name='PlayerRegistration.player_identifier', index=0,
+      number=1, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='observation_spec', full_name='PlayerRegistration.observation_spec', index=1,
+      number=2, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=985,
+  serialized_end=1095,
+)
+
+
+_REGISTRATIONREPLY = _descriptor.Descriptor(
+  name='RegistrationReply',
+  full_name='RegistrationReply',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='registered', full_name='RegistrationReply.registered', index=0,
+      number=1, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='palette', full_name='RegistrationReply.palette', index=1,
+      number=2, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='arena_width', full_name='RegistrationReply.arena_width', index=2,
+      number=3, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='arena_height', full_name='RegistrationReply.arena_height', index=3,
+      number=4, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='static_actors', full_name='RegistrationReply.static_actors', index=4,
+      number=5, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='shared_frame_ring', full_name='RegistrationReply.shared_frame_ring', index=5,
+      number=6, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1098,
+  serialized_end=1283,
 )
 
 
@@ -349,8 +905,8 @@ _SCORECARD = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=374,
-  serialized_end=499,
+  serialized_start=1285,
+  serialized_end=1410,
 )
 
 
@@ -408,8 +964,8 @@ _GAMESTATE = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=502,
-  serialized_end=669,
+  serialized_start=1413,
+  serialized_end=1580,
 )
 
 
@@ -427,6 +983,13 @@ _GAMESTATEBUFFER = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='skipped_game_states', full_name='GameStateBuffer.skipped_game_states', index=1,
+      number=2, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -439,8 +1002,8 @@ _GAMESTATEBUFFER = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=671,
-  serialized_end=721,
+  serialized_start=1582,
+  serialized_end=1661,
 )
 
 
@@ -477,14 +1040,27 @@ _PADDLEACTION = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=723,
-  serialized_end=827,
+  serialized_start=1663,
+  serialized_end=1767,
 )
 
 _PLAYERIDENTIFIER.fields_by_name['paddle_type'].enum_type = _PADDLETYPE
 _ACTOR.fields_by_name['actor_type'].enum_type = _ACTORTYPE
 _ACTOR.fields_by_name['coords'].message_type = _COORD
 _ACTOR.fields_by_name['velocity'].message_type = _COORD
+_ACTOR.fields_by_name['shape'].enum_type = _ACTORSHAPE
+_IMAGEFRAME.fields_by_name['pixel_format'].enum_type = _PIXELFORMAT
+_IMAGEFRAME.fields_by_name['encoding'].enum_type = _FRAMEENCODING
+_OBSERVATIONSPEC.fields_by_name['mode'].enum_type = _OBSERVATIONMODE
+_OBSERVATIONSPEC.fields_by_name['crop'].message_type = _CROPREGION
+_OBSERVATIONSPEC.fields_by_name['frame_transport'].enum_type = _FRAMETRANSPORT
+_OBSERVATIONSPEC.fields_by_name['delivery_policy'].enum_type = _DELIVERYPOLICY
+_SHAREDFRAMERING.fields_by_name['pixel_format'].enum_type = _PIXELFORMAT
+_PLAYERREGISTRATION.fields_by_name['player_identifier'].message_type = _PLAYERIDENTIFIER
+_PLAYERREGISTRATION.fields_by_name['observation_spec'].message_type = _OBSERVATIONSPEC
+_REGISTRATIONREPLY.fields_by_name['palette'].message_type = _PALETTE
+_REGISTRATIONREPLY.fields_by_name['static_actors'].message_type = _ACTOR
+_REGISTRATIONREPLY.fields_by_name['shared_frame_ring'].message_type = _SHAREDFRAMERING
 _SCORECARD.fields_by_name['player'].message_type = _PLAYERIDENTIFIER
 _GAMESTATE.fields_by_name['actors'].message_type = _ACTOR
 _GAMESTATE.fields_by_name['arena_frame'].message_type = _IMAGEFRAME
@@ -497,12 +1073,24 @@ DESCRIPTOR.message_types_by_name['PlayerIdentifier'] = _PLAYERIDENTIFIER
 DESCRIPTOR.message_types_by_name['Coord'] = _COORD
 DESCRIPTOR.message_types_by_name['Actor'] = _ACTOR
 DESCRIPTOR.message_types_by_name['ImageFrame'] = _IMAGEFRAME
+DESCRIPTOR.message_types_by_name['Palette'] = _PALETTE
+DESCRIPTOR.message_types_by_name['CropRegion'] = _CROPREGION
+DESCRIPTOR.message_types_by_name['ObservationSpec'] = _OBSERVATIONSPEC
+DESCRIPTOR.message_types_by_name['SharedFrameRing'] = _SHAREDFRAMERING
+DESCRIPTOR.message_types_by_name['PlayerRegistration'] = _PLAYERREGISTRATION
+DESCRIPTOR.message_types_by_name['RegistrationReply'] = _REGISTRATIONREPLY
 DESCRIPTOR.message_types_by_name['ScoreCard'] = _SCORECARD
 DESCRIPTOR.message_types_by_name['GameState'] = _GAMESTATE
 DESCRIPTOR.message_types_by_name['GameStateBuffer'] = _GAMESTATEBUFFER
 DESCRIPTOR.message_types_by_name['PaddleAction'] = _PADDLEACTION
 DESCRIPTOR.enum_types_by_name['PaddleType'] = _PADDLETYPE
 DESCRIPTOR.enum_types_by_name['ActorType'] = _ACTORTYPE
+DESCRIPTOR.enum_types_by_name['ActorShape'] = _ACTORSHAPE
+DESCRIPTOR.enum_types_by_name['PixelFormat'] = _PIXELFORMAT
+DESCRIPTOR.enum_types_by_name['FrameEncoding'] = _FRAMEENCODING
+DESCRIPTOR.enum_types_by_name['ObservationMode'] = _OBSERVATIONMODE
+DESCRIPTOR.enum_types_by_name['FrameTransport'] = _FRAMETRANSPORT
+DESCRIPTOR.enum_types_by_name['DeliveryPolicy'] = _DELIVERYPOLICY
 DESCRIPTOR.enum_types_by_name['PaddleDirective'] = _PADDLEDIRECTIVE
 _sym_db.RegisterFileDescriptor(DESCRIPTOR)
 
@@ -534,6 +1122,48 @@ ImageFrame = _reflection.GeneratedProtocolMessageType('ImageFrame', (_message.Me
   ))
 _sym_db.RegisterMessage(ImageFrame)
 
+Palette = _reflection.GeneratedProtocolMessageType('Palette', (_message.Message,), dict(
+  DESCRIPTOR = _PALETTE,
+  __module__ = 'gamemaster_pb2'
+  # @@protoc_insertion_point(class_scope:Palette)
+  ))
+_sym_db.RegisterMessage(Palette)
+
+CropRegion = _reflection.GeneratedProtocolMessageType('CropRegion', (_message.Message,), dict(
+  DESCRIPTOR = _CROPREGION,
+  __module__ = 'gamemaster_pb2'
+  # @@protoc_insertion_point(class_scope:CropRegion)
+  ))
+_sym_db.RegisterMessage(CropRegion)
+
+ObservationSpec = _reflection.GeneratedProtocolMessageType('ObservationSpec', (_message.Message,), dict(
+  DESCRIPTOR = _OBSERVATIONSPEC,
+  __module__ = 'gamemaster_pb2'
+  # @@protoc_insertion_point(class_scope:ObservationSpec)
+  ))
+_sym_db.RegisterMessage(ObservationSpec)
+
+SharedFrameRing = _reflection.GeneratedProtocolMessageType('SharedFrameRing', (_message.Message,), dict(
+  DESCRIPTOR = _SHAREDFRAMERING,
+  __module__ = 'gamemaster_pb2'
+  # @@protoc_insertion_point(class_scope:SharedFrameRing)
+  ))
+_sym_db.RegisterMessage(SharedFrameRing)
+
+PlayerRegistration = _reflection.GeneratedProtocolMessageType('PlayerRegistration', (_message.Message,), dict(
+  DESCRIPTOR = _PLAYERREGISTRATION,
+  __module__ = 'gamemaster_pb2'
+  # @@protoc_insertion_point(class_scope:PlayerRegistration)
+  ))
+_sym_db.RegisterMessage(PlayerRegistration)
+
+RegistrationReply = _reflection.GeneratedProtocolMessageType('RegistrationReply', (_message.Message,), dict(
+  DESCRIPTOR = _REGISTRATIONREPLY,
+  __module__ = 'gamemaster_pb2'
+  # @@protoc_insertion_point(class_scope:RegistrationReply)
+  ))
+_sym_db.RegisterMessage(RegistrationReply)
+
 ScoreCard = _reflection.GeneratedProtocolMessageType('ScoreCard', (_message.Message,), dict(
   DESCRIPTOR = _SCORECARD,
   __module__ = 'gamemaster_pb2'
@@ -570,8 +1200,8 @@ _GAMEMASTER = _descriptor.ServiceDescriptor(
   file=DESCRIPTOR,
   index=0,
   serialized_options=None,
-  serialized_start=1020,
-  serialized_end=1226,
+  serialized_start=2344,
+  serialized_end=2548,
   methods=[
   _descriptor.MethodDescriptor(
     name='stream_game_state',
@@ -587,8 +1217,8 @@ _GAMEMASTER = _descriptor.ServiceDescriptor(
     full_name='GameMaster.register_player',
     index=1,
     containing_service=None,
-    input_type=_PLAYERIDENTIFIER,
-    output_type=google_dot_protobuf_dot_empty__pb2._EMPTY,
+    input_type=_PLAYERREGISTRATION,
+    output_type=_REGISTRATIONREPLY,
     serialized_options=None,
   ),
   _descriptor.MethodDescriptor(
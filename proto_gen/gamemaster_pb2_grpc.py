@@ -22,8 +22,8 @@ class GameMasterStub(object):
         )
     self.register_player = channel.unary_unary(
         '/GameMaster/register_player',
-        request_serializer=gamemaster__pb2.PlayerIdentifier.SerializeToString,
-        response_deserializer=google_dot_protobuf_dot_empty__pb2.Empty.FromString,
+        request_serializer=gamemaster__pb2.PlayerRegistration.SerializeToString,
+        response_deserializer=gamemaster__pb2.RegistrationReply.FromString,
         )
     self.submit_paddle_actions = channel.stream_unary(
         '/GameMaster/submit_paddle_actions',
@@ -45,7 +45,7 @@ class GameMasterServicer(object):
     raise NotImplementedError('Method not implemented!')
 
   def register_player(self, request, context):
-    """Let the game engine know that a player has registered to play.
+    """Let the game engine know that a player has registered to play, and what it wants to observe.
     """
     context.set_code(grpc.StatusCode.UNIMPLEMENTED)
     context.set_details('Method not implemented!')
@@ -68,8 +68,8 @@ def add_GameMasterServicer_to_server(servicer, server):
       ),
       'register_player': grpc.unary_unary_rpc_method_handler(
           servicer.register_player,
-          request_deserializer=gamemaster__pb2.PlayerIdentifier.FromString,
-          response_serializer=google_dot_protobuf_dot_empty__pb2.Empty.SerializeToString,
+          request_deserializer=gamemaster__pb2.PlayerRegistration.FromString,
+          response_serializer=gamemaster__pb2.RegistrationReply.SerializeToString,
       ),
       'submit_paddle_actions': grpc.stream_unary_rpc_method_handler(
           servicer.submit_paddle_actions,
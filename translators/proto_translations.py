@@ -1,12 +1,19 @@
 from __future__ import annotations
 
+import zlib
+from queue import SimpleQueue, Empty
+from typing import Optional, Tuple, Iterable, Dict, List
+
 import numpy
 import pygame
 
-from gameengine.gameactors import Actor, Ball, BallFlavor, Wall, Paddle
+from gameengine.gameactors import Actor, Ball, BallFlavor, Wall, Paddle, Net, BackLine
+from gameengine.primitives import Box, Circle
+from gamerender.palette import ArenaPalette
 from gamerender.scorecards import ScoreKeeper, StandardScoreCard
-from proto_gen.gamemaster_pb2 import Actor as ProtoActor, ImageFrame, ScoreCard
-from proto_gen.gamemaster_pb2 import GameState, Coord, ActorType, PaddleType
+from proto_gen.gamemaster_pb2 import Actor as ProtoActor, ImageFrame, ScoreCard, Palette, PixelFormat, \
+    FrameEncoding
+from proto_gen.gamemaster_pb2 import GameState, Coord, ActorType, PaddleType, ActorShape, GameStateBuffer
 
 
 def get_proto_actor_type(game_actor: Actor):
@@ -18,10 +25,70 @@ def get_proto_actor_type(game_actor: Actor):
         return ActorType.LEFT_PADDLE
     elif isinstance(game_actor, Paddle) and game_actor.paddle_type is PaddleType.RIGHT:
         return ActorType.RIGHT_PADDLE
+    elif isinstance(game_actor, Net):
+        return ActorType.NET
+    elif isinstance(game_actor, BackLine):
+        return ActorType.BACK_LINE
     else:
         return ActorType.UNKNOWN
 
 
+def actor_geometry(game_actor: Actor) -> Tuple[int, Tuple[float, ...]]:
+    """
+    :param game_actor: the actor
+    :return: the ActorShape of the actor and its geometry, see Actor in gamemaster.proto
+    """
+    primitive = game_actor.primitive
+    center_x, center_y = primitive.center
+    velocity_x, velocity_y = game_actor.velocity
+    if isinstance(primitive, Box):
+        return ActorShape.BOX, (center_x, center_y, velocity_x, velocity_y, primitive.half_width, primitive.half_height)
+    elif isinstance(primitive, Circle):
+        return ActorShape.CIRCLE, (center_x, center_y, velocity_x, velocity_y, primitive.radius)
+    return ActorShape.POLYGON, (center_x, center_y, velocity_x, velocity_y)
+
+
+def _set_polygon_coords(proto_actor: ProtoActor, game_actor: Actor):
+    del proto_actor.coords[:]
+    proto_actor.coords.extend([Coord(x=int(poly_coord[0]), y=int(poly_coord[1])) for poly_coord in
+                               game_actor.shape.exterior.coords])
+
+
+def fill_proto_actor(proto_actor: ProtoActor, game_actor: Actor) -> ProtoActor:
+    """
+    Packs the primitive shape and velocity of the actor into a handful of floats, see Actor in gamemaster.proto.  Only
+    arbitrary polygons still need their coordinates sent
+    :param proto_actor: an empty proto actor
+    :param game_actor:  the actor
+    :return: the proto actor
+    """
+    proto_actor.actor_type = get_proto_actor_type(game_actor)
+    proto_actor.shape, geometry = actor_geometry(game_actor)
+    proto_actor.geometry.extend(geometry)
+    if proto_actor.shape == ActorShape.POLYGON:
+        _set_polygon_coords(proto_actor, game_actor)
+    return proto_actor
+
+
+def update_proto_actor(proto_actor: ProtoActor, game_actor: Actor) -> ProtoActor:
+    """
+    Overwrites the geometry of a proto actor filled from the same actor, see fill_proto_actor.  The type and shape of
+    an actor never change
+    :param proto_actor: a proto actor of the actor
+    :param game_actor:  the actor
+    :return: the proto actor
+    """
+    _, geometry = actor_geometry(game_actor)
+    proto_actor.geometry[:] = geometry
+    if proto_actor.shape == ActorShape.POLYGON:
+        _set_polygon_coords(proto_actor, game_actor)
+    return proto_actor
+
+
+def create_proto_actor(game_actor: Actor) -> ProtoActor:
+    return fill_proto_actor(ProtoActor(), game_actor)
+
+
 def create_proto_scorecard(scorecard: StandardScoreCard) -> ScoreCard:
     proto_score_card = ScoreCard()
     proto_score_card.player.CopyFrom(scorecard.player_identifier)
@@ -31,29 +98,199 @@ def create_proto_scorecard(scorecard: StandardScoreCard) -> ScoreCard:
     return proto_score_card
 
 
+def create_proto_palette(palette: ArenaPalette) -> Palette:
+    return Palette(colors=[int(color) for color in palette.color32])
+
+
+def pack_pixel_runs(pixels: numpy.ndarray, changed_indices: numpy.ndarray) -> bytes:
+    """
+    :param pixels:          a flat array of pixels
+    :param changed_indices: the sorted indices of the pixels that changed
+    :return: the DELTA_RUNS image bytes, see FrameEncoding in gamemaster.proto
+    """
+    if len(changed_indices) == 0:
+        return numpy.uint32(0).tobytes()
+    run_breaks = numpy.flatnonzero(numpy.diff(changed_indices) != 1) + 1
+    run_starts = numpy.concatenate(([0], run_breaks))
+    run_lengths = numpy.diff(numpy.concatenate((run_starts, [len(changed_indices)])))
+    return b''.join((numpy.uint32(len(run_starts)).tobytes(),
+                     changed_indices[run_starts].astype('<u4').tobytes(),
+                     run_lengths.astype('<u4').tobytes(),
+                     pixels[changed_indices].tobytes()))
+
+
+def encode_varint(value: int) -> bytes:
+    """
+    :return: the protobuf base 128 varint encoding of a non negative integer
+    """
+    encoded = bytearray()
+    while value > 0x7F:
+        encoded.append((value & 0x7F) | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return bytes(encoded)
+
+
+# the key of field 1 of GameStateBuffer, game_states, a length delimited field
+GAME_STATES_FIELD_KEY = bytes([(GameStateBuffer.GAME_STATES_FIELD_NUMBER << 3) | 2])
+
+# the key of field 2 of GameStateBuffer, skipped_game_states, a varint field
+SKIPPED_GAME_STATES_FIELD_KEY = bytes([(GameStateBuffer.SKIPPED_GAME_STATES_FIELD_NUMBER << 3) | 0])
+
+
+def frame_game_state(game_state_bytes: bytes) -> bytes:
+    """
+    A GameStateBuffer on the wire is nothing but its game states one after the other, each prefixed with the field
+    key and its length.  So game states framed once can be joined into buffers of any size without serializing them
+    again
+    :param game_state_bytes: a serialized game state
+    :return: the game state as one entry of a serialized GameStateBuffer
+    """
+    return b''.join((GAME_STATES_FIELD_KEY, encode_varint(len(game_state_bytes)), game_state_bytes))
+
+
+def frame_skipped_game_states(skipped_game_states: int) -> bytes:
+    """
+    :param skipped_game_states: the game states dropped since the previous buffer
+    :return: skipped_game_states of a serialized GameStateBuffer, to be joined with its framed game states
+    """
+    return SKIPPED_GAME_STATES_FIELD_KEY + encode_varint(skipped_game_states)
+
+
+def serialize_game_state_buffer(game_state_buffer) -> bytes:
+    """
+    Response serializer of stream_game_state that passes bytes already in the GameStateBuffer wire format through
+    :param game_state_buffer: a GameStateBuffer, or framed game states joined together, see frame_game_state
+    :return: the serialized game state buffer
+    """
+    if isinstance(game_state_buffer, bytes):
+        return game_state_buffer
+    return game_state_buffer.SerializeToString()
+
+
+class ArenaFrameEncoder:
+    """
+    Packs consecutive arena frames into image frames.  Keeps a copy of the frame its deltas are taken against, so it
+    must see every frame, in order
+    """
+
+    def __init__(self, frame_encoding: int = FrameEncoding.RAW, keyframe_interval: int = 100,
+                 compression_level: int = 1, delta_from_keyframe: bool = False):
+        """
+        :param frame_encoding:      a FrameEncoding
+        :param keyframe_interval:   with DELTA_RUNS, every this many frames is a zlib keyframe so players that missed a
+                                    frame can resynchronize.  Zero for every frame a keyframe
+        :param compression_level:   the zlib level for ZLIB frames and keyframes
+        :param delta_from_keyframe: with DELTA_RUNS, if True every delta is taken against the last keyframe, rather
+                                    than the previous frame.  Deltas are about twice the size, but a player that misses
+                                    a delta can still decode the next one
+        """
+        self.frame_encoding = frame_encoding
+        self.keyframe_interval = keyframe_interval
+        self.compression_level = compression_level
+        self.delta_from_keyframe = delta_from_keyframe
+        self._reference_pixels: Optional[numpy.ndarray] = None
+        self._reference_iteration: int = 0
+        self._frames_since_keyframe: int = 0
+
+    def _update_reference(self, flat_pixels: numpy.ndarray, state_iteration: int):
+        if self._reference_pixels is None or self._reference_pixels.shape != flat_pixels.shape:
+            self._reference_pixels = flat_pixels.copy()
+        else:
+            numpy.copyto(self._reference_pixels, flat_pixels)
+        self._reference_iteration = state_iteration
+
+    def encode(self, pixels: numpy.ndarray, pixel_format: int, state_iteration: int) -> ImageFrame:
+        """
+        :param pixels:          the arena frame, with shape (rows, columns).  uint8 palette indices for PALETTE8 and
+                                uint32 colors for COLOR32
+        :param pixel_format:    the PixelFormat of the pixels
+        :param state_iteration: the state iteration of the game state the frame belongs to
+        :return: the encoded frame
+        """
+        return self.encode_into(ImageFrame(), pixels, pixel_format, state_iteration)
+
+    def encode_into(self, arena_frame: ImageFrame, pixels: numpy.ndarray, pixel_format: int,
+                    state_iteration: int) -> ImageFrame:
+        """
+        Like encode, but overwrites an image frame, such as the arena frame of a pooled game state
+        :param arena_frame:     the image frame to encode the frame into, last filled by this encoder if at all
+        :param pixels:          the arena frame, with shape (rows, columns)
+        :param pixel_format:    the PixelFormat of the pixels
+        :param state_iteration: the state iteration of the game state the frame belongs to
+        :return: the image frame
+        """
+        arena_frame.num_rows, arena_frame.num_cols = pixels.shape
+        arena_frame.pixel_format = pixel_format
+        arena_frame.reference_iteration = 0
+        if self.frame_encoding == FrameEncoding.RAW:
+            arena_frame.encoding = FrameEncoding.RAW
+            arena_frame.image = pixels.tobytes()
+            return arena_frame
+
+        flat_pixels = pixels.reshape(-1)
+        changed_indices = None
+        if self.frame_encoding == FrameEncoding.DELTA_RUNS and self._frames_since_keyframe < self.keyframe_interval \
+                and self._reference_pixels is not None and self._reference_pixels.shape == flat_pixels.shape:
+            changed_indices = numpy.flatnonzero(flat_pixels != self._reference_pixels)
+            # past a quarter of the frame, the run headers outweigh a compressed keyframe
+            if len(changed_indices) > len(flat_pixels) // 4:
+                changed_indices = None
+
+        if changed_indices is None:
+            arena_frame.encoding = FrameEncoding.ZLIB
+            arena_frame.image = zlib.compress(flat_pixels.tobytes(), self.compression_level)
+            self._frames_since_keyframe = 0
+            if self.frame_encoding == FrameEncoding.DELTA_RUNS:
+                self._update_reference(flat_pixels, state_iteration)
+        else:
+            arena_frame.encoding = FrameEncoding.DELTA_RUNS
+            arena_frame.reference_iteration = self._reference_iteration
+            arena_frame.image = pack_pixel_runs(flat_pixels, changed_indices)
+            self._frames_since_keyframe += 1
+            if not self.delta_from_keyframe:
+                self._update_reference(flat_pixels, state_iteration)
+        return arena_frame
+
+
 class GameStateBuilder:
     def __init__(self):
         self._game_state = GameState()
 
     def add_game_actor(self, game_actor: Actor) -> GameStateBuilder:
-        proto_actor = ProtoActor()
-        proto_coords = [Coord(x=int(poly_coord[0]), y=int(poly_coord[1])) for poly_coord in
-                        list(game_actor.shape.exterior.coords)]
-        proto_actor.coords.extend(proto_coords)
-        velocity_coord = Coord(x=int(game_actor.velocity[0]), y=int(game_actor.velocity[1]))
-        proto_actor.velocity.CopyFrom(velocity_coord)
-        proto_actor.actor_type = get_proto_actor_type(game_actor)
-        self._game_state.actors.append(proto_actor)
+        fill_proto_actor(self._game_state.actors.add(), game_actor)
         return self
 
     def add_arena_surface(self, arena_surface: pygame.Surface) -> GameStateBuilder:
+        return self.add_arena_pixels(numpy.transpose(pygame.surfarray.pixels2d(arena_surface)))
+
+    def add_arena_pixels(self, pixels: numpy.ndarray) -> GameStateBuilder:
+        """
+        :param pixels: the arena frame as 32 bit colors, with shape (rows, columns).  See numpy_rasterizer
+        """
         # note, it is MUCH faster sending 2d array of encoded 32 bit color integers rather than 3d array of r,g,b
-        pixels = numpy.transpose(pygame.surfarray.pixels2d(arena_surface))
         arena_byte_array = numpy.ndarray.tobytes(pixels)
         arena_frame: ImageFrame = ImageFrame(image=arena_byte_array, num_rows=pixels.shape[0], num_cols=pixels.shape[1])
         self._game_state.arena_frame.CopyFrom(arena_frame)
         return self
 
+    def add_arena_palette_frame(self, palette_indices: numpy.ndarray) -> GameStateBuilder:
+        """
+        :param palette_indices: the arena frame as uint8 palette indices, with shape (rows, columns).  The players
+                                were sent the palette when they registered
+        """
+        arena_frame: ImageFrame = ImageFrame(image=palette_indices.tobytes(), num_rows=palette_indices.shape[0],
+                                             num_cols=palette_indices.shape[1], pixel_format=PixelFormat.PALETTE8)
+        self._game_state.arena_frame.CopyFrom(arena_frame)
+        return self
+
+    def add_arena_frame(self, arena_frame: ImageFrame) -> GameStateBuilder:
+        """
+        :param arena_frame: an arena frame, see ArenaFrameEncoder
+        """
+        self._game_state.arena_frame.CopyFrom(arena_frame)
+        return self
+
     def add_scorekeeper(self, scorekeeper: ScoreKeeper) -> GameStateBuilder:
         proto_score_cards = [create_proto_scorecard(scorecard) for scorecard in scorekeeper.get_scorecards()]
         for proto_score_card in proto_score_cards:
@@ -68,3 +305,90 @@ class GameStateBuilder:
 
     def build(self) -> GameState:
         return self._game_state
+
+
+class PooledGameStateBuilder:
+    """
+    Builds the game states of the same actors every frame without building them from scratch.  Game states come from a
+    pool, with the proto actors of every actor allocated once, and only the geometry of each actor is written in
+    place.  The score cards are only rebuilt when the scorekeeper changes.  A built game state is not reused until it
+    is released, once it has been serialized, so the pool grows to the number of game states in flight
+    """
+
+    def __init__(self, game_actors: Iterable[Actor]):
+        """
+        :param game_actors: the actors of every game state, in order
+        """
+        self.game_actors: Tuple[Actor, ...] = tuple(game_actors)
+        # released from the serializer thread, taken on the game thread
+        self._free_game_states: SimpleQueue = SimpleQueue()
+        self._game_state: Optional[GameState] = None
+        self.pool_size: int = 0
+
+        # the protos of the score cards, and the generation of score cards each pooled game state holds
+        self._scorekeeper: Optional[ScoreKeeper] = None
+        self._scorekeeper_version: int = 0
+        self._proto_scorecards: List[ScoreCard] = []
+        self._scorecard_generation: int = 0
+        self._scorecard_generation_by_game_state_id: Dict[int, int] = {}
+
+    def _new_game_state(self) -> GameState:
+        game_state = GameState()
+        for game_actor in self.game_actors:
+            fill_proto_actor(game_state.actors.add(), game_actor)
+        self.pool_size += 1
+        return game_state
+
+    def start(self) -> PooledGameStateBuilder:
+        """
+        Takes a free game state from the pool.  Its fields hold whatever it was last built with until overwritten
+        """
+        try:
+            self._game_state = self._free_game_states.get_nowait()
+        except Empty:
+            self._game_state = self._new_game_state()
+        return self
+
+    def update_game_actors(self) -> PooledGameStateBuilder:
+        for proto_actor, game_actor in zip(self._game_state.actors, self.game_actors):
+            update_proto_actor(proto_actor, game_actor)
+        return self
+
+    @property
+    def arena_frame(self) -> ImageFrame:
+        """
+        :return: the arena frame of the game state being built, to be filled in place.  See ArenaFrameEncoder.encode_into
+        """
+        return self._game_state.arena_frame
+
+    def add_state_iteration(self, state_iteration: int) -> PooledGameStateBuilder:
+        self._game_state.state_iteration = state_iteration
+        return self
+
+    def add_scorekeeper(self, scorekeeper: ScoreKeeper) -> PooledGameStateBuilder:
+        if scorekeeper is not self._scorekeeper or scorekeeper.version != self._scorekeeper_version:
+            self._proto_scorecards = [create_proto_scorecard(scorecard) for scorecard in scorekeeper.get_scorecards()]
+            self._scorekeeper, self._scorekeeper_version = scorekeeper, scorekeeper.version
+            self._scorecard_generation += 1
+
+        game_state = self._game_state
+        if self._scorecard_generation_by_game_state_id.get(id(game_state)) != self._scorecard_generation:
+            for proto_score_card in self._proto_scorecards:
+                if proto_score_card.player.paddle_type is PaddleType.LEFT:
+                    game_state.left_scorecard.CopyFrom(proto_score_card)
+                elif proto_score_card.player.paddle_type is PaddleType.RIGHT:
+                    game_state.right_scorecard.CopyFrom(proto_score_card)
+            self._scorecard_generation_by_game_state_id[id(game_state)] = self._scorecard_generation
+        return self
+
+    def build(self) -> GameState:
+        game_state, self._game_state = self._game_state, None
+        return game_state
+
+    def release(self, game_state: GameState):
+        """
+        Hands a built game state back to the pool.  It must not be read afterwards
+        :param game_state: a game state built by this builder, released once
+        :return: None
+        """
+        self._free_game_states.put(game_state)
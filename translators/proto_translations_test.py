@@ -0,0 +1,96 @@
+import numpy
+
+from gameengine.arena import Arena
+from gamerender.numpy_rasterizer import ArenaRasterizer
+from paddles.paddle_utils import ArenaFrameDecoder
+from proto_gen.gamemaster_pb2 import GameState, PixelFormat, FrameEncoding
+from translators.proto_translations import ArenaFrameEncoder
+
+
+def arena_frames(pixel_format: int, num_frames: int):
+    """
+    :return: the next num_frames frames of a moving ball, copied, in the pixel format
+    """
+    arena = Arena(seed=1)
+    rasterizer = ArenaRasterizer(arena, 2)
+    for _ in range(num_frames):
+        arena.primary_ball.translate(3, 1)
+        rasterizer.rasterize()
+        pixels = rasterizer.frame if pixel_format == PixelFormat.PALETTE8 else rasterizer.to_grey()
+        yield pixels.copy()
+
+
+def round_trip(pixel_format: int, delta_from_keyframe: bool, num_frames: int = 12, keyframe_interval: int = 4,
+               missed_iterations=()):
+    """
+    Encodes every frame, and decodes every frame but the missed ones, as a player would from serialized game states
+    :return: for every frame decoded, its state iteration, the arena frame sent and whether it decoded to the frame
+    """
+    encoder = ArenaFrameEncoder(FrameEncoding.DELTA_RUNS, keyframe_interval=keyframe_interval,
+                                delta_from_keyframe=delta_from_keyframe)
+    decoder = ArenaFrameDecoder()
+    received_frames = []
+    for state_iteration, pixels in enumerate(arena_frames(pixel_format, num_frames), start=1):
+        game_state = GameState(state_iteration=state_iteration)
+        encoder.encode_into(game_state.arena_frame, pixels, pixel_format, state_iteration)
+        if state_iteration in missed_iterations:
+            continue
+        received_game_state = GameState.FromString(game_state.SerializeToString())
+        decoded_pixels = decoder.decode(received_game_state)
+        received_frames.append((state_iteration, received_game_state.arena_frame,
+                                decoded_pixels is not None and numpy.array_equal(decoded_pixels, pixels)))
+    return received_frames
+
+
+def test_deltas_from_the_previous_frame_round_trip():
+    for pixel_format in (PixelFormat.PALETTE8, PixelFormat.GREY8):
+        received_frames = round_trip(pixel_format, delta_from_keyframe=False)
+
+        assert all(is_decoded for _, _, is_decoded in received_frames)
+        for state_iteration, arena_frame, _ in received_frames:
+            assert arena_frame.pixel_format == pixel_format
+            if arena_frame.encoding == FrameEncoding.DELTA_RUNS:
+                assert arena_frame.reference_iteration == state_iteration - 1
+
+
+def test_deltas_from_the_keyframe_round_trip():
+    for pixel_format in (PixelFormat.PALETTE8, PixelFormat.GREY8):
+        received_frames = round_trip(pixel_format, delta_from_keyframe=True)
+
+        assert all(is_decoded for _, _, is_decoded in received_frames)
+        keyframe_iteration = None
+        for state_iteration, arena_frame, _ in received_frames:
+            if arena_frame.encoding == FrameEncoding.ZLIB:
+                keyframe_iteration = state_iteration
+            else:
+                assert arena_frame.reference_iteration == keyframe_iteration
+
+
+def test_keyframe_cadence():
+    received_frames = round_trip(PixelFormat.PALETTE8, delta_from_keyframe=False, keyframe_interval=4)
+
+    # a keyframe, then keyframe_interval deltas
+    keyframe_iterations = [state_iteration for state_iteration, arena_frame, _ in received_frames
+                           if arena_frame.encoding == FrameEncoding.ZLIB]
+    assert keyframe_iterations == [1, 6, 11]
+
+    every_keyframe = round_trip(PixelFormat.PALETTE8, delta_from_keyframe=False, keyframe_interval=0)
+    assert all(arena_frame.encoding == FrameEncoding.ZLIB for _, arena_frame, _ in every_keyframe)
+    assert all(is_decoded for _, _, is_decoded in every_keyframe)
+
+
+def test_missed_deltas():
+    # a delta from the previous frame cannot be decoded once a frame is missed, until the next keyframe
+    received_frames = round_trip(PixelFormat.PALETTE8, delta_from_keyframe=False, missed_iterations=(3,))
+    assert [state_iteration for state_iteration, _, is_decoded in received_frames if not is_decoded] == [4, 5]
+
+    # a delta from the keyframe still is
+    received_frames = round_trip(PixelFormat.PALETTE8, delta_from_keyframe=True, missed_iterations=(3,))
+    assert all(is_decoded for _, _, is_decoded in received_frames)
+
+
+if __name__ == "__main__":
+    test_deltas_from_the_previous_frame_round_trip()
+    test_deltas_from_the_keyframe_round_trip()
+    test_keyframe_cadence()
+    test_missed_deltas()
@@ -0,0 +1,141 @@
+from typing import Optional, Tuple
+
+import numpy
+
+from config import logging_configurator
+from proto_gen.gamemaster_pb2 import SharedFrameRing as ProtoSharedFrameRing, PixelFormat
+
+try:
+    from multiprocessing import shared_memory, resource_tracker
+except ImportError:
+    # multiprocessing.shared_memory is new in python 3.8.  Without it, arena frames always go over grpc
+    shared_memory = None
+
+"""
+ Arena frames for players on the same host as the server, without protobuf or sockets.  The server writes every frame
+ into the next slot of a ring of frame slots in a shared memory block, and the game state only says which slot.  The
+ player reads the slot as a numpy view of the shared memory, without any copy.  Each slot is tagged with the state
+ iteration of its frame, see SharedFrameRing in gamemaster.proto, so a player can tell a frame from one that has since
+ been overwritten.  A view stays valid until the server comes round the ring again, num_slots frames later.
+"""
+
+logger = logging_configurator.get_logger(__name__)
+
+SLOT_ALIGNMENT = 64
+
+# the numpy type of a pixel of each pixel format
+PIXEL_DTYPES = {PixelFormat.COLOR32: numpy.uint32, PixelFormat.PALETTE8: numpy.uint8, PixelFormat.GREY8: numpy.uint8}
+
+
+def is_shared_memory_available() -> bool:
+    return shared_memory is not None
+
+
+def _aligned(num_bytes: int) -> int:
+    return -(-num_bytes // SLOT_ALIGNMENT) * SLOT_ALIGNMENT
+
+
+def _attach_shared_memory(name: str):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # before python 3.13, attaching registers the block with the resource tracker of this process, which would
+        # unlink it when the player exits while the server still writes to it
+        shared_memory_block = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shared_memory_block._name, 'shared_memory')
+        return shared_memory_block
+
+
+class SharedFrameRing:
+    """
+    A ring of frame slots in a shared memory block.  The server creates it and writes, players attach and read
+    """
+
+    def __init__(self, shared_memory_block, num_slots: int, shape: Tuple[int, int], pixel_format: int,
+                 is_owner: bool):
+        """
+        Use create or attach
+        """
+        self.shared_memory_block = shared_memory_block
+        self.num_slots = num_slots
+        self.shape = shape
+        self.pixel_format = pixel_format
+        self.is_owner = is_owner
+        dtype = numpy.dtype(PIXEL_DTYPES[pixel_format])
+        rows, columns = shape
+        frames_offset = _aligned(8 * num_slots)
+        slot_size = _aligned(rows * columns * dtype.itemsize)
+        self.sequences = numpy.ndarray((num_slots,), dtype='<u8', buffer=shared_memory_block.buf)
+        self.frames = numpy.ndarray((num_slots, rows, columns), dtype=dtype, buffer=shared_memory_block.buf,
+                                    offset=frames_offset, strides=(slot_size, columns * dtype.itemsize, dtype.itemsize))
+        if not is_owner:
+            self.frames.flags.writeable = False
+        self._next_slot = 0
+
+    @classmethod
+    def create(cls, num_slots: int, shape: Tuple[int, int], pixel_format: int) -> 'SharedFrameRing':
+        """
+        :param num_slots:    the number of frames kept before a slot is written again
+        :param shape:        (rows, columns) of every frame
+        :param pixel_format: the PixelFormat of every frame
+        :return: a new ring, in a new shared memory block
+        """
+        rows, columns = shape
+        size = _aligned(8 * num_slots) + num_slots * _aligned(
+            rows * columns * numpy.dtype(PIXEL_DTYPES[pixel_format]).itemsize)
+        shared_memory_block = shared_memory.SharedMemory(create=True, size=size)
+        ring = cls(shared_memory_block, num_slots, shape, pixel_format, is_owner=True)
+        ring.sequences[:] = 0
+        logger.info(f"Created shared frame ring {shared_memory_block.name} of {num_slots} slots, {size} bytes")
+        return ring
+
+    @classmethod
+    def attach(cls, proto_ring: ProtoSharedFrameRing) -> 'SharedFrameRing':
+        """
+        :param proto_ring: the ring from the registration reply
+        :return: the ring, for reading
+        """
+        return cls(_attach_shared_memory(proto_ring.name), proto_ring.num_slots,
+                   (proto_ring.num_rows, proto_ring.num_cols), proto_ring.pixel_format, is_owner=False)
+
+    def to_proto(self) -> ProtoSharedFrameRing:
+        rows, columns = self.shape
+        return ProtoSharedFrameRing(name=self.shared_memory_block.name, num_slots=self.num_slots, num_rows=rows,
+                                    num_cols=columns, pixel_format=self.pixel_format)
+
+    def write(self, pixels: numpy.ndarray, state_iteration: int) -> int:
+        """
+        :param pixels:          the frame, with the shape and pixel format of the ring
+        :param state_iteration: the state iteration of the game state the frame belongs to
+        :return: the slot the frame was written to
+        """
+        slot = self._next_slot
+        self._next_slot = (slot + 1) % self.num_slots
+        # readers take a zero sequence as a slot being written
+        self.sequences[slot] = 0
+        numpy.copyto(self.frames[slot], pixels)
+        self.sequences[slot] = state_iteration + 1
+        return slot
+
+    def read(self, slot: int, state_iteration: int) -> Optional[numpy.ndarray]:
+        """
+        :param slot:            the slot of an image frame
+        :param state_iteration: the state iteration of the game state of the image frame
+        :return: a read only view of the frame in the slot, which is overwritten num_slots frames later.  None if it
+                 already has been
+        """
+        if self.sequences[slot] != state_iteration + 1:
+            return None
+        return self.frames[slot]
+
+    def close(self):
+        """
+        Detaches from the shared memory block, and removes it if this is the ring of the server.  Views of the ring
+        must be gone by now
+        :return: None
+        """
+        self.sequences = None
+        self.frames = None
+        self.shared_memory_block.close()
+        if self.is_owner:
+            self.shared_memory_block.unlink()
@@ -0,0 +1,52 @@
+import numpy
+import pytest
+
+from proto_gen.gamemaster_pb2 import PixelFormat
+from translators.shared_frames import SharedFrameRing, is_shared_memory_available
+
+pytestmark = pytest.mark.skipif(not is_shared_memory_available(), reason="needs multiprocessing.shared_memory")
+
+
+def test_shared_frame_ring():
+    ring = SharedFrameRing.create(3, (4, 5), PixelFormat.PALETTE8)
+    player_ring = SharedFrameRing.attach(ring.to_proto())
+    try:
+        # two more frames than slots, so the ring comes round and writes the first two slots again
+        frames = [numpy.full((4, 5), state_iteration, dtype=numpy.uint8) for state_iteration in range(5)]
+        slots = [ring.write(frame, state_iteration) for state_iteration, frame in enumerate(frames)]
+        assert slots == [0, 1, 2, 0, 1]
+
+        latest_frame = player_ring.read(slots[-1], 4)
+        assert numpy.array_equal(latest_frame, frames[-1])
+        assert not latest_frame.flags.writeable
+        assert numpy.array_equal(player_ring.read(slots[2], 2), frames[2])
+        # the frames of the first round have been written over
+        assert player_ring.read(slots[0], 0) is None
+        assert player_ring.read(slots[1], 1) is None
+        del latest_frame
+    finally:
+        player_ring.close()
+        proto_ring = ring.to_proto()
+        ring.close()
+
+    # the server's ring removes the shared memory block on close
+    with pytest.raises(FileNotFoundError):
+        SharedFrameRing.attach(proto_ring)
+
+
+def test_player_close_keeps_the_ring():
+    ring = SharedFrameRing.create(2, (3, 3), PixelFormat.GREY8)
+    try:
+        ring.write(numpy.full((3, 3), 7, dtype=numpy.uint8), 1)
+        SharedFrameRing.attach(ring.to_proto()).close()
+
+        player_ring = SharedFrameRing.attach(ring.to_proto())
+        assert numpy.array_equal(player_ring.read(0, 1), numpy.full((3, 3), 7, dtype=numpy.uint8))
+        player_ring.close()
+    finally:
+        ring.close()
+
+
+if __name__ == "__main__":
+    test_shared_frame_ring()
+    test_player_close_keeps_the_ring()